@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+
+import contextlib
+import functools
+import hashlib
+import http.server
+import io
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from rich.table import Table
+
+from installer.apt_mirrors import (
+    DEFAULT_ARCHIVE,
+    FETCH_JOBS,
+    MIRROR_COUNT,
+    DebUri,
+    prefetch_debs,
+    rank_mirrors,
+)
+from installer.console import console
+from installer.enums import OSType
+from installer.interfaces import Downloader, SystemManager
+from installer.macos_defaults import preferences_file
+
+BUDGET_FILE = Path(__file__).parent / "budget.json"
+
+# `dot` runs from shell hooks, so its cold start is budgeted too
+CLI_MODULE = "installer.main"
+IMPORT_BUDGET_MS = 100.0
+# Heavy modules the CLI must only import inside the subcommands that use them
+DEFERRED_MODULES = (
+    "rich",
+    "installer.dotfiles_installer",
+    "installer.macos_manager",
+    "installer.package_managers",
+)
+
+# Simulated seconds per command, matched by substring; first match wins
+DEFAULT_LATENCIES: Dict[str, float] = {
+    "apt-get update": 0.20,
+    "apt-get install": 0.30,
+    "brew update": 0.20,
+    "brew bundle": 0.30,
+    "brew fetch": 0.25,
+    "curl": 0.05,
+    "wget": 0.05,
+    "git clone": 0.05,
+}
+
+# Local stand-ins for `bench --mirrors`: name and seconds of latency per request.
+# The first plays the configured archive that apt would use on its own.
+MIRROR_STAND_INS: Tuple[Tuple[str, float], ...] = (
+    ("archive", 0.04),
+    ("near", 0.01),
+    ("regional", 0.02),
+    ("far", 0.12),
+    ("stale", 0.01),  # lacks the release, so ranking must drop it
+)
+MIRROR_CODENAME = "noble"
+MIRROR_PACKAGES = 60
+MIRROR_PACKAGE_SIZE = 512 * 1024
+# Bytes per second each stand-in serves on one connection
+MIRROR_BANDWIDTH = 16 * 1024 * 1024
+
+# Commands present on a stock Ubuntu server before anything is installed
+BASE_COMMANDS = ("sudo", "apt-get", "dpkg")
+
+# apt packages whose command differs from the package name
+APT_PACKAGE_COMMANDS: Dict[str, List[str]] = {
+    "neovim": ["nvim"],
+    "ripgrep": ["rg"],
+    "fd-find": ["fdfind"],
+    "bat": ["batcat"],
+    "httpie": ["http"],
+}
+
+# Commands each simulated script install puts on $PATH, matched by substring
+PROVIDES: Dict[str, List[str]] = {
+    "delta": ["delta"],
+    "mise.run": ["mise"],
+    "uv/install.sh": ["uv"],
+    "zoxide": ["zoxide"],
+    "git-cliff": ["git-cliff"],
+    "Homebrew/install": ["brew"],
+}
+
+# Paths an install command creates under $HOME, matched by substring
+CREATES: Dict[str, str] = {
+    "ohmyzsh": ".oh-my-zsh/",
+    "antidote": ".antidote/",
+    "tic -x": ".terminfo/x/xterm-kitty",
+    "--cask ubersicht": "Applications/Übersicht.app/",
+    "Jean-Tinland/simple-bar": "Library/Application Support/Übersicht/widgets/simple-bar/",
+}
+
+EMPTY_PLIST = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<plist version="1.0">\n<dict/>\n</plist>\n'
+)
+
+# Release tag every simulated GitHub "latest release" lookup returns
+FAKE_RELEASE_TAG = "v1.0.0"
+
+
+class FakeSystemManager(SystemManager):
+    """SystemManager that simulates commands with fixed latency instead of running them."""
+
+    def __init__(
+        self,
+        os_type: OSType = OSType.UBUNTU,
+        latencies: Optional[Dict[str, float]] = None,
+        default_latency: float = 0.0,
+        installed: Iterable[str] = BASE_COMMANDS,
+        dpkg_status: Optional[Path] = None,
+        apt_lists: Optional[Path] = None,
+    ):
+        self._os_type = os_type
+        # Optional fixture files kept in step with simulated apt runs
+        self.dpkg_status = dpkg_status
+        self.apt_lists = apt_lists
+        self.latencies = DEFAULT_LATENCIES if latencies is None else latencies
+        self.default_latency = default_latency
+        self.installed = set(installed)
+        self.commands: List[str] = []
+        # Formulae and casks a simulated `brew bundle` installed
+        self.brew_packages: Set[str] = set()
+        # Names of simulated running apps (`open -a` starts, `pkill -x` stops)
+        self.processes: Set[str] = set()
+        # (command, start, end) in perf_counter seconds, to check for overlap
+        self.timeline: List[Tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+
+    def get_os_type(self) -> OSType:
+        return self._os_type
+
+    def is_supported(self) -> bool:
+        return True
+
+    def check_command_exists(self, command: str) -> bool:
+        # Tools unpacked into ~/.local/bin count too, as they would on $PATH
+        with self._lock:
+            if command in self.installed:
+                return True
+        return (Path.home() / ".local" / "bin" / command).exists()
+
+    def invalidate_commands(self, commands: Optional[Iterable[str]] = None) -> None:
+        pass
+
+    def _latency(self, command: str) -> float:
+        for pattern, seconds in self.latencies.items():
+            if pattern in command:
+                return seconds
+        return self.default_latency
+
+    def run_command(
+        self,
+        command: str,
+        description: str = "",
+        interactive: bool = False,
+        cwd: Optional[Path] = None,
+    ) -> bool:
+        with self._lock:
+            self.commands.append(command)
+        start = time.perf_counter()
+        time.sleep(self._latency(command))
+        with self._lock:
+            self.timeline.append((command, start, time.perf_counter()))
+            for pattern, commands in PROVIDES.items():
+                if pattern in command:
+                    self.installed.update(commands)
+            if "apt-get install -y " in command:
+                packages = command.split("apt-get install -y ", 1)[1].split()
+                for package in packages:
+                    self.installed.update(APT_PACKAGE_COMMANDS.get(package, [package]))
+                self._record_dpkg(packages)
+            if " bundle --file=" in command:
+                self._record_brew_bundle(command)
+            if command.startswith("open -a "):
+                self.processes.add(shlex.split(command)[2])
+            if command.startswith("pkill -x "):
+                pattern = shlex.split(command)[2]
+                self.processes = {
+                    name for name in self.processes if not re.fullmatch(pattern, name)
+                }
+            if command.startswith("defaults import "):
+                # Saved where cfprefsd would, so the preference probe sees it
+                _, _, domain, path = shlex.split(command)
+                saved = preferences_file(Path.home(), domain)
+                saved.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, saved)
+            if "apt-get update" in command and self.apt_lists:
+                self.apt_lists.mkdir(parents=True, exist_ok=True)
+                (self.apt_lists / "simulated_Packages").touch()
+        for pattern, relative in CREATES.items():
+            if pattern in command:
+                path = Path.home() / relative
+                if relative.endswith("/"):
+                    path.mkdir(parents=True, exist_ok=True)
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.touch()
+        return True
+
+    def _record_brew_bundle(self, command: str) -> None:
+        from installer.brewfile import LISTED_KINDS, parse_brewfile
+
+        brewfile = Path(shlex.split(command.split(" bundle --file=", 1)[1])[0])
+        entries = parse_brewfile(brewfile)
+        self.brew_packages.update(
+            entry.installed_name for entry in entries if entry.kind in LISTED_KINDS
+        )
+        # Formulae put their command (usually the same name) on $PATH
+        self.installed.update(
+            entry.installed_name for entry in entries if entry.kind == "brew"
+        )
+
+    def _record_dpkg(self, packages: List[str]) -> None:
+        if not self.dpkg_status:
+            return
+        self.dpkg_status.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.dpkg_status, "a") as status:
+            for package in packages:
+                status.write(f"Package: {package}\nStatus: install ok installed\n\n")
+
+    def run_interactive_command(
+        self, command: str, description: str = "", cwd: Optional[Path] = None
+    ) -> bool:
+        return self.run_command(command, description, interactive=True, cwd=cwd)
+
+    def capture_command(self, command: str) -> Optional[str]:
+        if command.startswith("pkill -x "):
+            # Like pkill, fail when no process matched
+            pattern = shlex.split(command)[2]
+            with self._lock:
+                matched = any(re.fullmatch(pattern, name) for name in self.processes)
+            self.run_command(command)
+            return "" if matched else None
+        self.run_command(command)
+        if " list --versions" in command:
+            with self._lock:
+                return "".join(f"{name} 1.0\n" for name in sorted(self.brew_packages))
+        if command.startswith("pgrep -x "):
+            pattern = shlex.split(command)[2]
+            with self._lock:
+                matches = [
+                    name for name in self.processes if re.fullmatch(pattern, name)
+                ]
+            return "".join(f"{name}\n" for name in matches) or None
+        if command.startswith("defaults export "):
+            domain = shlex.split(command)[2]
+            saved = preferences_file(Path.home(), domain)
+            # An unknown domain exports as an empty dictionary
+            return saved.read_text() if saved.exists() else EMPTY_PLIST
+        return ""
+
+
+class FakeDownloader(Downloader):
+    """Downloader that writes placeholder artifacts after a simulated delay.
+
+    Pinned hashes are not checked, since the placeholders never match them.
+    """
+
+    def __init__(self, latency: float = 0.1):
+        self.latency = latency
+        self.urls: List[str] = []
+        self._lock = threading.Lock()
+
+    def read(self, url: str) -> bytes:
+        with self._lock:
+            self.urls.append(url)
+        return json.dumps({"tag_name": FAKE_RELEASE_TAG}).encode()
+
+    def fetch(self, url: str, destination: Path, sha256: Optional[str] = None) -> Path:
+        with self._lock:
+            self.urls.append(url)
+        time.sleep(self.latency)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if destination.name.endswith(".tar.gz"):
+            # Release tarballs hold a single binary named after the tool
+            with tarfile.open(destination, "w:gz") as archive:
+                binary = destination.name.split("-", 1)[0]
+                info = tarfile.TarInfo(binary)
+                info.mode = 0o755
+                archive.addfile(info, io.BytesIO(b""))
+        else:
+            destination.write_bytes(b"")
+        return destination
+
+
+class SyscallCounter:
+    """Counts filesystem syscalls and real process spawns while active."""
+
+    # Audit events (see sys.addaudithook) that correspond to filesystem syscalls
+    FS_EVENTS = {
+        "open",
+        "os.chmod",
+        "os.listdir",
+        "os.mkdir",
+        "os.remove",
+        "os.rename",
+        "os.rmdir",
+        "os.scandir",
+        "os.symlink",
+        "os.truncate",
+        "os.utime",
+        "shutil.rmtree",
+    }
+    SPAWN_EVENTS = {"subprocess.Popen", "os.posix_spawn", "os.exec", "os.fork"}
+    # Calls with no audit event; wrapped for the duration of a measurement
+    WRAPPED = ("stat", "lstat", "readlink", "access")
+
+    _hook_installed = False
+    _active: Optional["SyscallCounter"] = None
+
+    def __init__(self):
+        self.fs_calls = 0
+        self.spawns = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _hook(cls, event: str, args: tuple) -> None:
+        counter = cls._active
+        if counter is None:
+            return
+        if event in cls.FS_EVENTS:
+            with counter._lock:
+                counter.fs_calls += 1
+        elif event in cls.SPAWN_EVENTS:
+            with counter._lock:
+                counter.spawns += 1
+
+    @contextlib.contextmanager
+    def measure(self) -> Iterator["SyscallCounter"]:
+        if not SyscallCounter._hook_installed:
+            sys.addaudithook(SyscallCounter._hook)
+            SyscallCounter._hook_installed = True
+
+        originals = {name: getattr(os, name) for name in self.WRAPPED}
+
+        def counting(func: Callable) -> Callable:
+            def wrapper(*args, **kwargs):
+                with self._lock:
+                    self.fs_calls += 1
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        for name, func in originals.items():
+            setattr(os, name, counting(func))
+        SyscallCounter._active = self
+        try:
+            yield self
+        finally:
+            SyscallCounter._active = None
+            for name, func in originals.items():
+                setattr(os, name, func)
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    wall_ms: float
+    spawns: int
+    fs_calls: int
+
+
+@contextlib.contextmanager
+def temporary_home() -> Iterator[Path]:
+    """Point $HOME (and XDG state) at a throwaway directory."""
+    saved = {key: os.environ.get(key) for key in ("HOME", "XDG_STATE_HOME")}
+    home = Path(tempfile.mkdtemp(prefix="dotfiles-bench-"))
+    os.environ["HOME"] = str(home)
+    os.environ.pop("XDG_STATE_HOME", None)
+    try:
+        yield home
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def _introduce_drift(home: Path) -> None:
+    """Remove a few links so a rerun has partial work to redo."""
+    for relative in (".vimrc", ".config/nvim", ".config/zsh/01_options.zsh"):
+        path = home / relative
+        if path.is_symlink():
+            path.unlink()
+
+
+def run_scenarios(
+    dotfiles_dir: Path,
+    default_latency: float = 0.0,
+    jobs: int = 4,
+    os_type: OSType = OSType.UBUNTU,
+) -> List[ScenarioResult]:
+    """Run the fresh, no-op, partial-drift and forced install scenarios against a temp HOME.
+
+    Scenario names carry an OS prefix (e.g. ``macos-fresh``) except on Ubuntu.
+    """
+    from installer.artifact_cache import ArtifactCache, CachingDownloader
+    from installer.dotfiles_installer import DotfilesInstaller
+    from installer.package_managers import LOCKED_ARTIFACTS, UbuntuPackageManager
+    from installer.tools_lock import LockedTool, save_lock
+
+    results: List[ScenarioResult] = []
+    prefix = "" if os_type == OSType.UBUNTU else f"{os_type}-"
+    with temporary_home() as home:
+        dpkg_status = home / "var" / "lib" / "dpkg" / "status"
+        apt_lists = home / "var" / "lib" / "apt" / "lists"
+        system_manager = FakeSystemManager(
+            os_type,
+            default_latency=default_latency,
+            dpkg_status=dpkg_status,
+            apt_lists=apt_lists,
+        )
+        downloader = FakeDownloader(default_latency or 0.1)
+        # Pinned releases, so installs skip the release API as they do in practice
+        tools_lock = home / "tools.lock"
+        save_lock(
+            tools_lock,
+            {
+                artifact.name: LockedTool(
+                    FAKE_RELEASE_TAG,
+                    artifact.url_for(FAKE_RELEASE_TAG),
+                    hashlib.sha256(artifact.name.encode()).hexdigest(),
+                )
+                for artifact in LOCKED_ARTIFACTS
+            },
+        )
+
+        def scenario(name: str, force: bool = False) -> None:
+            package_manager = (
+                UbuntuPackageManager(
+                    dpkg_status,
+                    apt_lists,
+                    downloader=CachingDownloader(downloader, ArtifactCache()),
+                    tools_lock=tools_lock,
+                )
+                if os_type == OSType.UBUNTU
+                else None
+            )
+            installer = DotfilesInstaller(
+                dotfiles_dir,
+                system_manager=system_manager,
+                package_manager=package_manager,
+            )
+            if installer.macos_manager:
+                installer.macos_manager.applications_dir = home / "Applications"
+            spawned_before = len(system_manager.commands)
+            counter = SyscallCounter()
+            start = time.perf_counter()
+            with counter.measure(), contextlib.redirect_stdout(io.StringIO()):
+                installer.install(interactive=False, jobs=jobs, force=force)
+            wall_ms = (time.perf_counter() - start) * 1000
+            spawns = len(system_manager.commands) - spawned_before + counter.spawns
+            results.append(
+                ScenarioResult(prefix + name, wall_ms, spawns, counter.fs_calls)
+            )
+
+        scenario("fresh")
+        scenario("noop")
+        _introduce_drift(home)
+        scenario("drift")
+        # Everything installed but the manifest ignored: the package fast paths
+        scenario("forced", force=True)
+    return results
+
+
+class _MirrorHandler(http.server.SimpleHTTPRequestHandler):
+    """Static files behind a fixed per-request latency and a bandwidth cap."""
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, latency: float = 0.0, **kwargs):
+        self.latency = latency
+        super().__init__(*args, **kwargs)
+
+    def send_head(self):
+        time.sleep(self.latency)
+        return super().send_head()
+
+    def copyfile(self, source, outputfile) -> None:
+        chunk = MIRROR_BANDWIDTH // 50
+        while True:
+            data = source.read(chunk)
+            if not data:
+                return
+            outputfile.write(data)
+            time.sleep(len(data) / MIRROR_BANDWIDTH)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@contextlib.contextmanager
+def mirror_stand_ins(root: Path) -> Iterator[Dict[str, str]]:
+    """Serve each stand-in's directory under ``root``; yields name -> base URL."""
+    servers = []
+    try:
+        for name, latency in MIRROR_STAND_INS:
+            handler = functools.partial(
+                _MirrorHandler, directory=str(root / name), latency=latency
+            )
+            server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            servers.append((name, server))
+        yield {
+            name: f"http://127.0.0.1:{server.server_address[1]}/ubuntu/"
+            for name, server in servers
+        }
+    finally:
+        for _, server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def _populate_mirrors(root: Path) -> List[DebUri]:
+    """Write the same package pool to every stand-in."""
+    uris: List[DebUri] = []
+    for index in range(MIRROR_PACKAGES):
+        name = f"pkg{index}"
+        filename = f"{name}_1.0_amd64.deb"
+        data = hashlib.sha256(filename.encode()).digest() * (MIRROR_PACKAGE_SIZE // 32)
+        relative = f"pool/main/p/{name}/{filename}"
+        for mirror, _ in MIRROR_STAND_INS:
+            path = root / mirror / "ubuntu" / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        uris.append(
+            DebUri(
+                DEFAULT_ARCHIVE + relative,
+                filename,
+                len(data),
+                hashlib.sha256(data).hexdigest(),
+            )
+        )
+    for mirror, _ in MIRROR_STAND_INS:
+        if mirror != "stale":
+            release = root / mirror / "ubuntu" / "dists" / MIRROR_CODENAME
+            release.mkdir(parents=True, exist_ok=True)
+            (release / "InRelease").write_text("Suite: stand-in\n")
+    return uris
+
+
+def run_mirror_benchmark() -> List[ScenarioResult]:
+    """Time package acquisition against local stand-in mirrors.
+
+    ``sequential`` is apt's default (one transfer at a time from the configured
+    archive); ``parallel`` adds concurrent connections to that archive;
+    ``fast`` is DOTFILES_APT_FAST: rank the mirrors, then spread the downloads
+    across the fastest ones. The spawn column is unused (0).
+    """
+    from installer.downloads import HttpDownloader
+
+    results: List[ScenarioResult] = []
+    with tempfile.TemporaryDirectory(prefix="dotfiles-mirrors-") as directory:
+        root = Path(directory)
+        uris = _populate_mirrors(root)
+        with mirror_stand_ins(root) as urls:
+
+            def scenario(
+                name: str, mirrors: Callable[[], List[str]], jobs: int
+            ) -> None:
+                archives = root / "archives" / name
+                counter = SyscallCounter()
+                start = time.perf_counter()
+                with counter.measure():
+                    fetched = prefetch_debs(
+                        uris, mirrors(), archives, HttpDownloader(retries=1), jobs
+                    )
+                wall_ms = (time.perf_counter() - start) * 1000
+                if not all(fetched.values()):
+                    raise RuntimeError(f"mirror benchmark {name}: downloads failed")
+                results.append(
+                    ScenarioResult(f"mirrors-{name}", wall_ms, 0, counter.fs_calls)
+                )
+
+            def ranked() -> List[str]:
+                ranking = rank_mirrors(list(urls.values()), MIRROR_CODENAME)
+                return [mirror for mirror, _ in ranking[:MIRROR_COUNT]]
+
+            scenario("sequential", lambda: [urls["archive"]], 1)
+            scenario("parallel", lambda: [urls["archive"]], FETCH_JOBS)
+            scenario("fast", ranked, FETCH_JOBS)
+    return results
+
+
+def measure_cli_import(runs: int = 5) -> Tuple[float, List[str]]:
+    """Best-of-N cold import time of the CLI, and any deferred modules it loaded."""
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {CLI_MODULE}\n"
+        "elapsed = (time.perf_counter() - start) * 1000\n"
+        "print(json.dumps([elapsed, sorted(sys.modules)]))\n"
+    )
+    best = float("inf")
+    loaded: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent.parent,
+        ).stdout
+        elapsed, loaded = json.loads(output)
+        best = min(best, elapsed)
+    eager = [
+        module
+        for module in DEFERRED_MODULES
+        if any(name == module or name.startswith(module + ".") for name in loaded)
+    ]
+    return best, eager
+
+
+def import_failures(import_ms: float, eager: List[str]) -> List[str]:
+    """Describe CLI startup regressions: eager heavy imports or a slow import."""
+    failures = [f"{CLI_MODULE} imports {module} at load time" for module in eager]
+    if import_ms > IMPORT_BUDGET_MS:
+        failures.append(
+            f"{CLI_MODULE} import took {import_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+        )
+    return failures
+
+
+def load_budget(path: Path = BUDGET_FILE) -> Dict[str, Dict[str, int]]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_budget(
+    results: List[ScenarioResult], path: Path = BUDGET_FILE
+) -> Dict[str, Dict[str, int]]:
+    # Merge, so recording one OS's scenarios keeps the other's budget
+    budget = load_budget(path)
+    budget.update({result.name: {"spawns": result.spawns} for result in results})
+    path.write_text(json.dumps(budget, indent=2, sort_keys=True) + "\n")
+    return budget
+
+
+def over_budget(
+    results: List[ScenarioResult], budget: Dict[str, Dict[str, int]]
+) -> List[str]:
+    """Describe every scenario whose spawn count exceeds its recorded budget."""
+    failures = []
+    for result in results:
+        limit = budget.get(result.name, {}).get("spawns")
+        if limit is not None and result.spawns > limit:
+            failures.append(
+                f"{result.name}: {result.spawns} processes spawned (budget {limit})"
+            )
+    return failures
+
+
+def print_results(
+    results: List[ScenarioResult],
+    budget: Dict[str, Dict[str, int]],
+    import_ms: Optional[float] = None,
+) -> None:
+    table = Table(title="Installer Benchmark")
+    table.add_column("Scenario", style="cyan")
+    table.add_column("Wall time", justify="right")
+    table.add_column("Spawns", justify="right")
+    table.add_column("Budget", justify="right")
+    table.add_column("FS syscalls", justify="right")
+    for result in results:
+        limit = budget.get(result.name, {}).get("spawns")
+        spawns = str(result.spawns)
+        if limit is not None and result.spawns > limit:
+            spawns = f"[red]{spawns}[/red]"
+        table.add_row(
+            result.name,
+            f"{result.wall_ms:.0f} ms",
+            spawns,
+            "-" if limit is None else str(limit),
+            str(result.fs_calls),
+        )
+    console.print(table)
+    if import_ms is not None:
+        style = "red" if import_ms > IMPORT_BUDGET_MS else "green"
+        console.print(
+            f"CLI import: [{style}]{import_ms:.0f} ms[/{style}] "
+            f"(budget {IMPORT_BUDGET_MS:.0f} ms)"
+        )
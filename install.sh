@@ -4,6 +4,20 @@ set -euo pipefail
 dir="$(pwd)"
 export dir
 
+# Fast path: a prebuilt zipapp (scripts/build-zipapp.sh) runs the Python installer
+# with the system python3 directly, skipping uv, venv creation and dependency
+# resolution. Set DOT_PYZ_URL to fetch it, or DOTFILES_LEGACY_INSTALL=1 to opt out.
+DOT_PYZ="${DOT_PYZ:-$dir/dist/dot.pyz}"
+if [ -z "${DOTFILES_LEGACY_INSTALL:-}" ] && command -v python3 &> /dev/null; then
+    if [ ! -f "$DOT_PYZ" ] && [ -n "${DOT_PYZ_URL:-}" ]; then
+        mkdir -p "$(dirname "$DOT_PYZ")"
+        curl -fsSL "$DOT_PYZ_URL" -o "$DOT_PYZ"
+    fi
+    if [ -f "$DOT_PYZ" ]; then
+        DOTFILES_DIR="$dir" exec python3 "$DOT_PYZ" install "$@"
+    fi
+fi
+
 # Detect operating system (macOS or Ubuntu)
 detect_os() {
     case "$(uname -s)" in
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import os
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+DPKG_STATUS = Path("/var/lib/dpkg/status")
+APT_LISTS = Path("/var/lib/apt/lists")
+
+# Skip `apt-get update` when the package lists were refreshed more recently than this
+APT_LISTS_MAX_AGE = 6 * 60 * 60.0
+
+
+def installed_packages(status_file: Path = DPKG_STATUS) -> Set[str]:
+    """Names of fully installed packages, read straight from the dpkg status database."""
+    try:
+        text = status_file.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return set()
+
+    installed: Set[str] = set()
+    for stanza in text.split("\n\n"):
+        package: Optional[str] = None
+        status: Optional[str] = None
+        for line in stanza.splitlines():
+            if line.startswith("Package:"):
+                package = line[len("Package:") :].strip()
+            elif line.startswith("Status:"):
+                status = line[len("Status:") :].strip()
+        # Status is "<want> <flag> <state>"; only "installed" means usable
+        if package and status and status.split()[-1] == "installed":
+            installed.add(package)
+    return installed
+
+
+def missing_packages(
+    packages: Iterable[str], status_file: Path = DPKG_STATUS
+) -> List[str]:
+    """The subset of ``packages`` dpkg does not report as installed, in order."""
+    installed = installed_packages(status_file)
+    return [package for package in packages if package.split(":")[0] not in installed]
+
+
+def lists_age(lists_dir: Path = APT_LISTS) -> Optional[float]:
+    """Seconds since the package lists were last refreshed, or None if never."""
+    newest = 0.0
+    try:
+        with os.scandir(lists_dir) as entries:
+            for entry in entries:
+                if entry.name in ("lock", "partial") or not entry.is_file():
+                    continue
+                newest = max(newest, entry.stat().st_mtime)
+    except OSError:
+        return None
+    return time.time() - newest if newest else None
+
+
+def lists_are_fresh(max_age: float, lists_dir: Path = APT_LISTS) -> bool:
+    """True when ``apt-get update`` ran within ``max_age`` seconds."""
+    age = lists_age(lists_dir)
+    return age is not None and age <= max_age
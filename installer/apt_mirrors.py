@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+import http.client
+import os
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from installer.interfaces import Downloader
+
+DEFAULT_ARCHIVE = "http://archive.ubuntu.com/ubuntu/"
+# Geo-located list of Ubuntu archive mirrors for the caller's country
+MIRROR_LIST_URL = "http://mirrors.ubuntu.com/mirrors.txt"
+PROBE_TIMEOUT = 2.0
+# Mirrors downloads are spread across
+MIRROR_COUNT = 3
+# Concurrent .deb downloads while prefetching
+FETCH_JOBS = 8
+
+
+@dataclass(frozen=True)
+class DebUri:
+    """One package apt would download, from ``apt-get --print-uris``."""
+
+    url: str
+    filename: str
+    size: int
+    sha256: Optional[str] = None
+
+    @property
+    def archive_base(self) -> Optional[str]:
+        """The archive root (up to ``pool/``), if this is a pool URL."""
+        index = self.url.find("/pool/")
+        return self.url[: index + 1] if index >= 0 else None
+
+
+def parse_print_uris(output: str) -> List[DebUri]:
+    """Parse ``'URL' filename size hash`` lines; other output is ignored."""
+    uris: List[DebUri] = []
+    for line in output.splitlines():
+        if not line.startswith("'"):
+            continue
+        try:
+            url, filename, size, checksum = shlex.split(line)[:4]
+        except ValueError:
+            continue
+        sha256 = checksum[len("SHA256:") :] if checksum.startswith("SHA256:") else None
+        uris.append(DebUri(url, filename, int(size), sha256))
+    return uris
+
+
+def is_ubuntu_archive(base: str) -> bool:
+    """True for archive.ubuntu.com and its country mirrors (not security/PPAs)."""
+    host = urlsplit(base).hostname or ""
+    return host == "archive.ubuntu.com" or host.endswith(".archive.ubuntu.com")
+
+
+def release_codename(os_release: Path = Path("/etc/os-release")) -> Optional[str]:
+    try:
+        for line in os_release.read_text().splitlines():
+            if line.startswith("VERSION_CODENAME="):
+                return line.split("=", 1)[1].strip().strip('"') or None
+    except OSError:
+        pass
+    return None
+
+
+def candidate_mirrors(downloader: Downloader) -> List[str]:
+    """Mirrors to rank: $DOTFILES_APT_MIRRORS, else the archive plus local mirrors."""
+    override = os.environ.get("DOTFILES_APT_MIRRORS")
+    if override:
+        return [_with_slash(mirror) for mirror in override.split()]
+    mirrors = [DEFAULT_ARCHIVE]
+    try:
+        listed = downloader.read(MIRROR_LIST_URL).decode()
+    except Exception:
+        return mirrors
+    for line in listed.splitlines():
+        line = line.strip()
+        if line.startswith("http://") and _with_slash(line) not in mirrors:
+            mirrors.append(_with_slash(line))
+    return mirrors
+
+
+def _with_slash(url: str) -> str:
+    return url if url.endswith("/") else url + "/"
+
+
+def probe_latency(
+    mirror: str, path: str, timeout: float = PROBE_TIMEOUT
+) -> Optional[float]:
+    """Seconds for a HEAD of ``path`` on ``mirror``, or None if it is not served."""
+    parts = urlsplit(mirror + path)
+    connection_class = (
+        http.client.HTTPSConnection
+        if parts.scheme == "https"
+        else http.client.HTTPConnection
+    )
+    start = time.perf_counter()
+    conn = connection_class(parts.hostname, parts.port, timeout=timeout)
+    try:
+        conn.request("HEAD", parts.path)
+        status = conn.getresponse().status
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        conn.close()
+    return time.perf_counter() - start if status == 200 else None
+
+
+def rank_mirrors(
+    mirrors: List[str], codename: Optional[str], timeout: float = PROBE_TIMEOUT
+) -> List[Tuple[str, float]]:
+    """Mirrors that serve this release, fastest first, probed concurrently."""
+    path = f"dists/{codename}/InRelease" if codename else "dists/"
+    with ThreadPoolExecutor(max_workers=min(16, len(mirrors) or 1)) as pool:
+        latencies = list(
+            pool.map(lambda mirror: probe_latency(mirror, path, timeout), mirrors)
+        )
+    ranked = [
+        (mirror, latency)
+        for mirror, latency in zip(mirrors, latencies)
+        if latency is not None
+    ]
+    return sorted(ranked, key=lambda entry: entry[1])
+
+
+def prefetch_debs(
+    uris: List[DebUri],
+    mirrors: List[str],
+    archives: Path,
+    downloader: Downloader,
+    jobs: int = FETCH_JOBS,
+) -> Dict[str, bool]:
+    """Download packages into an apt archive directory, spread across mirrors.
+
+    Ubuntu archive packages are assigned to ``mirrors`` round-robin and retried
+    on the next mirror if one fails; other sources (PPAs, the security pocket)
+    are fetched from their own URL. Returns filename -> fetched. apt itself
+    downloads anything that failed here.
+    """
+    (archives / "partial").mkdir(parents=True, exist_ok=True)
+
+    def fetch(indexed: Tuple[int, DebUri]) -> Tuple[str, bool]:
+        index, uri = indexed
+        base = uri.archive_base
+        urls = [uri.url]
+        if base and is_ubuntu_archive(base) and mirrors:
+            rotated = mirrors[index % len(mirrors) :] + mirrors[: index % len(mirrors)]
+            urls = [mirror + uri.url[len(base) :] for mirror in rotated] + urls
+        for url in urls:
+            try:
+                downloader.fetch(url, archives / uri.filename, uri.sha256)
+                return uri.filename, True
+            except Exception:
+                continue
+        return uri.filename, False
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="apt-fetch") as pool:
+        return dict(pool.map(fetch, enumerate(uris)))
+
+
+def write_apt_config(directory: Path, mirrors: List[Tuple[str, float]]) -> Path:
+    """Write the apt config snippet used with ``apt-get -c`` for this install."""
+    archives = directory / "archives"
+    ranking = "".join(
+        f"//   {mirror} ({latency * 1000:.0f} ms)\n" for mirror, latency in mirrors
+    )
+    snippet = directory / "apt.conf"
+    snippet.write_text(
+        "// Generated by the dotfiles installer (DOTFILES_APT_FAST).\n"
+        "// Packages were prefetched in parallel from these mirrors:\n"
+        f"{ranking}"
+        f'Dir::Cache::Archives "{archives}/";\n'
+        'Acquire::Retries "3";\n'
+    )
+    return snippet
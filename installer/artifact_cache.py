@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from installer.interfaces import Downloader
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# How long a cached copy of a mutable URL (not a versioned release) is trusted
+MUTABLE_URL_MAX_AGE = 24 * 60 * 60.0
+
+
+def default_cache_dir() -> Path:
+    """Artifact cache directory (XDG_CACHE_HOME, default ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "dotfiles" / "artifacts"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_immutable_url(url: str) -> bool:
+    """Release asset URLs name a fixed version, so their content never changes."""
+    return "/releases/download/" in url
+
+
+class ArtifactCache:
+    """Content-addressed store of downloaded files, shared safely between machines.
+
+    Blobs live at ``objects/<sha256[:2]>/<sha256>``; ``urls/<sha256(url)>`` holds
+    the content hash last fetched from a URL. Every write is a rename, so
+    several machines may share one cache directory (e.g. on NFS). A blob's
+    mtime is its last use, which drives LRU eviction past ``max_bytes``.
+    """
+
+    def __init__(
+        self, directory: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _object_path(self, sha256: str) -> Path:
+        return self.directory / "objects" / sha256[:2] / sha256
+
+    def _url_path(self, url: str) -> Path:
+        return self.directory / "urls" / hashlib.sha256(url.encode()).hexdigest()
+
+    def _touch(self, path: Path) -> Optional[Path]:
+        try:
+            os.utime(path)
+        except OSError:
+            return None  # Evicted (possibly by another machine)
+        return path
+
+    def get(self, sha256: str) -> Optional[Path]:
+        """The cached blob with this content hash, marked as recently used."""
+        return self._touch(self._object_path(sha256))
+
+    def discard(self, blob: Path) -> None:
+        """Drop a blob whose content no longer matches its name."""
+        blob.unlink(missing_ok=True)
+
+    def lookup(self, url: str, max_age: Optional[float] = None) -> Optional[Path]:
+        """The blob last fetched from ``url``, if that fetch is within ``max_age``."""
+        ref = self._url_path(url)
+        try:
+            if max_age is not None and time.time() - ref.stat().st_mtime > max_age:
+                return None
+            sha256 = ref.read_text().strip()
+        except OSError:
+            return None
+        return self.get(sha256)
+
+    def _write_atomic(self, path: Path, write) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _put(self, url: str, sha256: str, write: Callable[[Path], None]) -> Path:
+        blob = self._object_path(sha256)
+        if not self._touch(blob):
+            self._write_atomic(blob, write)
+        self._write_atomic(self._url_path(url), lambda tmp: tmp.write_text(sha256))
+        self.evict()
+        return blob
+
+    def put(self, url: str, source: Path, sha256: Optional[str] = None) -> Path:
+        """Store a downloaded file under its content hash and remember its URL."""
+        sha256 = sha256 or file_sha256(source)
+        return self._put(url, sha256, lambda tmp: shutil.copyfile(source, tmp))
+
+    def put_bytes(self, url: str, data: bytes) -> Path:
+        """Store an in-memory response under its content hash."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        return self._put(url, sha256, lambda tmp: tmp.write_bytes(data))
+
+    def _objects(self) -> Iterator[Path]:
+        objects = self.directory / "objects"
+        return (path for path in objects.glob("*/*") if not path.name.startswith("."))
+
+    def evict(self) -> None:
+        """Delete least recently used blobs until the cache fits ``max_bytes``."""
+        with self._lock:
+            entries = []
+            for path in self._objects():
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+
+class CachingDownloader(Downloader):
+    """Downloader that serves repeat fetches from an ArtifactCache."""
+
+    def __init__(self, downloader: Downloader, cache: ArtifactCache):
+        self.downloader = downloader
+        self.cache = cache
+
+    def read(self, url: str) -> bytes:
+        # API responses (e.g. latest release lookups) are reused for a day
+        cached = self.cache.lookup(url, MUTABLE_URL_MAX_AGE)
+        if cached:
+            try:
+                data = cached.read_bytes()
+                if hashlib.sha256(data).hexdigest() == cached.name:
+                    return data
+                self.cache.discard(cached)
+            except OSError:
+                pass
+        data = self.downloader.read(url)
+        try:
+            self.cache.put_bytes(url, data)
+        except OSError:
+            pass
+        return data
+
+    def fetch(self, url: str, destination: Path, sha256: Optional[str] = None) -> Path:
+        if sha256:
+            # A pinned hash names the content exactly, whatever URL it came from
+            cached = self.cache.get(sha256)
+        else:
+            max_age = None if is_immutable_url(url) else MUTABLE_URL_MAX_AGE
+            cached = self.cache.lookup(url, max_age)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if cached:
+            try:
+                shutil.copyfile(cached, destination)
+                # Blobs are named by their hash, so a damaged one is refetched
+                if file_sha256(destination) == cached.name:
+                    return destination
+                self.cache.discard(cached)
+            except OSError:
+                pass  # Evicted since the lookup; download it again
+        self.downloader.fetch(url, destination, sha256)
+        try:
+            self.cache.put(url, destination, sha256)
+        except OSError:
+            pass  # A read-only or full cache must not fail the install
+        return destination
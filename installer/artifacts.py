@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import json
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from installer.interfaces import Downloader
+
+GITHUB_LATEST_RELEASE = "https://api.github.com/repos/{repo}/releases/latest"
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """A file installed straight from a URL rather than through a package manager."""
+
+    name: str
+    # May use {tag} and {version} (the tag without a leading "v")
+    url: str
+    # GitHub "owner/repo" whose latest release tag fills in the URL
+    repo: Optional[str] = None
+    # Expected content hash; the download fails if it does not match
+    sha256: Optional[str] = None
+
+    def latest_tag(self, downloader: Downloader) -> str:
+        """The tag of the repo's latest GitHub release."""
+        release = json.loads(
+            downloader.read(GITHUB_LATEST_RELEASE.format(repo=self.repo))
+        )
+        return release["tag_name"]
+
+    def url_for(self, tag: str) -> str:
+        return self.url.format(tag=tag, version=tag.lstrip("v"))
+
+    def resolve(self, downloader: Downloader) -> str:
+        """The concrete download URL, looking up the latest release if needed."""
+        if not self.repo:
+            return self.url
+        return self.url_for(self.latest_tag(downloader))
+
+    def pinned(self, url: str, sha256: str) -> "Artifact":
+        """This artifact fixed to one URL and content hash (no release lookup)."""
+        return replace(self, url=url, repo=None, sha256=sha256)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+# `kind "name"` with optional trailing arguments, e.g. `mas "Tailscale", id: 1475387142`
+ENTRY_PATTERN = re.compile(r'^\s*(\w+)\s+"([^"]+)"(.*)$')
+
+# brew bundle needs taps before the formulae that come from them
+KIND_ORDER = ("tap", "brew", "cask")
+# Kinds that `brew list` reports; other entries (taps, mas apps) are not checked
+LISTED_KINDS = ("brew", "cask")
+
+
+@dataclass(frozen=True)
+class BrewEntry:
+    """One Brewfile directive, e.g. ``brew "git"`` or ``cask "kitty"``."""
+
+    kind: str
+    name: str
+    # Anything after the name, such as `, id: 1475387142` for mas
+    arguments: str = ""
+
+    def render(self) -> str:
+        return f'{self.kind} "{self.name}"{self.arguments}'
+
+    @property
+    def installed_name(self) -> str:
+        """The name brew lists once installed, without any tap prefix."""
+        return self.name.rsplit("/", 1)[-1]
+
+    def is_installed(self, installed: Set[str]) -> bool:
+        return self.kind not in LISTED_KINDS or self.installed_name in installed
+
+
+def parse_brew_list(output: str) -> Set[str]:
+    """Installed formula and cask names from ``brew list --versions`` output."""
+    return {line.split()[0] for line in output.splitlines() if line.strip()}
+
+
+def _strip_comment(line: str) -> str:
+    """Drop a trailing ``#`` comment that is not inside a string."""
+    in_string = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_string = not in_string
+        elif char == "#" and not in_string:
+            return line[:index]
+    return line
+
+
+def parse_brewfile(path: Path) -> List[BrewEntry]:
+    """The directives in a Brewfile, in order; blank and comment lines are skipped."""
+    entries: List[BrewEntry] = []
+    for line in path.read_text().splitlines():
+        match = ENTRY_PATTERN.match(_strip_comment(line).rstrip())
+        if match:
+            kind, name, arguments = match.groups()
+            entries.append(BrewEntry(kind, name, arguments.rstrip()))
+    return entries
+
+
+@dataclass
+class BrewPlan:
+    """Several Brewfiles merged into one de-duplicated install."""
+
+    entries: List[BrewEntry] = field(default_factory=list)
+
+    @classmethod
+    def from_brewfiles(cls, paths: Iterable[Path]) -> "BrewPlan":
+        seen: Dict[Tuple[str, str], BrewEntry] = {}
+        for path in paths:
+            for entry in parse_brewfile(path):
+                # The first declaration wins, as brew bundle would install it
+                seen.setdefault((entry.kind, entry.name), entry)
+        entries = list(seen.values())
+        # Stable sort: taps, then formulae, then casks, then mas and the rest
+        entries.sort(
+            key=lambda entry: (
+                KIND_ORDER.index(entry.kind)
+                if entry.kind in KIND_ORDER
+                else len(KIND_ORDER)
+            )
+        )
+        return cls(entries)
+
+    def names(self, kind: str) -> List[str]:
+        return [entry.name for entry in self.entries if entry.kind == kind]
+
+    @property
+    def taps(self) -> List[str]:
+        return self.names("tap")
+
+    @property
+    def formulae(self) -> List[str]:
+        return self.names("brew")
+
+    @property
+    def casks(self) -> List[str]:
+        return self.names("cask")
+
+    def missing(self, installed: Set[str]) -> "BrewPlan":
+        """The entries not in an installed-package snapshot."""
+        return BrewPlan(
+            [entry for entry in self.entries if not entry.is_installed(installed)]
+        )
+
+    def render(self) -> str:
+        """The merged plan as a single Brewfile."""
+        return "".join(entry.render() + "\n" for entry in self.entries)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import tarfile
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+BUNDLE_VERSION = 1
+MANIFEST_FILE = "bundle.json"
+DEBS_DIR = "debs"
+RELEASES_DIR = "releases"
+GIT_DIR = "git"
+
+OH_MY_ZSH_REPO = "https://github.com/ohmyzsh/ohmyzsh.git"
+
+
+class BundleError(Exception):
+    """The archive is not a usable offline bundle."""
+
+
+def plugin_repos(plugins_file: Path) -> List[str]:
+    """GitHub "owner/repo" names listed in an antidote plugins file, in order."""
+    repos: List[str] = []
+    for line in plugins_file.read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            repo = line.split()[0]
+            if repo not in repos:
+                repos.append(repo)
+    return repos
+
+
+def clone_from_bundle(source: Path, target: str, origin: str) -> str:
+    """Clone a bundled checkout, then point it back at its upstream for updates."""
+    return (
+        f"git clone --quiet {shlex.quote(str(source))} {target} && "
+        f"git -C {target} remote set-url origin {origin}"
+    )
+
+
+def antidote_dirname(repo: str) -> str:
+    """Directory antidote clones ``owner/repo`` into (see zsh/03_plugins.zsh)."""
+    url = f"https://github.com/{repo}"
+    return url.replace(":", "-COLON-").replace("/", "-SLASH-")
+
+
+@dataclass
+class Bundle:
+    """An extracted offline bundle; every path lies under ``root``."""
+
+    root: Path
+    apt_packages: List[str]
+    artifacts: Dict[str, Path] = field(default_factory=dict)
+    # Git checkouts by name ("antidote", "ohmyzsh")
+    repos: Dict[str, Path] = field(default_factory=dict)
+    # Zsh plugin checkouts by GitHub "owner/repo"
+    plugins: Dict[str, Path] = field(default_factory=dict)
+    digest: str = ""
+
+    @property
+    def debs(self) -> Path:
+        return self.root / DEBS_DIR
+
+    def apt_source(self) -> str:
+        """A sources.list entry for the bundled .debs (a flat, unsigned repo)."""
+        return f"deb [trusted=yes] file:{self.debs} ./\n"
+
+
+def write_bundle(
+    root: Path,
+    output: Path,
+    apt_packages: List[str],
+    artifacts: Dict[str, Path],
+    repos: Dict[str, Path],
+    plugins: Dict[str, Path],
+) -> Path:
+    """Record the manifest in ``root`` and archive the directory to ``output``."""
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "apt_packages": apt_packages,
+        "artifacts": {
+            name: str(path.relative_to(root)) for name, path in artifacts.items()
+        },
+        "repos": {name: str(path.relative_to(root)) for name, path in repos.items()},
+        "plugins": {
+            repo: str(path.relative_to(root)) for repo, path in plugins.items()
+        },
+    }
+    (root / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2) + "\n")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = output.with_name(output.name + ".part")
+    # Uncompressed: .debs and release archives are compressed already, and
+    # extraction then runs at disk speed
+    with tarfile.open(partial, "w") as archive:
+        for entry in sorted(root.iterdir()):
+            archive.add(entry, arcname=entry.name)
+    os.replace(partial, output)
+    return output
+
+
+def _load_manifest(root: Path) -> Bundle:
+    try:
+        text = (root / MANIFEST_FILE).read_text()
+        manifest = json.loads(text)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"missing or invalid {MANIFEST_FILE}: {e}") from e
+    if manifest.get("version") != BUNDLE_VERSION:
+        raise BundleError(f"unsupported bundle version {manifest.get('version')}")
+    return Bundle(
+        root=root,
+        apt_packages=manifest["apt_packages"],
+        artifacts={name: root / path for name, path in manifest["artifacts"].items()},
+        repos={name: root / path for name, path in manifest["repos"].items()},
+        plugins={repo: root / path for repo, path in manifest["plugins"].items()},
+        digest=hashlib.sha256(text.encode()).hexdigest(),
+    )
+
+
+@contextmanager
+def open_bundle(path: Path) -> Iterator[Bundle]:
+    """Extract a bundle archive to a temporary directory for the install."""
+    root = Path(tempfile.mkdtemp(prefix="dotfiles-bundle-"))
+    try:
+        # apt reads file: repositories as the unprivileged _apt user
+        root.chmod(0o755)
+        try:
+            with tarfile.open(path) as archive:
+                if hasattr(tarfile, "data_filter"):
+                    archive.extractall(root, filter="data")
+                else:
+                    archive.extractall(root)
+        except (OSError, tarfile.TarError) as e:
+            raise BundleError(f"cannot extract {path}: {e}") from e
+        yield _load_manifest(root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
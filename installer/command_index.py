@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class CommandIndex:
+    """In-process replacement for ``command -v``: scans $PATH once and memoizes lookups."""
+
+    def __init__(self, search_path: Optional[str] = None):
+        self._search_path = search_path
+        self._candidates: Optional[Dict[str, List[str]]] = None
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._stale: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _path_dirs(self) -> List[str]:
+        search_path = self._search_path
+        if search_path is None:
+            search_path = os.environ.get("PATH", os.defpath)
+        dirs: List[str] = []
+        for entry in search_path.split(os.pathsep):
+            entry = entry or "."
+            if entry not in dirs:
+                dirs.append(entry)
+        return dirs
+
+    def _scan(self) -> Dict[str, List[str]]:
+        """List every $PATH directory once, keeping candidates in $PATH order."""
+        candidates: Dict[str, List[str]] = {}
+        for directory in self._path_dirs():
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        candidates.setdefault(entry.name, []).append(entry.path)
+            except OSError:
+                continue
+        return candidates
+
+    @staticmethod
+    def _is_executable(path: str) -> bool:
+        return os.path.isfile(path) and os.access(path, os.X_OK)
+
+    def _probe(self, command: str) -> Optional[str]:
+        """Resolve one command by checking each $PATH directory directly."""
+        for directory in self._path_dirs():
+            path = os.path.join(directory, command)
+            if self._is_executable(path):
+                return path
+        return None
+
+    def which(self, command: str) -> Optional[str]:
+        """Return the full path ``command`` resolves to, or None."""
+        if os.sep in command:
+            return command if self._is_executable(command) else None
+
+        with self._lock:
+            if command in self._resolved:
+                return self._resolved[command]
+
+            if command in self._stale:
+                # Something was just installed: probe instead of rescanning $PATH
+                self._stale.discard(command)
+                path = self._probe(command)
+            else:
+                if self._candidates is None:
+                    self._candidates = self._scan()
+                path = next(
+                    (
+                        candidate
+                        for candidate in self._candidates.get(command, [])
+                        if self._is_executable(candidate)
+                    ),
+                    None,
+                )
+
+            self._resolved[command] = path
+            return path
+
+    def invalidate(self, commands: Optional[Iterable[str]] = None) -> None:
+        """Forget lookups for ``commands``, or the whole index when None."""
+        with self._lock:
+            if commands is None:
+                self._candidates = None
+                self._resolved.clear()
+                self._stale.clear()
+                return
+            for command in commands:
+                self._resolved.pop(command, None)
+                self._stale.add(command)
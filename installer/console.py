@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+
+from rich.console import Console
+
+# Shared by every module so all output goes through one terminal writer
+console = Console()
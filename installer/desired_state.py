@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import os
+import stat
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from installer.enums import LinkAction, OSType
+
+
+@dataclass(frozen=True)
+class DesiredLink:
+    """A symlink the dotfiles want in place, owned by an install component."""
+
+    component: str
+    source: Path
+    target: Path
+    description: str
+
+
+@dataclass(frozen=True)
+class LinkChange:
+    """A desired link paired with what applying it would do."""
+
+    link: DesiredLink
+    action: LinkAction
+    # Current link destination for REPLACE, file type for CONFLICT
+    current: Optional[str] = None
+
+
+def build_desired_state(dotfiles_dir: Path, os_type: OSType) -> List[DesiredLink]:
+    """Every symlink the installer manages, in install order."""
+    home = Path.home()
+    links: List[DesiredLink] = []
+
+    def add(component: str, source: Path, target: Path, description: str) -> None:
+        if source.exists():
+            links.append(DesiredLink(component, source, target, description))
+
+    # Shell
+    for source_path, target_file, description in [
+        ("zsh/.zshrc", ".zshrc", "Zsh configuration"),
+        ("zsh/.zsh_plugins", ".zsh_plugins", "Zsh plugins"),
+        ("zsh/.p10k.zsh", ".p10k.zsh", "Powerlevel10k theme"),
+        ("zsh/.zlogin", ".zlogin", "Zsh login script"),
+    ]:
+        add("shell", dotfiles_dir / source_path, home / target_file, description)
+    add(
+        "shell",
+        dotfiles_dir / "iterm" / "steeef-lambda.zsh-theme",
+        home / ".oh-my-zsh" / "custom" / "themes" / "steeef-lambda.zsh-theme",
+        "Custom Zsh theme",
+    )
+    zsh_config_dir = home / ".config" / "zsh"
+    for module_file in sorted((dotfiles_dir / "zsh").glob("*.zsh")):
+        add(
+            "shell",
+            module_file,
+            zsh_config_dir / module_file.name,
+            f"Zsh module: {module_file.name}",
+        )
+    platform_dirs = ["macos"] if os_type == OSType.MACOS else ["linux", "ubuntu"]
+    for platform_dir in platform_dirs:
+        add(
+            "shell",
+            dotfiles_dir / "zsh" / platform_dir,
+            zsh_config_dir / platform_dir,
+            f"Zsh platform dir: {platform_dir}",
+        )
+
+    # Git (~/.gitconfig itself is a machine-managed plain file, never linked)
+    git_config_dir = home / ".config" / "git"
+    add(
+        "git",
+        dotfiles_dir / "git" / ".gitconfig",
+        git_config_dir / ".gitconfig",
+        "Git configuration",
+    )
+    add(
+        "git",
+        dotfiles_dir / "git" / ".gitignore_global",
+        home / ".gitignore_global",
+        "Global gitignore",
+    )
+    for name in (".gitconfig-personal",):
+        add(
+            "git",
+            dotfiles_dir / "git" / name,
+            git_config_dir / name,
+            f"Git config: {name}",
+        )
+
+    # Editors and tool configs
+    add("vim", dotfiles_dir / "vim" / ".vimrc", home / ".vimrc", "Vim configuration")
+    add(
+        "nvim", dotfiles_dir / "nvim", home / ".config" / "nvim", "Neovim configuration"
+    )
+    add(
+        "mise",
+        dotfiles_dir / "mise" / "config.toml",
+        home / ".config" / "mise" / "config.toml",
+        "mise global config",
+    )
+    add(
+        "direnv",
+        dotfiles_dir / "direnv" / "direnvrc",
+        home / ".config" / "direnv" / "direnvrc",
+        "direnv global config",
+    )
+
+    if os_type == OSType.MACOS:
+        add(
+            "borders",
+            dotfiles_dir / "borders" / "bordersrc",
+            home / ".config" / "borders" / "bordersrc",
+            "borders config",
+        )
+
+        add(
+            "aerospace",
+            dotfiles_dir / "aerospace" / ".aerospace.toml",
+            home / ".aerospace.toml",
+            "AeroSpace configuration",
+        )
+        ubersicht_config_dir = home / ".config" / "ubersicht" / "simple-bar"
+        for script in (
+            "aerospace-mode-tracker.sh",
+            "sync-simplebar-displays.sh",
+            "sync-and-reload.sh",
+        ):
+            add(
+                "aerospace",
+                dotfiles_dir / "ubersicht" / "simple-bar" / script,
+                ubersicht_config_dir / script,
+                f"simple-bar script: {script}",
+            )
+
+        add(
+            "iterm",
+            dotfiles_dir / "iterm" / "iterm-profiles.json",
+            home
+            / "Library"
+            / "Application Support"
+            / "iTerm2"
+            / "DynamicProfiles"
+            / "iterm-profiles.json",
+            "iTerm2 profiles",
+        )
+
+        kitty_dir = home / ".config" / "kitty"
+        add(
+            "kitty",
+            dotfiles_dir / "kitty" / "kitty.conf",
+            kitty_dir / "kitty.conf",
+            "Kitty configuration",
+        )
+        add(
+            "kitty",
+            dotfiles_dir / "kitty" / "kitty-customizations",
+            kitty_dir / "kitty-customizations",
+            "Kitty customizations",
+        )
+        # tab_bar.py must be at the kitty config root (not in a subdirectory)
+        add(
+            "kitty",
+            dotfiles_dir / "kitty" / "kitty-customizations" / "tab_bar.py",
+            kitty_dir / "tab_bar.py",
+            "Kitty tab bar",
+        )
+
+    return links
+
+
+def points_to(target: Path, source: Path) -> bool:
+    """True when the link at ``target`` resolves to ``source``, e.g. through a
+    symlinked parent such as a dotfiles checkout under a linked ~/dev."""
+    try:
+        return os.path.realpath(target, strict=True) == os.path.realpath(source)
+    except OSError:
+        return False
+
+
+def diff_link(link: DesiredLink) -> LinkChange:
+    """Compare one desired link to the filesystem with a single lstat."""
+    try:
+        st = os.lstat(link.target)
+    except FileNotFoundError:
+        return LinkChange(link, LinkAction.CREATE)
+    except NotADirectoryError:
+        return LinkChange(link, LinkAction.CONFLICT, "parent is not a directory")
+
+    if stat.S_ISLNK(st.st_mode):
+        current = os.readlink(link.target)
+        resolved = os.path.normpath(os.path.join(link.target.parent, current))
+        if current == str(link.source) or resolved == str(link.source):
+            return LinkChange(link, LinkAction.SKIP, current)
+        if points_to(link.target, link.source):
+            return LinkChange(link, LinkAction.SKIP, current)
+        return LinkChange(link, LinkAction.REPLACE, current)
+
+    kind = "directory" if stat.S_ISDIR(st.st_mode) else "file"
+    return LinkChange(link, LinkAction.CONFLICT, kind)
+
+
+def diff_links(links: List[DesiredLink]) -> List[LinkChange]:
+    """Compare the desired state to the filesystem in one pass."""
+    return [diff_link(link) for link in links]
+
+
+def summarize(changes: List[LinkChange]) -> Dict[LinkAction, int]:
+    """Count changes by action."""
+    counts = {action: 0 for action in LinkAction}
+    for change in changes:
+        counts[change.action] += 1
+    return counts
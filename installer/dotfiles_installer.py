@@ -1,48 +1,116 @@
 #!/usr/bin/env python3
 
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
-from rich.console import Console
 from rich.panel import Panel
-from rich.prompt import Confirm
+from rich.prompt import Confirm, Prompt
 from rich.table import Table
 
-from installer.enums import OSType
-from installer.interfaces import Installer
-from installer.macos_manager import ConcreteMacOSManager
-from installer.package_managers import create_package_manager
-from installer.symlink_manager import ConcreteSymlinkManager
+from installer.console import console
+from installer.desired_state import (
+    LinkChange,
+    build_desired_state,
+    diff_links,
+    summarize,
+)
+from installer.enums import ConflictPolicy, LinkAction, OSType, StepResource
+from installer.interfaces import Installer, PackageManager, SystemManager
+from installer.link_journal import prune_journals
+from installer.manifest import InstallManifest
+from installer.scheduler import Step, StepScheduler
+from installer.symlink_manager import ConcreteSymlinkManager, record_links
 from installer.system_manager import ConcreteSystemManager
+from installer.tracing import traced
 
-console = Console()
+if TYPE_CHECKING:
+    from installer.bundle import Bundle
+
+STATUS_SCHEMA_VERSION = 1
+STATUS_LINK_STATES = {
+    LinkAction.SKIP: "linked",
+    LinkAction.CREATE: "missing",
+    LinkAction.REPLACE: "linked_elsewhere",
+    LinkAction.CONFLICT: "conflict",
+}
+
+
+def _probe_version(tool: str, timeout: float) -> Optional[str]:
+    """First line of ``tool --version``, or None if it fails or times out."""
+    try:
+        result = subprocess.run(
+            [tool, "--version"], capture_output=True, text=True, timeout=timeout
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if result.returncode == 0 and output else None
+
+
+def _probe_versions(tools: List[str], timeout: float) -> Dict[str, Optional[str]]:
+    """Probe tool versions concurrently; each probe is bounded by ``timeout``."""
+    if not tools:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(tools)) as pool:
+        versions = pool.map(lambda tool: _probe_version(tool, timeout), tools)
+        return dict(zip(tools, versions))
 
 
 class DotfilesInstaller(Installer):
     """Main installer implementation for dotfiles configuration."""
 
-    def __init__(self, dotfiles_dir: Path):
+    def __init__(
+        self,
+        dotfiles_dir: Path,
+        system_manager: Optional[SystemManager] = None,
+        symlink_manager: Optional[ConcreteSymlinkManager] = None,
+        package_manager: Optional[PackageManager] = None,
+        cache_dir: Optional[Path] = None,
+        bundle: Optional["Bundle"] = None,
+    ):
         self.dotfiles_dir = dotfiles_dir
-        self.system_manager = ConcreteSystemManager()
-        self.symlink_manager = ConcreteSymlinkManager()
-        self.macos_manager = (
-            ConcreteMacOSManager()
-            if self.system_manager.get_os_type() == OSType.MACOS
-            else None
+        self.package_manager = package_manager
+        self.cache_dir = cache_dir
+        self.bundle = bundle
+        self.system_manager = system_manager or ConcreteSystemManager()
+        self.symlink_manager = symlink_manager or ConcreteSymlinkManager(
+            self.system_manager
         )
+        self.macos_manager = None
+        if self.system_manager.get_os_type() == OSType.MACOS:
+            # OS-specific managers are only imported on the OS that uses them
+            from installer.macos_manager import ConcreteMacOSManager
+
+            self.macos_manager = ConcreteMacOSManager(self.symlink_manager)
 
         # Check if OS is supported
         if not self.system_manager.is_supported():
             console.print("[red]Unsupported operating system. Exiting.[/red]")
             raise SystemExit(1)
 
+    @traced("DotfilesInstaller.install")
     def install(
         self,
         skip_packages: bool = False,
         skip_shell: bool = False,
         skip_system: bool = False,
         interactive: bool = True,
+        only: Optional[List[str]] = None,
+        jobs: int = 4,
+        force: bool = False,
+        refresh: bool = False,
+        on_conflict: Optional[ConflictPolicy] = None,
     ) -> None:
-        """Run the installation process."""
+        """Run the installation process.
+
+        ``refresh`` reruns the packages step and updates the package index.
+        ``on_conflict`` settles existing targets up front; by default the user
+        picks a policy, or existing targets are backed up when not interactive.
+        """
 
         os_type = self.system_manager.get_os_type()
         console.print(f"[cyan]Detected OS: {os_type}[/cyan]")
@@ -56,8 +124,58 @@ class DotfilesInstaller(Installer):
             )
         )
 
+        steps = self._build_steps(
+            os_type, skip_packages, skip_shell, skip_system, interactive, refresh
+        )
+        scheduler = StepScheduler(steps, max_workers=jobs)
+        if only:
+            try:
+                scheduler.select(only)
+            except KeyError as e:
+                console.print(f"[red]Unknown component: {e.args[0]}[/red]")
+                console.print(
+                    f"Available components: {', '.join(step.name for step in steps)}"
+                )
+                raise SystemExit(1)
+            console.print(f"[cyan]Running only: {', '.join(scheduler.steps)}[/cyan]")
+
+        # Build the desired state once; symlink steps apply only this changeset
+        changes = self._diff()
+
+        # Skip steps whose inputs and outputs match the install manifest
+        manifest = InstallManifest.load()
+        cached: Dict[str, Tuple[int, int]] = {}
+        for step in list(scheduler.steps.values()):
+            fingerprint = manifest.fingerprint(step.name, step.inputs)
+            rerun = force or (refresh and step.name == "packages")
+            if not rerun and manifest.is_current(
+                step.name, fingerprint, self.system_manager, step.probe
+            ):
+                cached[step.name] = manifest.result(step.name)
+            else:
+                step.run = self._recorded(step, fingerprint, manifest)
+        scheduler.discard(cached)
+
+        if not scheduler.steps:
+            console.print(
+                "[green]✓ Everything is up to date (use --force to rerun)[/green]"
+            )
+            return
+        if cached:
+            console.print(f"[green]✓ Up to date: {', '.join(cached)}[/green]")
+
         # Show installation plan
-        self._show_installation_plan(os_type, skip_packages, skip_shell, skip_system)
+        self._show_installation_plan(list(scheduler.steps.values()), changes)
+        conflicts = [
+            change
+            for change in changes
+            if change.action in (LinkAction.REPLACE, LinkAction.CONFLICT)
+            and change.link.component in scheduler.steps
+        ]
+        resolutions, policy = self._resolve_conflicts(
+            conflicts, on_conflict, interactive
+        )
+        self.symlink_manager.set_plan(changes, resolutions, policy)
 
         if interactive and not Confirm.ask(
             "\n[bold]Proceed with installation?[/bold]", default=True
@@ -65,99 +183,271 @@ class DotfilesInstaller(Installer):
             console.print("[yellow]Installation cancelled.[/yellow]")
             return
 
-        success_count = 0
-        total_steps = 0
+        journal = self.symlink_manager.begin_journal()
+        try:
+            results = scheduler.run()
+        finally:
+            journal.close()
+        prune_journals()
+        manifest.save()
+        results.update(cached)
+        success_count = sum(success for success, _ in results.values())
+        total_steps = sum(total for _, total in results.values())
+
+        # Installation summary
+        self._show_installation_summary(success_count, total_steps, os_type)
+        if success_count < total_steps and journal.entries():
+            console.print(
+                "[yellow]Run 'dot rollback' to undo this run's symlink changes[/yellow]"
+            )
+
+    def _recorded(
+        self, step: Step, fingerprint: str, manifest: InstallManifest
+    ) -> Callable[[], Tuple[int, int]]:
+        """Wrap a step so a fully successful run is recorded in the manifest."""
+        run = step.run
+
+        def recorded_run() -> Tuple[int, int]:
+            manifest.forget(step.name)
+            with record_links() as links:
+                success, total = run()
+            if total and success == total:
+                manifest.record(
+                    step.name, fingerprint, (success, total), links, list(step.commands)
+                )
+            return success, total
+
+        return recorded_run
+
+    def _build_steps(
+        self,
+        os_type: OSType,
+        skip_packages: bool,
+        skip_shell: bool,
+        skip_system: bool,
+        interactive: bool,
+        refresh: bool = False,
+    ) -> List[Step]:
+        """Declare the install steps and their dependencies for this OS."""
+        dotfiles_dir = self.dotfiles_dir
+        symlinks = self.symlink_manager
+
+        def single(setup: Callable[[], bool]) -> Callable[[], Tuple[int, int]]:
+            return lambda: (int(setup()), 1)
+
+        steps: List[Step] = []
 
-        # Package installation
         if not skip_packages:
-            total_steps += 1
-            package_manager = create_package_manager(os_type, self.dotfiles_dir)
-            if package_manager.install_packages(self.system_manager):
-                success_count += 1
+            package_manager = self.package_manager
+            if package_manager is None:
+                from installer.package_managers import create_package_manager
+
+                package_manager = create_package_manager(
+                    os_type, dotfiles_dir, self.cache_dir, self.bundle
+                )
+            steps.append(
+                Step(
+                    "packages",
+                    f"{package_manager.get_package_manager_name()} packages",
+                    single(
+                        lambda: package_manager.install_packages(
+                            self.system_manager, refresh
+                        )
+                    ),
+                    resource=StepResource.NETWORK,
+                    inputs=tuple(package_manager.get_inputs()),
+                    commands=(
+                        ("brew",) if os_type == OSType.MACOS else ("zsh", "git", "nvim")
+                    ),
+                )
+            )
 
-        # Shell configuration
         if not skip_shell:
-            shell_success, shell_steps = self.symlink_manager.setup_shell_config(
-                self.dotfiles_dir
+            # Oh My Zsh is fetched with curl and run with zsh, both of which the
+            # package phase provides on a fresh machine.
+            steps.append(
+                Step(
+                    "shell",
+                    "Zsh, Oh My Zsh, plugins",
+                    lambda: symlinks.setup_shell_config(
+                        dotfiles_dir,
+                        self.bundle.repos.get("ohmyzsh") if self.bundle else None,
+                    ),
+                    depends_on=("packages",),
+                    resource=StepResource.NETWORK,
+                    inputs=(
+                        dotfiles_dir / "zsh",
+                        dotfiles_dir / "iterm" / "steeef-lambda.zsh-theme",
+                    ),
+                )
             )
-            success_count += shell_success
-            total_steps += shell_steps
-
-        # Git configuration
-        if self.symlink_manager.setup_git_config(self.dotfiles_dir):
-            success_count += 1
-        total_steps += 1
-
-        # Vim configuration
-        if self.symlink_manager.setup_vim_config(self.dotfiles_dir):
-            success_count += 1
-        total_steps += 1
-
-        # Neovim configuration
-        if self.symlink_manager.setup_nvim_config(self.dotfiles_dir):
-            success_count += 1
-        total_steps += 1
-
-        # mise configuration
-        if self.symlink_manager.setup_mise_config(self.dotfiles_dir):
-            success_count += 1
-        total_steps += 1
-
-        # direnv configuration
-        if self.symlink_manager.setup_direnv_config(self.dotfiles_dir):
-            success_count += 1
-        total_steps += 1
-
-        # borders configuration (macOS only)
+
+        steps.extend(
+            [
+                Step(
+                    "git",
+                    "Git configuration",
+                    single(lambda: symlinks.setup_git_config(dotfiles_dir)),
+                    inputs=(dotfiles_dir / "git",),
+                ),
+                Step(
+                    "vim",
+                    "Vim configuration",
+                    single(lambda: symlinks.setup_vim_config(dotfiles_dir)),
+                    inputs=(dotfiles_dir / "vim" / ".vimrc",),
+                ),
+                Step(
+                    "nvim",
+                    "Neovim configuration",
+                    single(lambda: symlinks.setup_nvim_config(dotfiles_dir)),
+                    inputs=(dotfiles_dir / "nvim",),
+                ),
+                Step(
+                    "mise",
+                    "mise configuration",
+                    single(lambda: symlinks.setup_mise_config(dotfiles_dir)),
+                    inputs=(dotfiles_dir / "mise" / "config.toml",),
+                ),
+                Step(
+                    "direnv",
+                    "direnv configuration",
+                    single(lambda: symlinks.setup_direnv_config(dotfiles_dir)),
+                    inputs=(dotfiles_dir / "direnv" / "direnvrc",),
+                ),
+            ]
+        )
+
         if os_type == OSType.MACOS:
-            if self.symlink_manager.setup_borders_config(self.dotfiles_dir):
-                success_count += 1
-            total_steps += 1
-
-        # macOS-specific configurations
-        if os_type == OSType.MACOS and self.macos_manager:
-            # AeroSpace configuration
-            if self.macos_manager.setup_aerospace_config(self.dotfiles_dir):
-                success_count += 1
-            total_steps += 1
-
-            # iTerm2 configuration
-            if self.macos_manager.setup_iterm_config(self.dotfiles_dir):
-                success_count += 1
-            total_steps += 1
-
-            # Kitty quick-access-terminal setup
-            if self.macos_manager.setup_kitty_quick_access(self.system_manager):
-                success_count += 1
-            total_steps += 1
-
-            # Übersicht setup
-            ubersicht_success, ubersicht_steps = self.macos_manager.setup_ubersicht(
-                self.dotfiles_dir, self.system_manager, interactive
+            steps.append(
+                Step(
+                    "borders",
+                    "borders configuration",
+                    single(lambda: symlinks.setup_borders_config(dotfiles_dir)),
+                    inputs=(dotfiles_dir / "borders" / "bordersrc",),
+                )
             )
-            success_count += ubersicht_success
-            total_steps += ubersicht_steps
 
-            # System preferences
+        macos = self.macos_manager
+        if os_type == OSType.MACOS and macos:
+            steps.extend(
+                [
+                    Step(
+                        "aerospace",
+                        "AeroSpace configuration",
+                        single(lambda: macos.setup_aerospace_config(dotfiles_dir)),
+                        inputs=(
+                            dotfiles_dir / "aerospace" / ".aerospace.toml",
+                            dotfiles_dir / "ubersicht" / "simple-bar",
+                        ),
+                    ),
+                    Step(
+                        "iterm",
+                        "iTerm2 profiles",
+                        single(lambda: macos.setup_iterm_config(dotfiles_dir)),
+                        inputs=(dotfiles_dir / "iterm" / "iterm-profiles.json",),
+                    ),
+                    Step(
+                        "kitty-quick-access",
+                        "Kitty quick-access-terminal",
+                        single(
+                            lambda: macos.setup_kitty_quick_access(self.system_manager)
+                        ),
+                        depends_on=("packages",),
+                        commands=("kitten",),
+                    ),
+                    Step(
+                        "ubersicht",
+                        "Übersicht and simple-bar",
+                        lambda: macos.setup_ubersicht(
+                            dotfiles_dir, self.system_manager, interactive
+                        ),
+                        depends_on=("packages", "aerospace"),
+                        resource=StepResource.PROMPT,
+                        inputs=(dotfiles_dir / "ubersicht",),
+                        probe=macos.ubersicht_installed,
+                    ),
+                ]
+            )
             if not skip_system:
-                if self.macos_manager.configure_system_preferences(
-                    self.system_manager, interactive
-                ):
-                    success_count += 1
-                total_steps += 1
-
-        # Kitty configuration (cross-platform)
-        kitty_success, kitty_steps = self.symlink_manager.setup_kitty_config(
-            self.dotfiles_dir
-        )
-        success_count += kitty_success
-        total_steps += kitty_steps
+                steps.append(
+                    Step(
+                        "system",
+                        "macOS system preferences",
+                        single(
+                            lambda: macos.configure_system_preferences(
+                                self.system_manager, interactive
+                            )
+                        ),
+                        resource=StepResource.PROMPT,
+                        probe=macos.system_preferences_current,
+                    )
+                )
+
+        # Kitty configuration (setup_kitty_config is a no-op on Linux servers)
+        if os_type == OSType.MACOS:
+            steps.append(
+                Step(
+                    "kitty",
+                    "Kitty terminal configuration",
+                    lambda: symlinks.setup_kitty_config(dotfiles_dir),
+                    inputs=(dotfiles_dir / "kitty",),
+                )
+            )
 
-        # Installation summary
-        self._show_installation_summary(success_count, total_steps, os_type)
+        return steps
+
+    def status(
+        self, as_json: bool = False, versions: bool = False, timeout: float = 2.0
+    ) -> bool:
+        """Show the current status of dotfiles configuration. Returns False on drift."""
+        os_type = self.system_manager.get_os_type()
+        changes = self._diff()
+        tools = (
+            ["brew", "git", "zsh", "nvim", "mise", "fzf", "direnv"]
+            if os_type == OSType.MACOS
+            else ["git", "zsh", "nvim", "mise", "fzf", "direnv", "apt"]
+        )
+        installed = {
+            tool: self.system_manager.check_command_exists(tool) for tool in tools
+        }
+        tool_versions = (
+            _probe_versions([tool for tool in tools if installed[tool]], timeout)
+            if versions
+            else {}
+        )
+        link_drift = sum(change.action != LinkAction.SKIP for change in changes)
+        tool_drift = sum(not present for present in installed.values())
+
+        if as_json:
+            report = {
+                "schema_version": STATUS_SCHEMA_VERSION,
+                "os": str(os_type),
+                "dotfiles_dir": str(self.dotfiles_dir),
+                "ok": not (link_drift or tool_drift),
+                "drift": {"links": link_drift, "tools": tool_drift},
+                "links": [
+                    {
+                        "component": change.link.component,
+                        "description": change.link.description,
+                        "source": str(change.link.source),
+                        "target": str(change.link.target),
+                        "state": STATUS_LINK_STATES[change.action],
+                        "current": change.current,
+                    }
+                    for change in changes
+                ],
+                "tools": [
+                    {
+                        "name": tool,
+                        "installed": installed[tool],
+                        "version": tool_versions.get(tool),
+                    }
+                    for tool in tools
+                ],
+            }
+            sys.stdout.write(json.dumps(report, indent=2) + "\n")
+            return not (link_drift or tool_drift)
 
-    def status(self) -> None:
-        """Show the current status of dotfiles configuration."""
         console.print(
             Panel.fit(
                 "[bold blue]Dotfiles Status Check[/bold blue]", border_style="blue"
@@ -169,110 +459,172 @@ class DotfilesInstaller(Installer):
         table.add_column("Status", style="bold")
         table.add_column("Path")
 
-        configs = [
-            ("zsh/.zshrc", ".zshrc", "Zsh configuration"),
-            ("zsh/.p10k.zsh", ".p10k.zsh", "Powerlevel10k theme"),
-            ("git/.gitconfig", ".config/git/.gitconfig", "Git configuration"),
-            ("git/.gitignore_global", ".gitignore_global", "Global gitignore"),
-            ("vim/.vimrc", ".vimrc", "Vim configuration"),
-            ("nvim", ".config/nvim", "Neovim configuration"),
-            ("kitty/kitty.conf", ".config/kitty/kitty.conf", "Kitty configuration"),
-            ("mise/config.toml", ".config/mise/config.toml", "mise config"),
-            ("direnv/direnvrc", ".config/direnv/direnvrc", "direnv config"),
-        ]
-
-        # Add macOS-specific configs
-        if self.system_manager.get_os_type() == OSType.MACOS:
-            configs.extend(
-                [
-                    (
-                        "borders/bordersrc",
-                        ".config/borders/bordersrc",
-                        "borders config",
-                    ),
-                    (
-                        "aerospace/.aerospace.toml",
-                        ".aerospace.toml",
-                        "AeroSpace configuration",
-                    ),
-                    (
-                        "iterm/iterm-profiles.json",
-                        "Library/Application Support/iTerm2/DynamicProfiles/iterm-profiles.json",
-                        "iTerm2 profiles",
-                    ),
-                ]
+        labels = {
+            LinkAction.SKIP: "[green]✓ Linked[/green]",
+            LinkAction.REPLACE: "[yellow]⚠ Linked elsewhere[/yellow]",
+            LinkAction.CONFLICT: "[yellow]⚠ File exists (not linked)[/yellow]",
+            LinkAction.CREATE: "[red]✗ Not configured[/red]",
+        }
+        for change in changes:
+            table.add_row(
+                change.link.description, labels[change.action], str(change.link.target)
             )
 
-        for source_path, target_path, description in configs:
-            target = Path.home() / target_path
-            source = self.dotfiles_dir / source_path
-
-            if target.is_symlink() and target.resolve() == source:
-                status = "[green]✓ Linked[/green]"
-            elif target.exists():
-                status = "[yellow]⚠ File exists (not linked)[/yellow]"
-            else:
-                status = "[red]✗ Not configured[/red]"
-
-            table.add_row(description, status, str(target))
-
         console.print(table)
 
         # Check tools
         console.print("\n[bold cyan]Installed Tools:[/bold cyan]")
-        tools = (
-            ["brew", "git", "zsh", "nvim", "mise", "fzf", "direnv"]
-            if self.system_manager.get_os_type() == OSType.MACOS
-            else ["git", "zsh", "nvim", "mise", "fzf", "direnv", "apt"]
-        )
         for tool in tools:
-            status = (
-                "[green]✓[/green]"
-                if self.system_manager.check_command_exists(tool)
-                else "[red]✗[/red]"
+            status = "[green]✓[/green]" if installed[tool] else "[red]✗[/red]"
+            version = tool_versions.get(tool)
+            console.print(
+                f"{status} {tool}" + (f" [dim]{version}[/dim]" if version else "")
             )
-            console.print(f"{status} {tool}")
+
+        return not (link_drift or tool_drift)
+
+    def _diff(self) -> List[LinkChange]:
+        """Build the desired state and compare it to the filesystem."""
+        links = build_desired_state(
+            self.dotfiles_dir, self.system_manager.get_os_type()
+        )
+        return diff_links(links)
+
+    def plan(self, show_all: bool = False) -> None:
+        """Show exactly which symlinks an install would create, replace or skip."""
+        changes = self._diff()
+        table = Table(title="Planned Changes")
+        table.add_column("Action", style="bold")
+        table.add_column("Component", style="cyan")
+        table.add_column("Target")
+        table.add_column("Detail")
+
+        styles = {
+            LinkAction.CREATE: "green",
+            LinkAction.REPLACE: "yellow",
+            LinkAction.CONFLICT: "red",
+            LinkAction.SKIP: "dim",
+        }
+        for change in changes:
+            if change.action == LinkAction.SKIP and not show_all:
+                continue
+            if change.action == LinkAction.REPLACE:
+                detail = f"{change.current} → {change.link.source}"
+            elif change.action == LinkAction.CONFLICT:
+                detail = f"existing {change.current}"
+            else:
+                detail = str(change.link.source)
+            style = styles[change.action]
+            table.add_row(
+                f"[{style}]{change.action}[/{style}]",
+                change.link.component,
+                str(change.link.target),
+                detail,
+            )
+
+        counts = summarize(changes)
+        if table.row_count:
+            console.print(table)
+        console.print(
+            f"{counts[LinkAction.CREATE]} to create, "
+            f"{counts[LinkAction.REPLACE]} to replace, "
+            f"{counts[LinkAction.CONFLICT]} conflicts, "
+            f"{counts[LinkAction.SKIP]} unchanged"
+        )
 
     def _show_installation_plan(
-        self, os_type: OSType, skip_packages: bool, skip_shell: bool, skip_system: bool
+        self, steps: List[Step], changes: List[LinkChange]
     ) -> None:
-        """Show the installation plan based on OS and options."""
+        """Show the steps that will run and the link changes each one makes."""
         table = Table(title="Installation Plan")
         table.add_column("Component", style="cyan")
-        table.add_column("Status", style="green")
         table.add_column("Description")
+        table.add_column("Changes", style="green")
+
+        by_component: Dict[str, List[LinkChange]] = {}
+        for change in changes:
+            by_component.setdefault(change.link.component, []).append(change)
+
+        for step in steps:
+            counts = summarize(by_component.get(step.name, []))
+            summary = ", ".join(
+                f"{counts[action]} {action}"
+                for action in (
+                    LinkAction.CREATE,
+                    LinkAction.REPLACE,
+                    LinkAction.CONFLICT,
+                )
+                if counts[action]
+            )
+            table.add_row(step.name, step.description, summary or "Install")
 
-        package_manager = (
-            "Homebrew" if os_type == OSType.MACOS else "APT (Ubuntu/Debian)"
-        )
-        table.add_row(
-            "Packages",
-            "Skip" if skip_packages else "Install",
-            f"{package_manager} and development tools",
-        )
-        table.add_row(
-            "Shell Config",
-            "Skip" if skip_shell else "Install",
-            "Zsh, Oh My Zsh, plugins",
-        )
-        table.add_row("Git Config", "Install", "Git configuration and aliases")
-        table.add_row("Vim Config", "Install", "Vim editor configuration")
-        table.add_row("Neovim Config", "Install", "Neovim with lazy.nvim")
+        console.print(table)
 
-        if os_type == OSType.MACOS:
-            table.add_row("AeroSpace", "Install", "Window management (macOS only)")
-            table.add_row("iTerm2", "Install", "Terminal profiles (macOS only)")
-            table.add_row("Übersicht", "Install", "Status bar and widgets (macOS only)")
-            table.add_row(
-                "System Prefs",
-                "Skip" if skip_system else "Install",
-                "macOS system preferences",
+    def _resolve_conflicts(
+        self,
+        conflicts: List[LinkChange],
+        policy: Optional[ConflictPolicy],
+        interactive: bool,
+    ) -> Tuple[Dict[Path, ConflictPolicy], ConflictPolicy]:
+        """Settle every existing target before any step runs.
+
+        Returns the decision per target, and the policy for conflicts that
+        appear mid-install (e.g. a ~/.zshrc written by the Oh My Zsh installer).
+        """
+        if policy == ConflictPolicy.ASK and not interactive:
+            console.print(
+                "[yellow]⚠ Cannot ask per conflict without --interactive; "
+                "backing up existing targets[/yellow]"
+            )
+            policy = ConflictPolicy.BACKUP
+        if policy is None:
+            policy = ConflictPolicy.ASK if interactive else ConflictPolicy.BACKUP
+        if not conflicts:
+            return {}, (
+                ConflictPolicy.BACKUP if policy == ConflictPolicy.ASK else policy
             )
 
-        table.add_row("Kitty", "Install", "Kitty terminal configuration")
-
+        table = Table(title="Existing Targets")
+        table.add_column("Component", style="cyan")
+        table.add_column("Target")
+        table.add_column("Currently", style="yellow")
+        for change in conflicts:
+            current = (
+                f"→ {change.current}"
+                if change.action == LinkAction.REPLACE
+                else change.current or ""
+            )
+            table.add_row(change.link.component, str(change.link.target), current)
         console.print(table)
 
+        choices = [str(option) for option in ConflictPolicy]
+        per_target = [
+            str(option) for option in ConflictPolicy if option is not ConflictPolicy.ASK
+        ]
+        if policy == ConflictPolicy.ASK:
+            policy = ConflictPolicy(
+                Prompt.ask(
+                    "How should existing targets be handled?",
+                    choices=choices,
+                    default=str(ConflictPolicy.BACKUP),
+                )
+            )
+        if policy != ConflictPolicy.ASK:
+            console.print(f"[cyan]Existing targets: {policy} all[/cyan]")
+            return {change.link.target: policy for change in conflicts}, policy
+
+        resolutions = {
+            change.link.target: ConflictPolicy(
+                Prompt.ask(
+                    f"  {change.link.target}",
+                    choices=per_target,
+                    default=str(ConflictPolicy.BACKUP),
+                )
+            )
+            for change in conflicts
+        }
+        return resolutions, ConflictPolicy.BACKUP
+
     def _show_installation_summary(
         self, success_count: int, total_steps: int, os_type: OSType
     ) -> None:
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+
+import hashlib
+import http.client
+import os
+import random
+import shutil
+import socket
+import ssl
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import SplitResult, urljoin, urlsplit
+
+from installer.artifacts import Artifact
+from installer.console import console
+from installer.interfaces import Downloader
+from installer.tracing import tracer
+
+USER_AGENT = "lamdav-dotfiles-installer"
+DOWNLOAD_TIMEOUT = 60.0
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+CHUNK_SIZE = 1 << 16
+
+T = TypeVar("T")
+HostKey = Tuple[str, str, int]  # scheme, host, port
+
+
+class DownloadError(Exception):
+    """A download failed; ``retriable`` is False for errors a retry cannot fix."""
+
+    def __init__(self, message: str, retriable: bool = True):
+        super().__init__(message)
+        self.retriable = retriable
+
+
+# Connection resets, timeouts, truncated bodies and 5xx/429 responses
+RETRIABLE_ERRORS = (OSError, socket.timeout, http.client.HTTPException, DownloadError)
+
+
+class HttpDownloader(Downloader):
+    """In-process HTTP(S) client for installer downloads.
+
+    Keeps idle keep-alive connections per host, allows at most
+    ``max_per_host`` concurrent transfers to one host, follows redirects,
+    retries transient failures with exponential backoff, and resumes
+    partially downloaded files with HTTP Range requests.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DOWNLOAD_TIMEOUT,
+        retries: int = 4,
+        backoff: float = 0.5,
+        max_per_host: int = 4,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_per_host = max_per_host
+        self._idle: Dict[HostKey, List[http.client.HTTPConnection]] = {}
+        self._slots: Dict[HostKey, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+        self._proxies = urllib.request.getproxies()
+
+    # Connection pool
+
+    def _slot(self, key: HostKey) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return self._slots[key]
+
+    def _proxy_for(self, key: HostKey) -> Optional[SplitResult]:
+        scheme, host, _ = key
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        return urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+    def _connect(self, key: HostKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy = self._proxy_for(key)
+        if scheme == "https":
+            if proxy:
+                conn = http.client.HTTPSConnection(
+                    proxy.hostname,
+                    proxy.port or 80,
+                    timeout=self.timeout,
+                    context=self._ssl_context,
+                )
+                conn.set_tunnel(host, port)
+                return conn
+            return http.client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=self._ssl_context
+            )
+        if proxy:
+            return http.client.HTTPConnection(
+                proxy.hostname, proxy.port or 80, timeout=self.timeout
+            )
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _checkout(self, key: HostKey) -> Tuple[http.client.HTTPConnection, bool]:
+        """An idle pooled connection (reused=True) or a new one."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(key), False
+
+    def _release(
+        self,
+        key: HostKey,
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ) -> None:
+        """Pool the connection if the response was fully read and keep-alive."""
+        # A body cut short also reads as closed, with bytes still outstanding
+        if response.isclosed() and not response.will_close and not response.length:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_per_host:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def _send(
+        self, key: HostKey, target: str, headers: Dict[str, str]
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        conn, reused = self._checkout(key)
+        try:
+            conn.request("GET", target, headers=headers)
+            return conn, conn.getresponse()
+        except (ConnectionError, http.client.RemoteDisconnected):
+            conn.close()
+            if not reused:
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        # The server closed an idle keep-alive connection; use a fresh one
+        conn = self._connect(key)
+        try:
+            conn.request("GET", target, headers=headers)
+            return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    @contextmanager
+    def _open(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Iterator[http.client.HTTPResponse]:
+        """GET ``url``, following redirects; yields the final response."""
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            default_port = 443 if parts.scheme == "https" else 80
+            key: HostKey = (
+                parts.scheme,
+                parts.hostname or "",
+                parts.port or default_port,
+            )
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            if self._proxy_for(key) and parts.scheme == "http":
+                target = url  # Plain-HTTP proxies take the absolute URL
+            request_headers = {"User-Agent": USER_AGENT, **(headers or {})}
+
+            with self._slot(key):
+                conn, response = self._send(key, target, request_headers)
+                location = response.getheader("Location")
+                if response.status in REDIRECT_STATUSES and location:
+                    response.read()
+                    self._release(key, conn, response)
+                    url = urljoin(url, location)
+                    continue
+                try:
+                    yield response
+                finally:
+                    self._release(key, conn, response)
+                return
+        raise DownloadError(f"too many redirects for {url}")
+
+    # Retries
+
+    def _retrying(self, url: str, attempt_once: Callable[[], T]) -> T:
+        for attempt in range(self.retries + 1):
+            try:
+                return attempt_once()
+            except RETRIABLE_ERRORS as e:
+                if isinstance(e, DownloadError) and not e.retriable:
+                    raise
+                if attempt == self.retries:
+                    raise DownloadError(
+                        f"{url}: {e} (after {attempt + 1} attempts)"
+                    ) from e
+                delay = self.backoff * 2**attempt
+                time.sleep(delay + random.uniform(0, delay / 2))
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _check_status(url: str, response: http.client.HTTPResponse) -> None:
+        if response.status >= 400:
+            retriable = response.status >= 500 or response.status == 429
+            raise DownloadError(f"HTTP {response.status} for {url}", retriable)
+
+    # Downloader
+
+    def read(self, url: str) -> bytes:
+        def attempt() -> bytes:
+            with self._open(url) as response:
+                self._check_status(url, response)
+                return response.read()
+
+        return self._retrying(url, attempt)
+
+    @staticmethod
+    def _verify(
+        url: str, partial: Path, digest: "hashlib._Hash", sha256: Optional[str]
+    ) -> None:
+        if sha256 and digest.hexdigest() != sha256:
+            partial.unlink(missing_ok=True)
+            raise DownloadError(
+                f"sha256 mismatch for {url}: expected {sha256}, "
+                f"got {digest.hexdigest()}",
+                retriable=False,
+            )
+
+    @staticmethod
+    def _hash_file(path: Path) -> "hashlib._Hash":
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                digest.update(chunk)
+        return digest
+
+    def fetch(self, url: str, destination: Path, sha256: Optional[str] = None) -> Path:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        partial = destination.with_name(destination.name + ".part")
+
+        def attempt() -> Path:
+            offset = partial.stat().st_size if partial.exists() else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            with self._open(url, headers) as response:
+                if response.status == 416 and offset:
+                    # Range past the end: a previous attempt already got everything
+                    response.read()
+                    self._verify(url, partial, self._hash_file(partial), sha256)
+                    os.replace(partial, destination)
+                    return destination
+                self._check_status(url, response)
+                resumed = response.status == 206 and (
+                    response.getheader("Content-Range", "").startswith(
+                        f"bytes {offset}-"
+                    )
+                )
+                if not resumed:
+                    offset = 0
+                length = response.getheader("Content-Length")
+                expected = offset + int(length) if length else None
+                # The hash is computed as bytes arrive, continuing over resumed data
+                digest = self._hash_file(partial) if resumed else hashlib.sha256()
+                with open(partial, "ab" if resumed else "wb") as out:
+                    while chunk := response.read(CHUNK_SIZE):
+                        out.write(chunk)
+                        digest.update(chunk)
+                    received = out.tell()
+                if expected is not None and received < expected:
+                    # Connection dropped mid-body; the next attempt resumes here
+                    raise http.client.IncompleteRead(b"", expected - received)
+            self._verify(url, partial, digest, sha256)
+            os.replace(partial, destination)
+            return destination
+
+        return self._retrying(url, attempt)
+
+
+class DownloadStage:
+    """Fetches artifacts in the background so downloads overlap other install work.
+
+    Use as a context manager: files land in a temporary directory that is
+    removed on exit, so install them before leaving the block.
+    """
+
+    def __init__(self, downloader: Downloader, max_workers: int = 4):
+        self.downloader = downloader
+        self.max_workers = max_workers
+        self._futures: Dict[str, Future] = {}
+        self._results: Dict[str, Optional[Path]] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._directory: Optional[Path] = None
+
+    def __enter__(self) -> "DownloadStage":
+        self._directory = Path(tempfile.mkdtemp(prefix="dotfiles-downloads-"))
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="download"
+        )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._directory:
+            shutil.rmtree(self._directory, ignore_errors=True)
+
+    def _download(self, artifact: Artifact, flow: Optional[int]) -> Path:
+        with tracer.span(f"download:{artifact.name}", "network", flow=flow) as span:
+            url = artifact.resolve(self.downloader)
+            span["url"] = url
+            destination = self._directory / artifact.name / url.rsplit("/", 1)[-1]
+            return self.downloader.fetch(url, destination, artifact.sha256)
+
+    def start(self, artifacts: Iterable[Artifact]) -> None:
+        """Begin fetching every artifact concurrently."""
+        for artifact in artifacts:
+            self._futures[artifact.name] = self._pool.submit(
+                self._download, artifact, tracer.flow_start()
+            )
+
+    def result(self, name: str) -> Optional[Path]:
+        """Wait for one download; None if it failed or was never started."""
+        if name not in self._results:
+            future = self._futures.get(name)
+            try:
+                self._results[name] = future.result() if future else None
+            except Exception as e:
+                console.print(f"[yellow]⚠ Download failed for {name}: {e}[/yellow]")
+                self._results[name] = None
+        return self._results[name]
+
+    def results(self) -> Dict[str, Optional[Path]]:
+        """Wait for every download; failed ones map to None."""
+        return {name: self.result(name) for name in self._futures}
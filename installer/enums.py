@@ -11,3 +11,39 @@ class OSType(Enum):
 
     def __str__(self) -> str:
         return self.value
+
+
+class StepResource(Enum):
+    """Resource class an install step is throttled under."""
+
+    NETWORK = "network"
+    CPU = "cpu"
+    PROMPT = "prompt"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class LinkAction(Enum):
+    """What applying the desired state would do to a single target path."""
+
+    CREATE = "create"
+    REPLACE = "replace"
+    SKIP = "skip"
+    CONFLICT = "conflict"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class ConflictPolicy(Enum):
+    """How to resolve an existing target that is not the desired link."""
+
+    REPLACE = "replace"
+    BACKUP = "backup"
+    SKIP = "skip"
+    # Choose per conflict, up front
+    ASK = "ask"
+
+    def __str__(self) -> str:
+        return self.value
@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterable, List, Optional, Tuple, Union
 
 from installer.enums import OSType
 
@@ -25,6 +25,11 @@ class SystemManager(ABC):
         """Check if a command exists in the system."""
         pass
 
+    @abstractmethod
+    def invalidate_commands(self, commands: Optional[Iterable[str]] = None) -> None:
+        """Forget cached command lookups after an install (all of them when None)."""
+        pass
+
     @abstractmethod
     def run_command(
         self,
@@ -43,13 +48,23 @@ class SystemManager(ABC):
         """Run an interactive command that may require user input."""
         pass
 
+    @abstractmethod
+    def capture_command(self, command: str) -> Optional[str]:
+        """Run a quiet query command and return its stdout, or None if it failed."""
+        pass
+
 
 class PackageManager(ABC):
     """Interface for package management across different operating systems."""
 
     @abstractmethod
-    def install_packages(self, system_manager: SystemManager) -> bool:
-        """Install packages for the specific OS."""
+    def install_packages(
+        self, system_manager: SystemManager, refresh: bool = False
+    ) -> bool:
+        """Install packages for the specific OS.
+
+        ``refresh`` updates the package index even when nothing is missing.
+        """
         pass
 
     @abstractmethod
@@ -57,6 +72,28 @@ class PackageManager(ABC):
         """Get the name of the package manager."""
         pass
 
+    @abstractmethod
+    def get_inputs(self) -> List[Union[Path, str]]:
+        """Files and values that determine what install_packages does."""
+        pass
+
+
+class Downloader(ABC):
+    """Interface for fetching remote artifacts over HTTP(S)."""
+
+    @abstractmethod
+    def read(self, url: str) -> bytes:
+        """Fetch a small resource (such as an API response) into memory."""
+        pass
+
+    @abstractmethod
+    def fetch(self, url: str, destination: Path, sha256: Optional[str] = None) -> Path:
+        """Download ``url`` to ``destination`` atomically and return the path.
+
+        When ``sha256`` is given, the content must match it or the fetch fails.
+        """
+        pass
+
 
 class SymlinkManager(ABC):
     """Interface for creating and managing symbolic links."""
@@ -122,6 +159,16 @@ class MacOSManager(ABC):
         """Configure macOS system preferences."""
         pass
 
+    @abstractmethod
+    def ubersicht_installed(self) -> bool:
+        """Check that Übersicht, simple-bar and the dotfiles widgets are in place."""
+        pass
+
+    @abstractmethod
+    def system_preferences_current(self) -> bool:
+        """Check that the managed system preferences are set, without changing them."""
+        pass
+
 
 class Installer(ABC):
     """Interface for the main installer."""
@@ -133,11 +180,21 @@ class Installer(ABC):
         skip_shell: bool = False,
         skip_system: bool = False,
         interactive: bool = True,
+        only: Optional[List[str]] = None,
+        jobs: int = 4,
+        force: bool = False,
     ) -> None:
         """Run the installation process."""
         pass
 
     @abstractmethod
-    def status(self) -> None:
-        """Show the current status of dotfiles configuration."""
+    def status(
+        self, as_json: bool = False, versions: bool = False, timeout: float = 2.0
+    ) -> bool:
+        """Show the current status of dotfiles configuration. Returns False on drift."""
+        pass
+
+    @abstractmethod
+    def plan(self, show_all: bool = False) -> None:
+        """Show which symlinks an install would create, replace or skip."""
         pass
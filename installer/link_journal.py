@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, List, Optional, Tuple
+
+from installer.manifest import state_dir
+
+JOURNAL_FILE = "journal.jsonl"
+# Replaced files and directories, kept under their absolute path
+REPLACED_DIR = "replaced"
+ROLLED_BACK_MARKER = "rolled-back"
+# Kept beside a target whose filesystem differs from the state directory's
+FALLBACK_AREA = ".dotfiles-backups"
+# Retention for past runs and what they kept (DOTFILES_BACKUP_MAX_AGE in days,
+# DOTFILES_BACKUP_MAX_MB); the latest run is always kept
+BACKUP_MAX_AGE_DAYS = 30.0
+BACKUP_MAX_MB = 1024.0
+
+
+def journals_dir() -> Path:
+    return state_dir() / "links"
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """One link swap: what ``target`` was before it pointed at ``source``."""
+
+    target: str
+    source: str
+    # Destination of the symlink that was replaced
+    previous: Optional[str] = None
+    # Where a replaced file or directory was kept; a file's size in bytes
+    backup: Optional[str] = None
+    size: Optional[int] = None
+
+
+def replace_with_symlink(source: Path, target: Path) -> None:
+    """Point ``target`` at ``source`` in one rename; it is never missing meanwhile."""
+    tmp = target.with_name(
+        f".{target.name}.dotfiles-{os.getpid()}-{threading.get_ident()}"
+    )
+    os.symlink(source, tmp)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        os.unlink(tmp)
+        raise
+
+
+def _device(path: Path) -> Optional[int]:
+    """Filesystem of ``path``, or of its nearest existing ancestor."""
+    for candidate in (path, *path.parents):
+        try:
+            return os.stat(candidate).st_dev
+        except OSError:
+            continue
+    return None
+
+
+def _tree_size(path: Path) -> int:
+    """Bytes in a file, or in everything under a directory."""
+    try:
+        if not path.is_dir() or path.is_symlink():
+            return os.lstat(path).st_size
+    except OSError:
+        return 0
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _move(source: Path, destination: Path) -> None:
+    try:
+        os.rename(source, destination)
+    except OSError:
+        # Across filesystems: copy, then remove
+        shutil.move(str(source), str(destination))
+
+
+class LinkJournal:
+    """Write-ahead record of the link swaps made by one install.
+
+    Each swap is appended before it happens, so an interrupted run can still be
+    rolled back. The journal directory is only created on the first swap.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+
+    @classmethod
+    def begin(cls, root: Optional[Path] = None) -> "LinkJournal":
+        # Sortable and unique per run: local time plus nanoseconds
+        now = time.time_ns()
+        run = time.strftime("%Y%m%d-%H%M%S", time.localtime(now // 10**9))
+        run += f".{now % 10**9:09d}"
+        return cls((root or journals_dir()) / run)
+
+    @classmethod
+    def all(cls, root: Optional[Path] = None) -> List["LinkJournal"]:
+        """Every recorded run, newest first."""
+        try:
+            runs = sorted((root or journals_dir()).iterdir(), reverse=True)
+        except OSError:
+            return []
+        return [cls(run) for run in runs if (run / JOURNAL_FILE).exists()]
+
+    @classmethod
+    def latest(cls, root: Optional[Path] = None) -> Optional["LinkJournal"]:
+        """The most recent run that has not been rolled back yet."""
+        for journal in cls.all(root):
+            if not (journal.directory / ROLLED_BACK_MARKER).exists():
+                return journal
+        return None
+
+    @property
+    def name(self) -> str:
+        return self.directory.name
+
+    def backup_path(self, target: Path) -> Path:
+        """Where a replaced target is kept: always on its own filesystem, so
+        setting it aside is one rename however large it is."""
+        if _device(target.parent) != _device(self.directory):
+            return target.parent / FALLBACK_AREA / self.name / target.name
+        return self.directory / REPLACED_DIR / str(target).lstrip(os.sep)
+
+    def sibling_backup_path(self, target: Path) -> Path:
+        """A visible backup next to the target, e.g. ``~/.zshrc.dotfiles-backup-<run>``."""
+        stamp = self.name.split(".", 1)[0]
+        return target.with_name(f"{target.name}.dotfiles-backup-{stamp}")
+
+    def record(self, entry: JournalEntry) -> None:
+        with self._lock:
+            if self._file is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.directory / JOURNAL_FILE, "a")
+            self._file.write(json.dumps(asdict(entry)) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def entries(self) -> List[JournalEntry]:
+        try:
+            lines = (self.directory / JOURNAL_FILE).read_text().splitlines()
+        except OSError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(JournalEntry(**json.loads(line)))
+            except (ValueError, TypeError):
+                continue  # A line torn by an interruption
+        return entries
+
+    def keep(self, target: Path, is_dir: bool, backup: Path) -> None:
+        """Move a file or directory out of the way, keeping it at ``backup``."""
+        backup.parent.mkdir(parents=True, exist_ok=True)
+        if is_dir:
+            _move(target, backup)
+        else:
+            # A hard link keeps the contents while the link swap stays atomic
+            try:
+                os.link(target, backup)
+            except OSError:
+                shutil.copy2(target, backup, follow_symlinks=False)
+
+    def undo(self, entry: JournalEntry) -> Optional[bool]:
+        """Undo one swap: True if undone, False if the target changed since,
+        None if there is nothing to undo."""
+        target = Path(entry.target)
+        try:
+            current: Optional[str] = os.readlink(target)
+        except FileNotFoundError:
+            current = None
+        except OSError:
+            # Not a symlink: the original is still in place, or a new file
+            return None if entry.backup else False
+        if current is not None and current == entry.previous:
+            return None  # The swap never happened, or was already undone
+        if current is not None and current != entry.source:
+            return False
+        backup = Path(entry.backup) if entry.backup else None
+        if backup and (backup.exists() or backup.is_symlink()):
+            if current is not None:
+                target.unlink()
+            _move(backup, target)
+        elif entry.previous is not None:
+            replace_with_symlink(Path(entry.previous), target)
+        elif current is not None:
+            target.unlink()
+        else:
+            return None
+        return True
+
+    def rollback(self) -> Tuple[int, List[str]]:
+        """Undo the recorded swaps, newest first. Returns (restored, skipped targets).
+
+        A target that no longer points where this run left it was changed
+        since, so it is left alone.
+        """
+        restored = 0
+        skipped: List[str] = []
+        for entry in reversed(self.entries()):
+            undone = self.undo(entry)
+            if undone:
+                restored += 1
+            elif undone is False:
+                skipped.append(entry.target)
+        (self.directory / ROLLED_BACK_MARKER).touch()
+        return restored, skipped
+
+    def _kept_entries(self) -> List[JournalEntry]:
+        return [
+            entry
+            for entry in self.entries()
+            if entry.backup
+            and (
+                Path(entry.backup).is_relative_to(self.directory)
+                or FALLBACK_AREA in Path(entry.backup).parts
+            )
+        ]
+
+    def kept(self) -> List[Path]:
+        """Backups this run owns (not the visible ones made by the backup policy)."""
+        return [Path(entry.backup) for entry in self._kept_entries()]
+
+    def size(self) -> int:
+        """Bytes kept by this run: recorded file sizes, kept directories measured."""
+        return sum(
+            entry.size if entry.size is not None else _tree_size(Path(entry.backup))
+            for entry in self._kept_entries()
+        )
+
+    def remove(self) -> None:
+        for path in self.kept():
+            _remove(path)
+            if FALLBACK_AREA in path.parts:
+                for parent in (path.parent, path.parent.parent):
+                    try:
+                        parent.rmdir()
+                    except OSError:
+                        break
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def find_swap(
+    target: Path, root: Optional[Path] = None
+) -> Optional[Tuple[LinkJournal, JournalEntry]]:
+    """The most recent recorded swap of ``target``."""
+    for journal in LinkJournal.all(root):
+        for entry in reversed(journal.entries()):
+            if entry.target == str(target):
+                return journal, entry
+    return None
+
+
+def prune_journals(
+    root: Optional[Path] = None,
+    max_age_days: Optional[float] = None,
+    max_mb: Optional[float] = None,
+) -> int:
+    """Delete runs older than the age limit, then the oldest runs beyond the
+    size limit. The latest run is always kept. Returns the number removed."""
+    if max_age_days is None:
+        max_age_days = float(
+            os.environ.get("DOTFILES_BACKUP_MAX_AGE", BACKUP_MAX_AGE_DAYS)
+        )
+    if max_mb is None:
+        max_mb = float(os.environ.get("DOTFILES_BACKUP_MAX_MB", BACKUP_MAX_MB))
+    oldest = time.time() - max_age_days * 86400
+    budget = max_mb * 1024 * 1024
+    removed = 0
+    total = 0
+    for index, journal in enumerate(LinkJournal.all(root)):
+        try:
+            written = (journal.directory / JOURNAL_FILE).stat().st_mtime
+        except OSError:
+            written = 0.0
+        size = journal.size()
+        if index and (written < oldest or total + size > budget):
+            journal.remove()
+            removed += 1
+        else:
+            total += size
+    return removed
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import plistlib
+import shlex
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# App to restart once its domain changed; other domains apply without one
+RESTARTS: Dict[str, str] = {
+    "NSGlobalDomain": "Finder",
+    "com.apple.dock": "Dock",
+    "com.apple.finder": "Finder",
+    "com.apple.screencapture": "SystemUIServer",
+    "com.apple.menuextra.battery": "SystemUIServer",
+}
+
+
+def desired_defaults(home: Path) -> Dict[str, Dict[str, Any]]:
+    """The system preferences we manage, by domain, as plist values."""
+    return {
+        "NSGlobalDomain": {
+            # UI/UX
+            "AppleInterfaceStyle": "Dark",
+            "AppleShowAllExtensions": True,
+            # Input devices
+            "com.apple.swipescrolldirection": False,
+            "KeyRepeat": 2,
+            "InitialKeyRepeat": 15,
+            "NSAutomaticCapitalizationEnabled": False,
+            # Full keyboard access for all controls
+            "AppleKeyboardUIMode": 3,
+        },
+        "com.apple.dock": {
+            "autohide": True,
+            "tilesize": 48,
+            "orientation": "left",
+        },
+        "com.apple.finder": {
+            "AppleShowAllFiles": True,
+            "ShowPathbar": True,
+            "ShowStatusBar": True,
+        },
+        "com.apple.driver.AppleBluetoothMultitouch.trackpad": {"Clicking": True},
+        "com.apple.screencapture": {
+            "location": f"{home}/Downloads",
+            "type": "png",
+            "disable-shadow": True,
+        },
+        "com.apple.menuextra.battery": {"ShowPercent": "YES"},
+        # Security
+        "com.apple.screensaver": {"askForPassword": 1, "askForPasswordDelay": 0},
+        # Note: Safari preferences are skipped due to sandboxing restrictions
+        "com.apple.TextEdit": {"RichText": 0, "PlainTextEncoding": 4},
+    }
+
+
+def preferences_file(home: Path, domain: str) -> Path:
+    """Where cfprefsd saves a domain's values for the current user."""
+    name = ".GlobalPreferences" if domain == "NSGlobalDomain" else domain
+    return home / "Library" / "Preferences" / f"{name}.plist"
+
+
+def saved_preferences_current(home: Path) -> bool:
+    """True when the saved preference files already hold every desired value.
+
+    Reads the files directly, without running ``defaults``. cfprefsd may not
+    have saved recent changes yet, so False only means "check properly".
+    """
+    for domain, values in desired_defaults(home).items():
+        try:
+            with open(preferences_file(home, domain), "rb") as f:
+                saved = plistlib.load(f)
+        except (OSError, plistlib.InvalidFileException, ValueError):
+            return False
+        if not isinstance(saved, dict) or changed_keys(saved, values):
+            return False
+    return True
+
+
+def parse_export(output: Optional[str]) -> Optional[Dict[str, Any]]:
+    """A domain's current values from ``defaults export <domain> -``, or None if unreadable."""
+    if not output:
+        return None
+    try:
+        values = plistlib.loads(output.encode())
+    except (plistlib.InvalidFileException, ValueError):
+        return None
+    return values if isinstance(values, dict) else None
+
+
+def changed_keys(current: Dict[str, Any], desired: Dict[str, Any]) -> Dict[str, Any]:
+    """Desired values that differ from the current ones in value or plist type."""
+    return {
+        key: value
+        for key, value in desired.items()
+        # True == 1 in Python, but -bool and -int are different plist types
+        if key not in current
+        or type(current[key]) is not type(value)
+        or current[key] != value
+    }
+
+
+def defaults_write(domain: str, key: str, value: Any) -> str:
+    """The ``defaults write`` command that sets one value."""
+    if isinstance(value, bool):
+        flag, text = "-bool", "true" if value else "false"
+    elif isinstance(value, int):
+        flag, text = "-int", str(value)
+    elif isinstance(value, float):
+        flag, text = "-float", str(value)
+    else:
+        flag, text = "-string", str(value)
+    return f"defaults write {shlex.quote(domain)} {shlex.quote(key)} {flag} {shlex.quote(text)}"
+
+
+@dataclass
+class DomainUpdate:
+    """The changed keys of one defaults domain."""
+
+    domain: str
+    changes: Dict[str, Any]
+    # The whole domain to import, or None when its plist could not be read
+    merged: Optional[Dict[str, Any]] = None
+
+    def plist(self) -> bytes:
+        return plistlib.dumps(self.merged or {})
+
+    def write_commands(self) -> List[str]:
+        """One ``defaults write`` per key, for domains that cannot be imported."""
+        return [
+            defaults_write(self.domain, key, value)
+            for key, value in self.changes.items()
+        ]
+
+
+def plan_updates(
+    current: Dict[str, Optional[Dict[str, Any]]],
+    desired: Dict[str, Dict[str, Any]],
+) -> List[DomainUpdate]:
+    """Diff each domain's current plist against the desired values.
+
+    A domain whose plist is unknown (None) gets every desired key written
+    individually, since importing would replace values we could not read.
+    """
+    updates: List[DomainUpdate] = []
+    for domain, values in desired.items():
+        existing = current.get(domain)
+        if existing is None:
+            updates.append(DomainUpdate(domain, dict(values)))
+            continue
+        changes = changed_keys(existing, values)
+        if changes:
+            updates.append(DomainUpdate(domain, changes, {**existing, **changes}))
+    return updates
+
+
+def restarts_for(updates: List[DomainUpdate]) -> List[str]:
+    """Apps to restart for these updates, each once."""
+    apps = {RESTARTS[update.domain] for update in updates if update.domain in RESTARTS}
+    return sorted(apps)
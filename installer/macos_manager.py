@@ -1,75 +1,106 @@
 #!/usr/bin/env python3
 
+import os
 import shlex
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import List, Optional, Tuple
 
-from rich.console import Console
 from rich.prompt import Confirm
 
+from installer.console import console
 from installer.interfaces import MacOSManager, SystemManager
+from installer.macos_defaults import (
+    desired_defaults,
+    parse_export,
+    plan_updates,
+    restarts_for,
+    saved_preferences_current,
+)
+from installer.readiness import (
+    exited,
+    pids_gone,
+    process_running,
+    process_stopped,
+    wait_for,
+)
+from installer.scheduler import prompt_lock
 from installer.symlink_manager import ConcreteSymlinkManager
+from installer.tracing import traced
 
-console = Console()
+# Process name of Übersicht (the app has been shipped under both spellings)
+UBERSICHT_PROCESS = "Übersicht|Uebersicht"
+UBERSICHT_APPS = ("Übersicht.app", "Uebersicht.app")
+# Deadlines for apps to start or stop; waits end as soon as they do
+LAUNCH_TIMEOUT = 10.0
+QUIT_TIMEOUT = 5.0
 
 
 class ConcreteMacOSManager(MacOSManager):
     """Concrete implementation of MacOSManager for macOS-specific operations."""
 
-    def __init__(self):
-        self.symlink_manager = ConcreteSymlinkManager()
+    def __init__(
+        self,
+        symlink_manager: Optional[ConcreteSymlinkManager] = None,
+        applications_dir: Path = Path("/Applications"),
+    ):
+        self.symlink_manager = symlink_manager or ConcreteSymlinkManager()
+        self.applications_dir = applications_dir
+
+    @staticmethod
+    def _widgets_dir() -> Path:
+        return Path.home() / "Library/Application Support/Übersicht/widgets"
+
+    def _ubersicht_app_installed(self) -> bool:
+        return any((self.applications_dir / app).exists() for app in UBERSICHT_APPS)
+
+    def ubersicht_installed(self) -> bool:
+        """Check that Übersicht, simple-bar and the dotfiles widgets are in place."""
+        widgets_dir = self._widgets_dir()
+        return (
+            self._ubersicht_app_installed()
+            and (widgets_dir / "simple-bar").is_dir()
+            and (widgets_dir / "aerospace-mode.jsx").is_file()
+            and (Path.home() / ".simplebarrc").is_file()
+        )
+
+    def system_preferences_current(self) -> bool:
+        """Check the saved preference files; no ``defaults`` process is started."""
+        return saved_preferences_current(Path.home())
 
+    @traced(category="setup")
     def setup_aerospace_config(self, dotfiles_dir: Path) -> bool:
         """Set up AeroSpace configuration symlink."""
         console.print(
             "\n[bold cyan]🪟 Setting up AeroSpace window manager...[/bold cyan]"
         )
-        aerospace_source = dotfiles_dir / "aerospace" / ".aerospace.toml"
-        if aerospace_source.exists():
-            aerospace_target = Path.home() / ".aerospace.toml"
-            ok = self.symlink_manager.create_symlink(
-                aerospace_source, aerospace_target, "AeroSpace configuration"
-            )
-
-            # Symlink scripts to ~/.config/ubersicht/simple-bar/
-            ubersicht_config_dir = Path.home() / ".config" / "ubersicht" / "simple-bar"
-            ubersicht_config_dir.mkdir(parents=True, exist_ok=True)
-            for script in (
-                "aerospace-mode-tracker.sh",
-                "sync-simplebar-displays.sh",
-                "sync-and-reload.sh",
-            ):
-                script_source = dotfiles_dir / "ubersicht" / "simple-bar" / script
-                if script_source.exists():
-                    script_source.chmod(script_source.stat().st_mode | 0o111)
-                    self.symlink_manager.create_symlink(
-                        script_source,
-                        ubersicht_config_dir / script,
-                        f"simple-bar script: {script}",
-                    )
+        # Scripts are linked into ~/.config/ubersicht/simple-bar/ and must be executable
+        for script in (
+            "aerospace-mode-tracker.sh",
+            "sync-simplebar-displays.sh",
+            "sync-and-reload.sh",
+        ):
+            script_source = dotfiles_dir / "ubersicht" / "simple-bar" / script
+            if script_source.exists():
+                script_source.chmod(script_source.stat().st_mode | 0o111)
 
-            return ok
-        return True  # Not an error if config doesn't exist
+        success_count, total_steps = self.symlink_manager.apply_component(
+            "aerospace", dotfiles_dir
+        )
+        return success_count == total_steps  # Not an error if config doesn't exist
 
+    @traced(category="setup")
     def setup_iterm_config(self, dotfiles_dir: Path) -> bool:
         """Set up iTerm2 configuration symlink."""
         console.print("\n[bold cyan]💻 Setting up iTerm2 profiles...[/bold cyan]")
-        iterm_source = dotfiles_dir / "iterm" / "iterm-profiles.json"
-        if iterm_source.exists():
-            iterm_target = (
-                Path.home()
-                / "Library"
-                / "Application Support"
-                / "iTerm2"
-                / "DynamicProfiles"
-                / "iterm-profiles.json"
-            )
-            return self.symlink_manager.create_symlink(
-                iterm_source, iterm_target, "iTerm2 profiles"
-            )
-        return True  # Not an error if config doesn't exist
+        success_count, total_steps = self.symlink_manager.apply_component(
+            "iterm", dotfiles_dir
+        )
+        return success_count == total_steps  # Not an error if config doesn't exist
 
+    @traced(category="setup")
     def setup_kitty_quick_access(self, system_manager: SystemManager) -> bool:
         """Register Kitty quick-access-terminal (hotkey window) with macOS."""
         console.print(
@@ -82,33 +113,57 @@ class ConcreteMacOSManager(MacOSManager):
             )
             return True
 
-        # Run kitten quick-access-terminal once to register with macOS
+        # Run kitten quick-access-terminal once to register with macOS. The
+        # service is registered once the terminal it launches is running.
         console.print("Registering quick-access-terminal service...")
+        import signal
         import subprocess
-        import time
 
         try:
-            # Start the quick-access-terminal in the background
             proc = subprocess.Popen(
                 ["kitten", "quick-access-terminal"],
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
             )
-            time.sleep(2)  # Give it time to register
+            children: List[int] = []
 
-            # Kill the process
+            def launched() -> bool:
+                output = system_manager.capture_command(f"pgrep -P {proc.pid}")
+                if output:
+                    children[:] = [int(pid) for pid in output.split()]
+                return bool(children) or proc.poll() is not None
+
+            wait_for(launched, LAUNCH_TIMEOUT, "kitty quick-access-terminal")
+            failed_early = not children and proc.poll() is not None
+
+            # Stop the terminal, then the kitten (which reaps it), escalating
+            # to SIGKILL for anything that ignores SIGTERM
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            if not wait_for(pids_gone(children), QUIT_TIMEOUT, "kitty exit"):
+                for pid in children:
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
             proc.terminate()
-            try:
-                proc.wait(timeout=2)
-            except subprocess.TimeoutExpired:
+            if not wait_for(exited(proc), QUIT_TIMEOUT, "kitten exit"):
                 proc.kill()
-
-            # Also kill any remaining quick-access-terminal processes
-            subprocess.run(
-                ["pkill", "-f", "quick-access-terminal"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
+                proc.wait()
+
+            if not children:
+                reason = (
+                    f"exited with status {proc.returncode}"
+                    if failed_early
+                    else f"did not start within {LAUNCH_TIMEOUT:.0f}s"
+                )
+                console.print(
+                    f"[red]✗ Failed to register quick-access-terminal: kitten {reason}[/red]"
+                )
+                return False
 
             console.print("[green]✓ Kitty quick-access-terminal registered[/green]")
             console.print("\n[yellow]To complete setup:[/yellow]")
@@ -127,6 +182,7 @@ class ConcreteMacOSManager(MacOSManager):
             console.print(f"[red]✗ Failed to register quick-access-terminal: {e}[/red]")
             return False
 
+    @traced(category="setup")
     def setup_ubersicht(
         self,
         dotfiles_dir: Path,
@@ -141,17 +197,16 @@ class ConcreteMacOSManager(MacOSManager):
         success_count = 0
         total_steps = 0
 
-        if not interactive or Confirm.ask(
-            "[yellow]Set up Übersicht with simple-bar and AeroSpace mode indicator?[/yellow]",
-            default=True,
-        ):
+        with prompt_lock:
+            proceed = not interactive or Confirm.ask(
+                "[yellow]Set up Übersicht with simple-bar and AeroSpace mode indicator?[/yellow]",
+                default=True,
+            )
+        if proceed:
             total_steps += 3
 
             # Check and install Übersicht
-            if not (
-                Path("/Applications/Übersicht.app").exists()
-                or Path("/Applications/Uebersicht.app").exists()
-            ):
+            if not self._ubersicht_app_installed():
                 console.print("Installing Übersicht via Homebrew...")
                 if system_manager.run_interactive_command(
                     "brew install --cask ubersicht",
@@ -163,9 +218,7 @@ class ConcreteMacOSManager(MacOSManager):
                 success_count += 1
 
             # Install simple-bar
-            simple_bar_dir = (
-                Path.home() / "Library/Application Support/Übersicht/widgets/simple-bar"
-            )
+            simple_bar_dir = self._widgets_dir() / "simple-bar"
             if not simple_bar_dir.exists():
                 console.print("Installing simple-bar...")
                 simple_bar_parent = simple_bar_dir.parent
@@ -206,7 +259,7 @@ class ConcreteMacOSManager(MacOSManager):
             # Setup aerospace-mode widget
             # Cannot symlink: file contains __HOME__ placeholder that must be
             # substituted with the actual home directory at install time.
-            widgets_dir = Path.home() / "Library/Application Support/Übersicht/widgets"
+            widgets_dir = self._widgets_dir()
             widgets_dir.mkdir(parents=True, exist_ok=True)
 
             aerospace_mode_source = dotfiles_dir / "ubersicht" / "aerospace-mode.jsx"
@@ -228,19 +281,44 @@ class ConcreteMacOSManager(MacOSManager):
                     )
 
             # Restart Übersicht to recognize new widgets
-            console.print("Restarting Übersicht to recognize new widgets...")
-            # pkill returns 1 if no process matched (app not running) — that's fine
-            system_manager.run_command(
-                "pkill -f Uebersicht || pkill -f Übersicht || true",
-                "Stopping Übersicht...",
-            )
-            system_manager.run_command("open -a Übersicht", "Starting Übersicht...")
-            console.print(
-                "[green]✓ Übersicht restarted. New widgets should now be visible.[/green]"
-            )
+            total_steps += 1
+            if self._restart_ubersicht(system_manager):
+                success_count += 1
 
         return success_count, total_steps
 
+    def _restart_ubersicht(self, system_manager: SystemManager) -> bool:
+        """Quit Übersicht if it is running, relaunch it and confirm it came back."""
+        console.print("Restarting Übersicht to recognize new widgets...")
+        running = process_running(system_manager, UBERSICHT_PROCESS)
+        # pkill fails (None) when nothing matched, i.e. Übersicht was not running
+        stopping = system_manager.capture_command(
+            f"pkill -x {shlex.quote(UBERSICHT_PROCESS)}"
+        )
+        if stopping is not None:
+            if not wait_for(
+                process_stopped(system_manager, UBERSICHT_PROCESS),
+                QUIT_TIMEOUT,
+                "Übersicht exit",
+            ):
+                console.print(
+                    "[red]✗ Übersicht did not quit; restart it manually[/red]"
+                )
+                return False
+        if not system_manager.run_command("open -a Übersicht", "Starting Übersicht..."):
+            console.print("[red]✗ Failed to start Übersicht[/red]")
+            return False
+        if not wait_for(running, LAUNCH_TIMEOUT, "Übersicht launch"):
+            console.print(
+                f"[red]✗ Übersicht did not start within {LAUNCH_TIMEOUT:.0f}s[/red]"
+            )
+            return False
+        console.print(
+            "[green]✓ Übersicht restarted. New widgets should now be visible.[/green]"
+        )
+        return True
+
+    @traced(category="setup")
     def configure_system_preferences(
         self, system_manager: SystemManager, interactive: bool = True
     ) -> bool:
@@ -249,58 +327,62 @@ class ConcreteMacOSManager(MacOSManager):
             "\n[bold cyan]⚙️  Configuring macOS system preferences...[/bold cyan]"
         )
 
-        if interactive and not Confirm.ask(
-            "[yellow]This will modify system preferences. Continue?[/yellow]",
-            default=True,
-        ):
+        with prompt_lock:
+            proceed = not interactive or Confirm.ask(
+                "[yellow]This will modify system preferences. Continue?[/yellow]",
+                default=True,
+            )
+        if not proceed:
             console.print("[yellow]Skipping system preferences configuration.[/yellow]")
             return True
 
-        system_commands = [
-            # UI/UX Settings
-            'defaults write NSGlobalDomain AppleInterfaceStyle -string "Dark"',
-            "defaults write com.apple.dock autohide -bool true",
-            "defaults write com.apple.dock tilesize -int 48",
-            'defaults write com.apple.dock orientation -string "left"',
-            "defaults write NSGlobalDomain AppleShowAllExtensions -bool true",
-            "defaults write com.apple.finder AppleShowAllFiles -bool true",
-            "defaults write com.apple.finder ShowPathbar -bool true",
-            "defaults write com.apple.finder ShowStatusBar -bool true",
-            # Input Device Settings
-            "defaults write NSGlobalDomain com.apple.swipescrolldirection -bool false",
-            "defaults write com.apple.driver.AppleBluetoothMultitouch.trackpad Clicking -bool true",
-            "defaults write NSGlobalDomain KeyRepeat -int 2",
-            "defaults write NSGlobalDomain InitialKeyRepeat -int 15",
-            "defaults write NSGlobalDomain NSAutomaticCapitalizationEnabled -bool false",
-            # Developer Settings
-            f'defaults write com.apple.screencapture location -string "{Path.home()}/Downloads"',
-            'defaults write com.apple.screencapture type -string "png"',
-            "defaults write com.apple.screencapture disable-shadow -bool true",
-            "defaults write NSGlobalDomain AppleKeyboardUIMode -int 3",
-            'defaults write com.apple.menuextra.battery ShowPercent -string "YES"',
-            # Security Settings
-            "defaults write com.apple.screensaver askForPassword -int 1",
-            "defaults write com.apple.screensaver askForPasswordDelay -int 0",
-            # Application Settings
-            "defaults write com.apple.TextEdit RichText -int 0",
-            "defaults write com.apple.TextEdit PlainTextEncoding -int 4",
-            # Note: Safari preferences are skipped due to sandboxing restrictions
-        ]
+        # One export per domain (concurrently), then one import per changed domain
+        desired = desired_defaults(Path.home())
+        with ThreadPoolExecutor(max_workers=len(desired)) as pool:
+            exports = pool.map(
+                lambda domain: system_manager.capture_command(
+                    f"defaults export {shlex.quote(domain)} -"
+                ),
+                desired,
+            )
+            current = {
+                domain: parse_export(output) for domain, output in zip(desired, exports)
+            }
+        updates = plan_updates(current, desired)
+        if not updates:
+            console.print("[green]✓ System preferences already set[/green]")
+            return True
 
         all_success = True
-        for cmd in system_commands:
-            if not system_manager.run_command(cmd):
-                all_success = False
+        with tempfile.TemporaryDirectory(prefix="dotfiles-defaults-") as directory:
+            for update in updates:
+                description = (
+                    f"Updating {update.domain} ({len(update.changes)} keys)..."
+                )
+                if update.merged is None:
+                    ok = all(
+                        system_manager.run_command(command, description)
+                        for command in update.write_commands()
+                    )
+                else:
+                    plist = Path(directory) / f"{update.domain}.plist"
+                    plist.write_bytes(update.plist())
+                    ok = system_manager.run_command(
+                        f"defaults import {shlex.quote(update.domain)} "
+                        f"{shlex.quote(str(plist))}",
+                        description,
+                    )
+                all_success &= ok
+        changed = sum(len(update.changes) for update in updates)
+        console.print(
+            f"[green]✓ Updated {changed} preferences in {len(updates)} domains[/green]"
+        )
 
         if all_success:
-            # Restart affected applications
-            console.print("Restarting applications to apply changes...")
-            restart_commands = [
-                "killall Dock 2>/dev/null || true",
-                "killall Finder 2>/dev/null || true",
-                "killall SystemUIServer 2>/dev/null || true",
-            ]
-            for cmd in restart_commands:
-                system_manager.run_command(cmd)
+            # Restart only the applications whose domains changed
+            for app in restarts_for(updates):
+                system_manager.run_command(
+                    f"killall {app} 2>/dev/null || true", f"Restarting {app}..."
+                )
 
         return all_success
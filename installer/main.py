@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 
+import contextlib
+import os
 import subprocess
 from pathlib import Path
+from typing import List, Optional
 
 import typer
-from rich.console import Console
-
-from installer.dotfiles_installer import DotfilesInstaller
 
 app = typer.Typer(
     name="dot",
@@ -14,9 +14,23 @@ app = typer.Typer(
     rich_markup_mode="rich",
     no_args_is_help=True,
 )
-console = Console()
 
-DOTFILES_DIR = Path(__file__).parent.parent.resolve()
+
+def _find_dotfiles_dir() -> Path:
+    """The dotfiles checkout: $DOTFILES_DIR, else the repo containing this package."""
+    if os.environ.get("DOTFILES_DIR"):
+        return Path(os.environ["DOTFILES_DIR"]).expanduser().resolve()
+    root = Path(__file__).parent.parent.resolve()
+    if not root.is_file():
+        return root
+    # Running from a zipapp (dist/dot.pyz): look beside it, then the working directory
+    for candidate in (root.parent, root.parent.parent, Path.cwd()):
+        if (candidate / "zsh" / ".zshrc").exists():
+            return candidate
+    return Path.cwd()
+
+
+DOTFILES_DIR = _find_dotfiles_dir()
 
 
 @app.command(rich_help_panel="Setup")
@@ -33,17 +47,322 @@ def install(
     interactive: bool = typer.Option(
         True, "--interactive/--no-interactive", help="Interactive mode"
     ),
+    only: Optional[List[str]] = typer.Option(
+        None,
+        "--only",
+        help="Install only this component (and its dependencies); repeatable",
+    ),
+    jobs: int = typer.Option(
+        4, "--jobs", "-j", min=1, help="Maximum number of steps run in parallel"
+    ),
+    force: bool = typer.Option(
+        False, "--force", help="Rerun steps even if the install manifest is current"
+    ),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Update the package index (brew update / apt-get update) even when "
+        "every package is installed",
+    ),
+    trace: Optional[Path] = typer.Option(
+        None,
+        "--trace",
+        help="Write a Chrome trace-event timeline (open in Perfetto) to this file",
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        "--cache-dir",
+        help="Download cache directory, e.g. a share used by many machines "
+        "(default ~/.cache/dotfiles/artifacts)",
+    ),
+    from_bundle: Optional[Path] = typer.Option(
+        None,
+        "--from-bundle",
+        exists=True,
+        dir_okay=False,
+        help="Install offline from an archive made by 'bundle' (Ubuntu)",
+    ),
+    on_conflict: Optional[str] = typer.Option(
+        None,
+        "--on-conflict",
+        help="Existing targets: replace, backup, skip or ask (per item). "
+        "Default: choose once up front, or backup with --no-interactive",
+    ),
 ) -> None:
     """Install dotfiles configuration with optional components."""
-    installer = DotfilesInstaller(DOTFILES_DIR)
-    installer.install(skip_packages, skip_shell, skip_system, interactive)
+    from installer.console import console
+    from installer.dotfiles_installer import DotfilesInstaller
+    from installer.enums import ConflictPolicy
+    from installer.tracing import tracer
+
+    policy = None
+    if on_conflict:
+        try:
+            policy = ConflictPolicy(on_conflict)
+        except ValueError:
+            console.print(
+                f"[red]Unknown conflict policy '{on_conflict}' "
+                "(use replace, backup, skip or ask)[/red]"
+            )
+            raise typer.Exit(1)
+    if trace:
+        tracer.enable()
+    try:
+        with contextlib.ExitStack() as stack:
+            bundle = None
+            if from_bundle:
+                from installer.bundle import BundleError, open_bundle
+
+                try:
+                    bundle = stack.enter_context(open_bundle(from_bundle))
+                except BundleError as e:
+                    console.print(f"[red]✗ {e}[/red]")
+                    raise typer.Exit(1)
+            installer = DotfilesInstaller(
+                DOTFILES_DIR, cache_dir=cache_dir, bundle=bundle
+            )
+            installer.install(
+                skip_packages,
+                skip_shell,
+                skip_system,
+                interactive,
+                only=only,
+                jobs=jobs,
+                force=force,
+                refresh=refresh,
+                on_conflict=policy,
+            )
+    finally:
+        if trace:
+            tracer.write(trace)
+            console.print(f"[cyan]Trace written to {trace}[/cyan]")
 
 
 @app.command(rich_help_panel="Setup")
-def status() -> None:
+def status(
+    as_json: bool = typer.Option(
+        False, "--json", help="Print a machine-readable report; exit 1 on drift"
+    ),
+    versions: bool = typer.Option(
+        False, "--versions", help="Probe installed tool versions (in parallel)"
+    ),
+    timeout: float = typer.Option(
+        2.0, "--timeout", help="Per-tool timeout in seconds for --versions"
+    ),
+) -> None:
     """Show the current status of dotfiles configuration."""
+    from installer.dotfiles_installer import DotfilesInstaller
+
+    installer = DotfilesInstaller(DOTFILES_DIR)
+    if not installer.status(as_json, versions, timeout) and as_json:
+        raise typer.Exit(1)
+
+
+@app.command(rich_help_panel="Setup")
+def plan(
+    show_all: bool = typer.Option(
+        False, "--all", help="Also list links that are already in place"
+    ),
+) -> None:
+    """Show exactly which symlinks an install would create, replace or skip."""
+    from installer.dotfiles_installer import DotfilesInstaller
+
     installer = DotfilesInstaller(DOTFILES_DIR)
-    installer.status()
+    installer.plan(show_all)
+
+
+@app.command(rich_help_panel="Setup")
+def rollback() -> None:
+    """Undo the symlink changes of the most recent install."""
+    from installer.console import console
+    from installer.link_journal import LinkJournal
+
+    journal = LinkJournal.latest()
+    if journal is None:
+        console.print("[yellow]⚠ No install to roll back[/yellow]")
+        raise typer.Exit(1)
+    restored, skipped = journal.rollback()
+    for target in skipped:
+        console.print(
+            f"[yellow]⚠ Left {target} alone: it changed since the install[/yellow]"
+        )
+    console.print(
+        f"[green]✓ Rolled back {restored} symlink changes from run {journal.name}[/green]"
+    )
+    if skipped:
+        raise typer.Exit(1)
+
+
+@app.command(rich_help_panel="Setup")
+def restore(
+    target: Optional[Path] = typer.Argument(
+        None, help="Path to restore, e.g. ~/.config/nvim; omit to list backups"
+    ),
+) -> None:
+    """Undo the last install's swap of one target, restoring what it replaced."""
+    from rich.table import Table
+
+    from installer.console import console
+    from installer.link_journal import LinkJournal, find_swap
+
+    if target is None:
+        table = Table(title="Replaced Targets")
+        table.add_column("Run", style="cyan")
+        table.add_column("Target")
+        table.add_column("Kept as")
+        for journal in LinkJournal.all():
+            for entry in journal.entries():
+                if entry.backup and os.path.lexists(entry.backup):
+                    table.add_row(journal.name, entry.target, entry.backup)
+                elif entry.previous:
+                    table.add_row(journal.name, entry.target, f"→ {entry.previous}")
+        console.print(table)
+        return
+
+    # Absolute, without following the link being restored
+    path = Path(os.path.abspath(os.path.expanduser(target)))
+    found = find_swap(path)
+    if found is None:
+        console.print(f"[yellow]⚠ No recorded swap of {path}[/yellow]")
+        raise typer.Exit(1)
+    journal, entry = found
+    undone = journal.undo(entry)
+    if undone is False:
+        console.print(
+            f"[red]✗ {path} changed since run {journal.name}; left alone[/red]"
+        )
+        raise typer.Exit(1)
+    if undone is None:
+        console.print(f"[green]✓ {path} is already restored[/green]")
+        return
+    console.print(f"[green]✓ Restored {path} from run {journal.name}[/green]")
+
+
+@app.command(rich_help_panel="Setup")
+def bundle(
+    output: Path = typer.Option(
+        Path("dist/dotfiles-bundle.tar"), "--output", "-o", help="Archive to write"
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None, "--cache-dir", help="Download cache directory"
+    ),
+) -> None:
+    """Build an offline install archive (Ubuntu; run on a host with network)."""
+    from installer.console import console
+    from installer.enums import OSType
+    from installer.package_managers import UbuntuPackageManager
+    from installer.system_manager import ConcreteSystemManager
+    from installer.tools_lock import LOCK_FILE
+
+    system_manager = ConcreteSystemManager()
+    if system_manager.get_os_type() != OSType.UBUNTU:
+        console.print("[red]✗ Bundles can only be built on Ubuntu[/red]")
+        raise typer.Exit(1)
+    package_manager = UbuntuPackageManager(
+        cache_dir=cache_dir, tools_lock=DOTFILES_DIR / LOCK_FILE
+    )
+    if not package_manager.create_bundle(
+        system_manager, DOTFILES_DIR, output.absolute()
+    ):
+        raise typer.Exit(1)
+
+
+@app.command(rich_help_panel="Setup")
+def lock(
+    update: bool = typer.Option(
+        False, "--update", help="Pin every tool to its latest release and rehash"
+    ),
+) -> None:
+    """Show or refresh tools.lock, the pinned versions of directly downloaded tools."""
+    from installer.console import console
+    from installer.downloads import HttpDownloader
+    from installer.package_managers import LOCKED_ARTIFACTS
+    from installer.tools_lock import LOCK_FILE, load_lock, lock_tool, save_lock
+
+    lock_path = DOTFILES_DIR / LOCK_FILE
+    tools = load_lock(lock_path)
+    if update:
+        downloader = HttpDownloader()
+        for artifact in LOCKED_ARTIFACTS:
+            try:
+                locked = lock_tool(artifact, downloader)
+            except Exception as e:
+                console.print(f"[red]✗ Could not lock {artifact.name}: {e}[/red]")
+                raise typer.Exit(1)
+            previous = tools.get(artifact.name)
+            if previous and previous.version != locked.version:
+                change = f"{previous.version} → {locked.version}"
+            else:
+                change = locked.version
+            console.print(f"[green]✓ {artifact.name} {change}[/green]")
+            tools[artifact.name] = locked
+        save_lock(lock_path, tools)
+        console.print(f"[green]✓ Wrote {lock_path}[/green]")
+        return
+
+    for artifact in LOCKED_ARTIFACTS:
+        locked = tools.get(artifact.name)
+        if locked:
+            console.print(f"{artifact.name} {locked.version}  [dim]{locked.url}[/dim]")
+        else:
+            console.print(f"[yellow]⚠ {artifact.name} is not pinned[/yellow]")
+
+
+@app.command(rich_help_panel="Development")
+def bench(
+    latency: float = typer.Option(
+        0.0, "--latency", help="Simulated seconds for commands without a set latency"
+    ),
+    jobs: int = typer.Option(
+        4, "--jobs", "-j", min=1, help="Maximum number of steps run in parallel"
+    ),
+    update_budget: bool = typer.Option(
+        False, "--update-budget", help="Record the current spawn counts as the budget"
+    ),
+    os_name: str = typer.Option(
+        "ubuntu", "--os", help="Simulated OS: ubuntu or macos (runs on any host)"
+    ),
+    mirrors: bool = typer.Option(
+        False,
+        "--mirrors",
+        help="Benchmark apt package acquisition against local stand-in mirrors",
+    ),
+) -> None:
+    """Benchmark fresh, no-op and drift installs against a simulated system."""
+    from installer.console import console
+    from installer.enums import OSType
+
+    try:
+        # The harness lives next to the installer in the repository; it is
+        # not part of the installed package or the zipapp
+        from benchmarks import harness as benchmark
+    except ImportError:
+        console.print("[red]✗ bench needs a checkout of the dotfiles repository[/red]")
+        raise typer.Exit(1)
+    if mirrors:
+        benchmark.print_results(benchmark.run_mirror_benchmark(), {})
+        return
+    try:
+        os_type = OSType(os_name)
+    except ValueError:
+        console.print(f"[red]Unknown OS '{os_name}' (use ubuntu or macos)[/red]")
+        raise typer.Exit(1)
+    import_ms, eager = benchmark.measure_cli_import()
+    results = benchmark.run_scenarios(DOTFILES_DIR, latency, jobs, os_type)
+    if update_budget:
+        budget = benchmark.save_budget(results)
+        benchmark.print_results(results, budget, import_ms)
+        console.print(f"[green]✓ Budget written to {benchmark.BUDGET_FILE}[/green]")
+        return
+
+    budget = benchmark.load_budget()
+    benchmark.print_results(results, budget, import_ms)
+    failures = benchmark.over_budget(results, budget)
+    failures += benchmark.import_failures(import_ms, eager)
+    for failure in failures:
+        console.print(f"[red]✗ {failure}[/red]")
+    if failures:
+        raise typer.Exit(1)
 
 
 @app.command(rich_help_panel="Release")
@@ -53,6 +372,8 @@ def release(
     major: bool = typer.Option(False, "--major", help="Force major version bump"),
 ) -> None:
     """Cut a release: bump version, update CHANGELOG.md, commit, and tag."""
+    from installer.console import console
+
     if sum([patch, minor, major]) > 1:
         console.print(
             "[red]Error: only one of --patch, --minor, --major may be specified[/red]"
@@ -137,11 +458,14 @@ def next_version() -> None:
             text=True,
             cwd=DOTFILES_DIR,
         ).stdout.strip()
+        from installer.console import console
+
         console.print(
             f"[yellow]Nothing to release — no unreleased commits since {current}.[/yellow]"
         )
         raise typer.Exit(1)
-    console.print(result.stdout.strip())
+    # Plain echo keeps rich out of the common path; scripts call this often
+    typer.echo(result.stdout.strip())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+import threading
+from importlib import resources
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from installer.desired_state import points_to
+from installer.interfaces import SystemManager
+
+MANIFEST_VERSION = 1
+SKIPPED_DIRS = {"__pycache__", ".git"}
+
+StepInput = Union[Path, str]
+
+
+def state_dir() -> Path:
+    """Directory for installer state (XDG_STATE_HOME, default ~/.local/state)."""
+    base = os.environ.get("XDG_STATE_HOME") or str(Path.home() / ".local" / "state")
+    return Path(base) / "dotfiles"
+
+
+def _hash_file(digest: "hashlib._Hash", path: Path) -> None:
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+
+
+def _hash_path(digest: "hashlib._Hash", path: Path) -> None:
+    digest.update(f"path:{path}\0".encode())
+    if path.is_symlink():
+        digest.update(f"link:{os.readlink(path)}\0".encode())
+    elif path.is_file():
+        _hash_file(digest, path)
+    elif path.is_dir():
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+            for name in sorted(files):
+                file_path = Path(root) / name
+                digest.update(f"file:{file_path.relative_to(path)}\0".encode())
+                if file_path.is_symlink():
+                    digest.update(f"link:{os.readlink(file_path)}\0".encode())
+                else:
+                    _hash_file(digest, file_path)
+    else:
+        digest.update(b"missing\0")
+
+
+def installer_fingerprint() -> str:
+    """Hash of the installer's own sources, so changes to install logic rerun steps."""
+    digest = hashlib.sha256()
+    # importlib.resources also reads the sources when running from a zipapp
+    package = resources.files(__package__)
+    sources = sorted(
+        (entry for entry in package.iterdir() if entry.name.endswith(".py")),
+        key=lambda entry: entry.name,
+    )
+    for source in sources:
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+class InstallManifest:
+    """Persistent per-step record of input hashes and produced outputs."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or state_dir() / "manifest.json"
+        self._steps: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._installer_fingerprint: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "InstallManifest":
+        manifest = cls(path)
+        try:
+            data = json.loads(manifest.path.read_text())
+            if data.get("version") == MANIFEST_VERSION:
+                manifest._steps = data.get("steps", {})
+        except (OSError, ValueError):
+            pass  # Missing or unreadable manifest: every step is treated as stale
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        with self._lock:
+            data = {"version": MANIFEST_VERSION, "steps": self._steps}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+        os.replace(tmp, self.path)
+
+    def fingerprint(self, name: str, inputs: Iterable[StepInput]) -> str:
+        """Hash a step's inputs: file/directory contents and literal values."""
+        if self._installer_fingerprint is None:
+            self._installer_fingerprint = installer_fingerprint()
+        digest = hashlib.sha256()
+        digest.update(
+            f"step:{name}\0installer:{self._installer_fingerprint}\0".encode()
+        )
+        for item in inputs:
+            if isinstance(item, Path):
+                _hash_path(digest, item)
+            else:
+                digest.update(f"value:{item}\0".encode())
+        return digest.hexdigest()
+
+    def is_current(
+        self,
+        name: str,
+        fingerprint: str,
+        system_manager: SystemManager,
+        probe: Optional[Callable[[], bool]] = None,
+    ) -> bool:
+        """True when the step's inputs are unchanged and its outputs are still in place.
+
+        A step with nothing to check (no links, commands or ``probe``) is
+        never current, since its effects could have been undone unnoticed.
+        """
+        entry = self._steps.get(name)
+        if not entry or entry.get("inputs") != fingerprint:
+            return False
+        if not (entry.get("links") or entry.get("commands") or probe):
+            return False
+        if probe and not probe():
+            return False
+        for target, source in entry.get("links", {}).items():
+            try:
+                if os.readlink(target) != source and not points_to(
+                    Path(target), Path(source)
+                ):
+                    return False
+            except OSError:
+                return False
+        return all(
+            system_manager.check_command_exists(command)
+            for command in entry.get("commands", [])
+        )
+
+    def result(self, name: str) -> Tuple[int, int]:
+        success, total = self._steps[name].get("result", (1, 1))
+        return success, total
+
+    def record(
+        self,
+        name: str,
+        fingerprint: str,
+        result: Tuple[int, int],
+        links: Dict[Path, Path],
+        commands: List[str],
+    ) -> None:
+        """Record a completed step and what it produced."""
+        with self._lock:
+            self._steps[name] = {
+                "inputs": fingerprint,
+                "result": list(result),
+                "links": {str(target): str(source) for target, source in links.items()},
+                "commands": list(commands),
+            }
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._steps.pop(name, None)
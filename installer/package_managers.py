@@ -1,66 +1,327 @@
 #!/usr/bin/env python3
 
+import os
+import shlex
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Union
 
-from rich.console import Console
-
+from installer.artifacts import Artifact
+from installer.brewfile import BrewPlan, parse_brew_list, parse_brewfile
+from installer.console import console
 from installer.enums import OSType
-from installer.interfaces import PackageManager, SystemManager
+from installer.interfaces import Downloader, PackageManager, SystemManager
+from installer.tracing import traced
+
+if TYPE_CHECKING:
+    from installer.bundle import Bundle
+    from installer.downloads import DownloadStage
+
+BREWFILES = [
+    ("brew/Brewfile.devtools", "development tools"),
+    ("brew/Brewfile.k8s", "Kubernetes tools"),
+    ("brew/Brewfile.media", "media tools"),
+    ("brew/Brewfile.gui", "GUI applications"),
+    ("brew/Brewfile.apps", "applications"),
+]
+# Concurrent `brew fetch` processes while prefetching bottles and casks
+BREW_FETCH_JOBS = 4
+
+APT_PACKAGES = [
+    "zsh",
+    "git",
+    "git-lfs",
+    "curl",
+    "wget",
+    "jq",
+    "ripgrep",
+    "fd-find",
+    "bat",
+    "tmux",
+    "direnv",
+    "btop",
+    "httpie",
+    "ncdu",
+    "unzip",
+    "build-essential",
+    "software-properties-common",
+]
+
+
+@dataclass(frozen=True)
+class AptRepository:
+    """A third-party apt source and the package installed from it."""
+
+    name: str
+    command: str  # Installed when this command is already on $PATH
+    package: str
+    # Writes the keyring and source list; must not run apt-get update itself.
+    # "{key}" is replaced with the path of the downloaded signing key.
+    register: str
+    # Files ``register`` writes, removed again if it fails part way
+    sources: str = ""
+    required: bool = False
+    key: Optional[Artifact] = None
+
+
+APT_REPOSITORIES = [
+    AptRepository(
+        "Neovim (unstable PPA)",
+        "nvim",
+        "neovim",
+        # Written directly rather than with add-apt-repository, which minimal
+        # images lack and would need its own apt-get update to install
+        "sudo rm -f /etc/apt/sources.list.d/neovim-ppa-ubuntu-unstable-* && "
+        "sudo install -D -m 644 {key} /etc/apt/keyrings/neovim-ppa.asc && "
+        'echo "deb [signed-by=/etc/apt/keyrings/neovim-ppa.asc]'
+        " https://ppa.launchpadcontent.net/neovim-ppa/unstable/ubuntu"
+        ' $(. /etc/os-release && echo $VERSION_CODENAME) main"'
+        " | sudo tee /etc/apt/sources.list.d/neovim-ppa-unstable.list >/dev/null",
+        sources="/etc/apt/sources.list.d/neovim-ppa-unstable.list",
+        required=True,
+        key=Artifact(
+            "neovim-key",
+            "https://keyserver.ubuntu.com/pks/lookup?op=get"
+            "&search=0x9DBB0BE9366964F134855E2255F96FCF8231B6DD",
+        ),
+    ),
+    AptRepository(
+        "eza",
+        "eza",
+        "eza",
+        "sudo mkdir -p /etc/apt/keyrings && "
+        "sudo gpg --dearmor --yes -o /etc/apt/keyrings/gierens.gpg {key} && "
+        'echo "deb [signed-by=/etc/apt/keyrings/gierens.gpg] http://deb.gierens.de stable main" '
+        "| sudo tee /etc/apt/sources.list.d/gierens.list >/dev/null && "
+        "sudo chmod 644 /etc/apt/keyrings/gierens.gpg /etc/apt/sources.list.d/gierens.list",
+        sources="/etc/apt/sources.list.d/gierens.list",
+        key=Artifact(
+            "eza-key",
+            "https://raw.githubusercontent.com/eza-community/eza/main/deb.asc",
+        ),
+    ),
+    AptRepository(
+        "GitHub CLI (gh)",
+        "gh",
+        "gh",
+        "sudo install -D -m 644 {key} /usr/share/keyrings/githubcli-archive-keyring.gpg && "
+        'echo "deb [arch=$(dpkg --print-architecture)'
+        " signed-by=/usr/share/keyrings/githubcli-archive-keyring.gpg]"
+        ' https://cli.github.com/packages stable main"'
+        " | sudo tee /etc/apt/sources.list.d/github-cli.list >/dev/null",
+        sources="/etc/apt/sources.list.d/github-cli.list",
+        key=Artifact(
+            "gh-key", "https://cli.github.com/packages/githubcli-archive-keyring.gpg"
+        ),
+    ),
+]
+
+
+# Installed from release downloads; fetched while apt runs
+DEB_ARTIFACTS = [
+    Artifact(
+        "delta",
+        "https://github.com/dandavison/delta/releases/download/{tag}/git-delta_{tag}_amd64.deb",
+        repo="dandavison/delta",
+    ),
+    Artifact(
+        "git-cliff",
+        "https://github.com/orhun/git-cliff/releases/download/{tag}/git-cliff_{version}_amd64.deb",
+        repo="orhun/git-cliff",
+    ),
+]
+FZF_ARTIFACT = Artifact(
+    "fzf",
+    "https://github.com/junegunn/fzf/releases/download/{tag}/fzf-{version}-linux_amd64.tar.gz",
+    repo="junegunn/fzf",
+)
+RELEASE_ARTIFACTS = DEB_ARTIFACTS + [FZF_ARTIFACT]
 
-console = Console()
+# Standalone binaries for offline bundles, where installer scripts cannot
+# download anything. Maps each to the commands it provides and their paths
+# inside the release tarball (None when the download is the binary itself).
+MISE_BINARY = Artifact(
+    "mise-linux",
+    "https://github.com/jdx/mise/releases/download/{tag}/mise-{tag}-linux-x64",
+    repo="jdx/mise",
+)
+UV_ARCHIVE = Artifact(
+    "uv-linux",
+    "https://github.com/astral-sh/uv/releases/download/{tag}/uv-x86_64-unknown-linux-gnu.tar.gz",
+    repo="astral-sh/uv",
+)
+ZOXIDE_ARCHIVE = Artifact(
+    "zoxide-linux",
+    "https://github.com/ajeetdsouza/zoxide/releases/download/{tag}/zoxide-{version}-x86_64-unknown-linux-musl.tar.gz",
+    repo="ajeetdsouza/zoxide",
+)
+OFFLINE_BINARIES: List[Tuple[Artifact, Dict[str, Optional[str]]]] = [
+    (MISE_BINARY, {"mise": None}),
+    (
+        UV_ARCHIVE,
+        {
+            "uv": "uv-x86_64-unknown-linux-gnu/uv",
+            "uvx": "uv-x86_64-unknown-linux-gnu/uvx",
+        },
+    ),
+    (ZOXIDE_ARCHIVE, {"zoxide": "zoxide"}),
+]
+
+# Release downloads pinned by tools.lock (see `dot lock --update`)
+LOCKED_ARTIFACTS = RELEASE_ARTIFACTS + [artifact for artifact, _ in OFFLINE_BINARIES]
+MISE_INSTALLER = Artifact("mise", "https://mise.run")
+UV_INSTALLER = Artifact("uv", "https://astral.sh/uv/install.sh")
+ZOXIDE_INSTALLER = Artifact(
+    "zoxide",
+    "https://raw.githubusercontent.com/ajeetdsouza/zoxide/main/install.sh",
+)
+KITTY_TERMINFO_ARTIFACT = Artifact(
+    "xterm-kitty",
+    "https://raw.githubusercontent.com/kovidgoyal/kitty/master/terminfo/x/xterm-kitty",
+)
+
+ANTIDOTE_REPO = "https://github.com/getantidote/antidote.git"
+
+
+def antidote_home() -> Path:
+    """Where antidote keeps plugin clones (see zsh/linux/02_environment.zsh)."""
+    if os.environ.get("ANTIDOTE_HOME"):
+        return Path(os.environ["ANTIDOTE_HOME"])
+    cache = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache) / "antidote"
+
+
+def _installer_command(installer: Optional[Path], artifact: Artifact) -> str:
+    """Run a prefetched (possibly cached) installer script; fall back to piping it."""
+    if installer:
+        return f"sh {shlex.quote(str(installer))}"
+    return f"curl -fsSL {artifact.url} | sh"
+
+
+def _batches(names: List[str], count: int) -> List[List[str]]:
+    """Split ``names`` round-robin into at most ``count`` non-empty batches."""
+    return [batch for batch in (names[i::count] for i in range(count)) if batch]
+
+
+def terminfo_installed(name: str) -> bool:
+    """Look up a terminfo entry the way ncurses does, without running infocmp."""
+    dirs = [os.environ.get("TERMINFO", ""), str(Path.home() / ".terminfo")]
+    dirs += os.environ.get("TERMINFO_DIRS", "").split(":")
+    dirs += ["/etc/terminfo", "/lib/terminfo", "/usr/share/terminfo"]
+    # Entries live under their first letter, or its hex code on some systems
+    subdirs = (name[0], f"{ord(name[0]):x}")
+    return any(
+        os.path.exists(os.path.join(directory, subdir, name))
+        for directory in dirs
+        if directory
+        for subdir in subdirs
+    )
 
 
 class MacOSPackageManager(PackageManager):
     """Package manager for macOS using Homebrew."""
 
-    def __init__(self, dotfiles_dir: Path):
+    def __init__(
+        self,
+        dotfiles_dir: Path,
+        brew: Optional[str] = None,
+        fetch_jobs: int = BREW_FETCH_JOBS,
+    ):
         self.dotfiles_dir = dotfiles_dir
+        # DOTFILES_BREW swaps in another brew, e.g. a recording stub on Linux
+        self.brew = brew or os.environ.get("DOTFILES_BREW", "brew")
+        self.fetch_jobs = fetch_jobs
 
     def get_package_manager_name(self) -> str:
         """Get the name of the package manager."""
         return "Homebrew"
 
-    def install_packages(self, system_manager: SystemManager) -> bool:
+    def get_inputs(self) -> List[Union[Path, str]]:
+        """Brewfile contents determine what gets installed."""
+        return [self.dotfiles_dir / brewfile for brewfile, _ in BREWFILES]
+
+    def _installed(self, system_manager: SystemManager) -> Optional[Set[str]]:
+        """One snapshot of installed formulae and casks, or None if brew failed."""
+        output = system_manager.capture_command(f"{self.brew} list --versions")
+        return None if output is None else parse_brew_list(output)
+
+    def _pending_brewfiles(self, installed: Optional[Set[str]]) -> List[Path]:
+        """Brewfiles with at least one entry missing from the snapshot."""
+        pending = []
+        for brewfile, description in BREWFILES:
+            brewfile_path = self.dotfiles_dir / brewfile
+            if not brewfile_path.exists():
+                console.print(
+                    f"[yellow]⚠️  {brewfile} not found, skipping {description}[/yellow]"
+                )
+            elif installed is not None and all(
+                entry.is_installed(installed) for entry in parse_brewfile(brewfile_path)
+            ):
+                console.print(f"[green]✓ {description} already installed[/green]")
+            else:
+                pending.append(brewfile_path)
+        return pending
+
+    @traced(category="package")
+    def install_packages(
+        self, system_manager: SystemManager, refresh: bool = False
+    ) -> bool:
         """Install packages for macOS using Homebrew."""
         console.print("\n[bold cyan]📦 Setting up Homebrew and packages...[/bold cyan]")
 
         success = True
 
         # Install Homebrew if needed
-        if not system_manager.check_command_exists("brew"):
+        if self.brew == "brew" and not system_manager.check_command_exists("brew"):
             console.print("Installing Homebrew...")
             success &= system_manager.run_interactive_command(
                 '/bin/bash -c "$(curl -fsSL https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh)"',
                 "Installing Homebrew (may require password)...",
             )
+            system_manager.invalidate_commands(["brew"])
         else:
             console.print("[green]✓ Homebrew already installed[/green]")
 
-        # Update and install from Brewfiles
-        success &= system_manager.run_command("brew update", "Updating Homebrew...")
-
-        brewfiles = [
-            ("brew/Brewfile.devtools", "development tools"),
-            ("brew/Brewfile.k8s", "Kubernetes tools"),
-            ("brew/Brewfile.media", "media tools"),
-            ("brew/Brewfile.gui", "GUI applications"),
-            ("brew/Brewfile.apps", "applications"),
-        ]
+        # Satisfied Brewfiles are skipped; with none left brew is not run again
+        installed = self._installed(system_manager)
+        pending = self._pending_brewfiles(installed)
+        if pending or refresh:
+            success &= system_manager.run_command(
+                f"{self.brew} update", "Updating Homebrew..."
+            )
+        else:
+            console.print("[green]✓ Homebrew packages already installed[/green]")
 
-        for brewfile, description in brewfiles:
-            brewfile_path = self.dotfiles_dir / brewfile
-            if brewfile_path.exists():
-                console.print(f"Installing {description}...")
+        # One merged plan instead of a brew bundle per Brewfile: the dependency
+        # tree is resolved once and shared formulae are handled once
+        plan = BrewPlan.from_brewfiles(pending)
+        if plan.entries:
+            if plan.taps:
+                success &= system_manager.run_command(
+                    " && ".join(f"{self.brew} tap {tap}" for tap in plan.taps),
+                    f"Tapping {len(plan.taps)} repositories...",
+                )
+            self._prefetch(
+                system_manager, plan if installed is None else plan.missing(installed)
+            )
+            with tempfile.NamedTemporaryFile(
+                "w", prefix="Brewfile.", suffix=".merged"
+            ) as brewfile:
+                brewfile.write(plan.render())
+                brewfile.flush()
                 # brew bundle may require password for cask installations
                 success &= system_manager.run_interactive_command(
-                    f"brew bundle --file={brewfile}",
-                    f"Installing {description} (may require password)...",
-                )
-            else:
-                console.print(
-                    f"[yellow]⚠️  {brewfile} not found, skipping {description}[/yellow]"
+                    f"{self.brew} bundle --file={shlex.quote(brewfile.name)}",
+                    f"Installing {len(plan.entries)} Homebrew packages "
+                    "(may require password)...",
                 )
 
+        # Brewfiles provide many tools; drop the whole command index
+        system_manager.invalidate_commands()
+
         # Show optional packages
         optional_brewfile = self.dotfiles_dir / "brew" / "Brewfile.optional"
         if optional_brewfile.exists():
@@ -73,12 +334,82 @@ class MacOSPackageManager(PackageManager):
 
         return success
 
+    @traced(category="package")
+    def _prefetch(self, system_manager: SystemManager, plan: BrewPlan) -> bool:
+        """Download bottles and casks in parallel batches before the install pass.
+
+        Up to ``fetch_jobs`` ``brew fetch`` processes run at once, each over a
+        slice of the plan; brew's download locks keep shared dependencies
+        from being fetched twice. Failures are left for brew bundle to report.
+        """
+        formulae, casks = plan.formulae, plan.casks
+        # Formulae and casks need separate commands; share the slots by count
+        cask_jobs = 0
+        if casks:
+            share = round(self.fetch_jobs * len(casks) / (len(formulae) + len(casks)))
+            cask_jobs = max(1, min(share, self.fetch_jobs - 1 if formulae else share))
+        formula_jobs = max(1, self.fetch_jobs - cask_jobs)
+        commands = [
+            f"{self.brew} fetch --deps --formula {' '.join(batch)}"
+            for batch in _batches(formulae, formula_jobs)
+        ] + [
+            f"{self.brew} fetch --cask {' '.join(batch)}"
+            for batch in _batches(casks, cask_jobs)
+        ]
+        if not commands:
+            return True
+        with ThreadPoolExecutor(
+            max_workers=self.fetch_jobs, thread_name_prefix="brew-fetch"
+        ) as pool:
+            results = list(
+                pool.map(
+                    lambda command: system_manager.run_command(
+                        command, "Prefetching bottles and casks..."
+                    ),
+                    commands,
+                )
+            )
+        if not all(results):
+            console.print(
+                "[yellow]⚠ Some prefetches failed — brew bundle will retry them[/yellow]"
+            )
+        return True  # non-fatal
+
 
 class UbuntuPackageManager(PackageManager):
     """Package manager for Ubuntu using apt and direct installs."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        dpkg_status: Optional[Path] = None,
+        apt_lists: Optional[Path] = None,
+        lists_max_age: Optional[float] = None,
+        downloader: Optional[Downloader] = None,
+        cache_dir: Optional[Path] = None,
+        tools_lock: Optional[Path] = None,
+        bundle: Optional["Bundle"] = None,
+        fast_apt: Optional[bool] = None,
+    ):
+        from installer.apt import APT_LISTS, APT_LISTS_MAX_AGE, DPKG_STATUS
+        from installer.artifact_cache import ArtifactCache, CachingDownloader
+        from installer.downloads import HttpDownloader
+
         self._phase = 0
+        self.tools_lock = tools_lock
+        self.bundle = bundle
+        self.downloader = downloader or CachingDownloader(
+            HttpDownloader(), ArtifactCache(cache_dir)
+        )
+        self.dpkg_status = dpkg_status or DPKG_STATUS
+        self.apt_lists = apt_lists or APT_LISTS
+        if lists_max_age is None:
+            lists_max_age = float(
+                os.environ.get("DOTFILES_APT_MAX_AGE", APT_LISTS_MAX_AGE)
+            )
+        self.lists_max_age = lists_max_age
+        if fast_apt is None:
+            fast_apt = os.environ.get("DOTFILES_APT_FAST", "") not in ("", "0")
+        self.fast_apt = fast_apt
 
     def _phase_header(self, name: str) -> None:
         self._phase += 1
@@ -87,152 +418,375 @@ class UbuntuPackageManager(PackageManager):
     def get_package_manager_name(self) -> str:
         return "APT (Ubuntu/Debian)"
 
-    def install_packages(self, system_manager: SystemManager) -> bool:
+    def get_inputs(self) -> List[Union[Path, str]]:
+        inputs: List[Union[Path, str]] = [" ".join(APT_PACKAGES)]
+        if self.tools_lock:
+            inputs.append(self.tools_lock)
+        if self.bundle:
+            inputs.append(f"bundle:{self.bundle.digest}")
+        return inputs
+
+    @traced(category="package")
+    def install_packages(
+        self, system_manager: SystemManager, refresh: bool = False
+    ) -> bool:
+        from installer.downloads import DownloadStage
+
         self._phase = 0
+        if self.bundle:
+            return self._install_from_bundle(system_manager, self.bundle)
         success = True
-        success &= self._install_apt_packages(system_manager)
-        success &= self._install_neovim(system_manager)
-        success &= self._install_eza(system_manager)
-        success &= self._install_gh(system_manager)
-        success &= self._install_fzf(system_manager)
-        success &= self._install_delta(system_manager)
-        success &= self._install_antidote(system_manager)
-        success &= self._install_mise(system_manager)
-        success &= self._install_uv(system_manager)
-        success &= self._install_zoxide(system_manager)
-        success &= self._install_git_cliff(system_manager)
-        self._install_kitty_terminfo(system_manager)  # non-critical
+        # Direct downloads need no apt lock, so fetch them while apt runs
+        with DownloadStage(self.downloader) as downloads:
+            downloads.start(self._missing_artifacts(system_manager))
+            repositories, ok = self._register_apt_repositories(
+                system_manager, downloads
+            )
+            success &= ok
+            success &= self._install_apt_packages(system_manager, repositories, refresh)
+            fetched = downloads.results()
+            success &= self._install_downloads(system_manager, fetched)
+            success &= self._install_antidote(system_manager)
+            success &= self._install_mise(system_manager, fetched.get("mise"))
+            success &= self._install_uv(system_manager, fetched.get("uv"))
+            success &= self._install_zoxide(system_manager, fetched.get("zoxide"))
         return success
 
-    def _install_apt_packages(self, system_manager: SystemManager) -> bool:
-        self._phase_header("apt base packages")
-        packages = [
-            "zsh",
-            "git",
-            "git-lfs",
-            "curl",
-            "wget",
-            "jq",
-            "ripgrep",
-            "fd-find",
-            "bat",
-            "tmux",
-            "direnv",
-            "btop",
-            "httpie",
-            "ncdu",
-            "unzip",
-            "build-essential",
-            "software-properties-common",
+    def _missing_releases(self, system_manager: SystemManager) -> List[Artifact]:
+        missing: List[Artifact] = []
+        for artifact in RELEASE_ARTIFACTS:
+            if system_manager.check_command_exists(artifact.name):
+                console.print(f"[green]✓ {artifact.name} already installed[/green]")
+            else:
+                missing.append(artifact)
+        return missing
+
+    def _missing_artifacts(self, system_manager: SystemManager) -> List[Artifact]:
+        """Release downloads, installer scripts and apt keys not installed yet."""
+        from installer.tools_lock import LOCK_FILE, load_lock, pin
+
+        missing: List[Artifact] = [
+            repository.key
+            for repository in APT_REPOSITORIES
+            if repository.key
+            and not system_manager.check_command_exists(repository.command)
         ]
-        ok = system_manager.run_interactive_command(
-            "sudo apt-get update -qq", "Updating apt..."
-        )
-        ok &= system_manager.run_interactive_command(
-            f"sudo apt-get install -y {' '.join(packages)}",
-            "Installing apt packages...",
-        )
-        return ok
+        releases = self._missing_releases(system_manager)
+        if releases:
+            lock = load_lock(self.tools_lock) if self.tools_lock else {}
+            unpinned = [
+                artifact.name for artifact in releases if artifact.name not in lock
+            ]
+            if unpinned:
+                console.print(
+                    f"[yellow]⚠ {', '.join(unpinned)} not pinned in {LOCK_FILE} — "
+                    "using the latest release (run 'dot lock --update')[/yellow]"
+                )
+            missing += pin(releases, lock)
+        if terminfo_installed(KITTY_TERMINFO_ARTIFACT.name):
+            console.print("[green]✓ kitty terminfo already installed[/green]")
+        else:
+            missing.append(KITTY_TERMINFO_ARTIFACT)
+        for installer in (MISE_INSTALLER, UV_INSTALLER, ZOXIDE_INSTALLER):
+            if not system_manager.check_command_exists(installer.name):
+                missing.append(installer)
+        return missing
+
+    @traced(category="package")
+    def _register_apt_repositories(
+        self, system_manager: SystemManager, downloads: "DownloadStage"
+    ) -> Tuple[List[AptRepository], bool]:
+        """Write keyrings and source lists for every missing third-party package.
+
+        Nothing here refreshes the package index; the apt phase does one
+        ``apt-get update`` for all sources. Returns the repositories whose
+        packages should be installed, and False if a required one failed.
+        """
+        self._phase_header("apt repositories")
+        missing = [
+            repository
+            for repository in APT_REPOSITORIES
+            if not system_manager.check_command_exists(repository.command)
+        ]
+        for repository in APT_REPOSITORIES:
+            if repository not in missing:
+                console.print(f"[green]✓ {repository.name} already installed[/green]")
+        if not missing:
+            return [], True
+        return self._add_repositories(system_manager, downloads, missing)
 
-    def _install_neovim(self, system_manager: SystemManager) -> bool:
-        self._phase_header("Neovim (unstable PPA)")
-        if system_manager.check_command_exists("nvim"):
-            console.print("[green]✓ Neovim already installed[/green]")
+    def _add_repositories(
+        self,
+        system_manager: SystemManager,
+        downloads: "DownloadStage",
+        missing: List[AptRepository],
+    ) -> Tuple[List[AptRepository], bool]:
+        registered: List[AptRepository] = []
+        success = True
+        for repository in missing:
+            register = repository.register
+            if repository.key:
+                key = downloads.result(repository.key.name)
+                register = register.format(key=shlex.quote(str(key))) if key else ""
+            if register and system_manager.run_interactive_command(
+                register, f"Adding {repository.name} repository..."
+            ):
+                registered.append(repository)
+                continue
+            if register and repository.sources:
+                # A half-written source list would fail every later apt run
+                system_manager.run_command(
+                    f"sudo rm -f {repository.sources}",
+                    f"Removing the {repository.name} source list...",
+                )
+            if repository.required:
+                console.print(
+                    f"[red]✗ Could not add the {repository.name} repository[/red]"
+                )
+                success = False
+            else:
+                console.print(
+                    f"[yellow]⚠ {repository.name} repository failed — skipping[/yellow]"
+                )
+        return registered, success
+
+    @traced(category="package")
+    def _install_apt_packages(
+        self,
+        system_manager: SystemManager,
+        repositories: List[AptRepository],
+        refresh: bool = False,
+    ) -> bool:
+        """One index refresh and one install for base and third-party packages.
+
+        The missing set comes from the dpkg status file, so a box that already
+        has everything costs one file read and no apt runs. If the combined
+        install fails, the base packages are retried on their own, then each
+        third-party package, so one broken repository cannot block the rest.
+        """
+        from installer.apt import lists_are_fresh, missing_packages
+
+        self._phase_header("apt packages")
+        packages = APT_PACKAGES + [repository.package for repository in repositories]
+        missing = missing_packages(packages, self.dpkg_status)
+        if not missing and not refresh:
+            console.print("[green]✓ apt packages already installed[/green]")
             return True
-        ok = system_manager.run_interactive_command(
-            "sudo add-apt-repository -y ppa:neovim-ppa/unstable",
-            "Adding neovim PPA...",
-        )
-        ok &= system_manager.run_interactive_command(
-            "sudo apt-get update -qq && sudo apt-get install -y neovim",
-            "Installing Neovim...",
+
+        ok = True
+        # A just-added repository has no lists yet, however fresh the others are
+        if (
+            refresh
+            or repositories
+            or not lists_are_fresh(self.lists_max_age, self.apt_lists)
+        ):
+            ok &= system_manager.run_interactive_command(
+                "sudo apt-get update -qq", "Updating apt..."
+            )
+        else:
+            console.print(
+                "[green]✓ apt package lists are fresh, skipping update[/green]"
+            )
+        if not missing:
+            console.print("[green]✓ apt packages already installed[/green]")
+            return ok
+        with tempfile.TemporaryDirectory(prefix="dotfiles-apt-") as directory:
+            config = (
+                self._fast_acquire(system_manager, missing, Path(directory))
+                if self.fast_apt
+                else None
+            )
+            options = f"-c {shlex.quote(str(config))} " if config else ""
+
+            def install(names: List[str], description: str) -> bool:
+                return system_manager.run_interactive_command(
+                    f"sudo apt-get install -y {options}{' '.join(names)}", description
+                )
+
+            if not install(missing, f"Installing {len(missing)} apt packages..."):
+                ok &= self._install_separately(install, missing, repositories)
+        system_manager.invalidate_commands()
+        return ok
+
+    def _install_separately(
+        self,
+        install: Callable[[List[str], str], bool],
+        missing: List[str],
+        repositories: List[AptRepository],
+    ) -> bool:
+        """Fallback after a failed combined install: the base packages in one
+        transaction, then each third-party package on its own."""
+        console.print(
+            "[yellow]⚠ Combined apt install failed — retrying base and "
+            "third-party packages separately[/yellow]"
         )
+        base = [package for package in missing if package in APT_PACKAGES]
+        ok = True
+        if base and not install(base, f"Installing {len(base)} base apt packages..."):
+            console.print("[red]✗ Could not install the base apt packages[/red]")
+            ok = False
+        for repository in repositories:
+            if repository.package not in missing:
+                continue
+            if install([repository.package], f"Installing {repository.package}..."):
+                continue
+            if repository.required:
+                console.print(f"[red]✗ Could not install {repository.package}[/red]")
+                ok = False
+            else:
+                console.print(
+                    f"[yellow]⚠ {repository.package} install failed — skipping[/yellow]"
+                )
         return ok
 
-    def _install_eza(self, system_manager: SystemManager) -> bool:
-        self._phase_header("eza")
-        if system_manager.check_command_exists("eza"):
-            console.print("[green]✓ eza already installed[/green]")
-            return True
-        script = (
-            "sudo mkdir -p /etc/apt/keyrings && "
-            "wget -qO- https://raw.githubusercontent.com/eza-community/eza/main/deb.asc "
-            "| sudo gpg --dearmor -o /etc/apt/keyrings/gierens.gpg && "
-            'echo "deb [signed-by=/etc/apt/keyrings/gierens.gpg] http://deb.gierens.de stable main" '
-            "| sudo tee /etc/apt/sources.list.d/gierens.list && "
-            "sudo chmod 644 /etc/apt/keyrings/gierens.gpg /etc/apt/sources.list.d/gierens.list && "
-            "sudo apt-get update -qq && sudo apt-get install -y eza"
+    @traced(category="package")
+    def _fast_acquire(
+        self, system_manager: SystemManager, packages: List[str], directory: Path
+    ) -> Optional[Path]:
+        """Prefetch the .debs apt would download from the fastest mirrors.
+
+        Returns an apt config snippet that points apt at the prefetched files,
+        or None to let apt download everything itself.
+        """
+        from installer.apt_mirrors import (
+            MIRROR_COUNT,
+            candidate_mirrors,
+            parse_print_uris,
+            prefetch_debs,
+            rank_mirrors,
+            release_codename,
+            write_apt_config,
         )
-        ok = system_manager.run_interactive_command(script, "Installing eza...")
-        if not ok:
-            console.print("[yellow]⚠ eza install failed — skipping[/yellow]")
-        return True  # non-fatal
+        from installer.downloads import HttpDownloader
 
-    def _install_gh(self, system_manager: SystemManager) -> bool:
-        self._phase_header("GitHub CLI (gh)")
-        if system_manager.check_command_exists("gh"):
-            console.print("[green]✓ gh already installed[/green]")
-            return True
-        script = (
-            "curl -fsSL https://cli.github.com/packages/githubcli-archive-keyring.gpg"
-            " | sudo dd of=/usr/share/keyrings/githubcli-archive-keyring.gpg && "
-            "sudo chmod go+r /usr/share/keyrings/githubcli-archive-keyring.gpg && "
-            'echo "deb [arch=$(dpkg --print-architecture)'
-            " signed-by=/usr/share/keyrings/githubcli-archive-keyring.gpg]"
-            ' https://cli.github.com/packages stable main"'
-            " | sudo tee /etc/apt/sources.list.d/github-cli.list && "
-            "sudo apt-get update -qq && sudo apt-get install -y gh"
+        output = system_manager.capture_command(
+            f"apt-get install --print-uris -qq -y {' '.join(packages)}"
         )
-        ok = system_manager.run_interactive_command(script, "Installing gh...")
-        if not ok:
-            console.print("[yellow]⚠ gh install failed — skipping[/yellow]")
-        return True  # non-fatal
+        uris = parse_print_uris(output or "")
+        if not uris:
+            return None
+        ranked = rank_mirrors(candidate_mirrors(self.downloader), release_codename())[
+            :MIRROR_COUNT
+        ]
+        if ranked:
+            console.print(
+                "[dim]Fastest mirrors: "
+                + ", ".join(
+                    f"{mirror} ({latency * 1000:.0f} ms)" for mirror, latency in ranked
+                )
+                + "[/dim]"
+            )
+        # apt reads the archive directory as root and its _apt sandbox user
+        directory.chmod(0o755)
+        fetched = prefetch_debs(
+            uris,
+            [mirror for mirror, _ in ranked],
+            directory / "archives",
+            HttpDownloader(retries=1),
+        )
+        count = sum(fetched.values())
+        size = sum(uri.size for uri in uris if fetched[uri.filename])
+        console.print(
+            f"[green]✓ Prefetched {count}/{len(uris)} packages "
+            f"({size / 1e6:.1f} MB)[/green]"
+        )
+        if count < len(uris):
+            console.print(
+                "[yellow]⚠ Some prefetches failed — apt will download them[/yellow]"
+            )
+        return write_apt_config(directory, ranked)
 
-    def _install_delta(self, system_manager: SystemManager) -> bool:
-        self._phase_header("git-delta (git pager)")
-        if system_manager.check_command_exists("delta"):
-            console.print("[green]✓ delta already installed[/green]")
+    @traced(category="package")
+    def _install_downloads(
+        self, system_manager: SystemManager, fetched: Dict[str, Optional[Path]]
+    ) -> bool:
+        """Install the release downloads the download stage fetched; all non-fatal."""
+        release_artifacts = DEB_ARTIFACTS + [FZF_ARTIFACT, KITTY_TERMINFO_ARTIFACT]
+        if not any(fetched.get(artifact.name) for artifact in release_artifacts):
             return True
-        script = (
-            "set -e && "
-            "DELTA_VERSION=$(curl -fsSL https://api.github.com/repos/dandavison/delta/releases/latest"
-            " | jq -r '.tag_name') && "
-            'curl -fsSL "https://github.com/dandavison/delta/releases/download/${DELTA_VERSION}/'
-            'git-delta_${DELTA_VERSION}_amd64.deb" -o /tmp/delta.deb && '
-            "sudo dpkg -i /tmp/delta.deb && rm /tmp/delta.deb"
-        )
-        ok = system_manager.run_interactive_command(script, "Installing delta...")
-        if not ok:
-            console.print("[yellow]⚠ delta install failed — skipping[/yellow]")
+        self._phase_header("release downloads (git-delta, git-cliff, fzf, terminfo)")
+
+        debs = {
+            artifact.name: fetched[artifact.name]
+            for artifact in DEB_ARTIFACTS
+            if fetched.get(artifact.name)
+        }
+        if debs:
+            # One dpkg transaction for every fetched .deb
+            ok = system_manager.run_interactive_command(
+                "sudo dpkg -i "
+                + " ".join(shlex.quote(str(deb)) for deb in debs.values()),
+                f"Installing {', '.join(debs)}...",
+            )
+            system_manager.invalidate_commands(list(debs))
+            if not ok:
+                console.print(
+                    f"[yellow]⚠ {', '.join(debs)} install failed — skipping[/yellow]"
+                )
+
+        fzf = fetched.get(FZF_ARTIFACT.name)
+        if fzf:
+            self._install_binary(fzf, {"fzf": "fzf"})
+            system_manager.invalidate_commands([FZF_ARTIFACT.name])
+
+        terminfo = fetched.get(KITTY_TERMINFO_ARTIFACT.name)
+        if terminfo:
+            ok = system_manager.run_command(
+                f"tic -x {shlex.quote(str(terminfo))}", "Installing kitty terminfo..."
+            )
+            if not ok:
+                console.print(
+                    "[yellow]⚠ kitty terminfo install failed — "
+                    "use 'kitten ssh' from your Kitty client as fallback[/yellow]"
+                )
         return True  # non-fatal
 
-    def _install_fzf(self, system_manager: SystemManager) -> bool:
-        self._phase_header("fzf (GitHub release)")
-        if system_manager.check_command_exists("fzf"):
-            console.print("[green]✓ fzf already installed[/green]")
+    def _install_binary(self, source: Path, members: Dict[str, Optional[str]]) -> bool:
+        """Install commands into ~/.local/bin from a release tarball or bare binary.
+
+        ``members`` maps each command to its path in the tarball, or to None
+        when ``source`` is the binary itself.
+        """
+        import tarfile
+
+        bin_dir = Path.home() / ".local" / "bin"
+        names = ", ".join(members)
+        try:
+            bin_dir.mkdir(parents=True, exist_ok=True)
+            for name, member in members.items():
+                target = bin_dir / name
+                if member is None:
+                    shutil.copyfile(source, target)
+                else:
+                    with tarfile.open(source) as archive:
+                        extracted = archive.extractfile(member)
+                        if extracted is None:
+                            raise KeyError(member)
+                        target.write_bytes(extracted.read())
+                target.chmod(0o755)
+            console.print(f"[green]✓ Installed {names} to ~/.local/bin[/green]")
             return True
-        script = (
-            "set -e && "
-            "FZF_VERSION=$(curl -fsSL https://api.github.com/repos/junegunn/fzf/releases/latest"
-            " | jq -r '.tag_name | ltrimstr(\"v\")') && "
-            "mkdir -p ~/.local/bin && "
-            'curl -fsSL "https://github.com/junegunn/fzf/releases/download/v${FZF_VERSION}/fzf-${FZF_VERSION}-linux_amd64.tar.gz" '
-            "| tar -xz -C ~/.local/bin fzf && "
-            "chmod +x ~/.local/bin/fzf"
-        )
-        ok = system_manager.run_interactive_command(script, "Installing fzf...")
-        if not ok:
-            console.print("[yellow]⚠ fzf install failed — skipping[/yellow]")
-        return True  # non-fatal
+        except (OSError, KeyError, tarfile.TarError) as e:
+            console.print(f"[yellow]⚠ {names} install failed — skipping ({e})[/yellow]")
+            return False
+
+    @traced(category="package")
+    def _install_antidote(
+        self, system_manager: SystemManager, source: Optional[Path] = None
+    ) -> bool:
+        from installer.bundle import clone_from_bundle
 
-    def _install_antidote(self, system_manager: SystemManager) -> bool:
         self._phase_header("antidote (zsh plugin manager)")
         antidote_dir = Path.home() / ".antidote"
         if antidote_dir.exists():
             console.print("[green]✓ antidote already installed[/green]")
             return True
         ok = system_manager.run_interactive_command(
-            "git clone --depth=1 https://github.com/getantidote/antidote.git ~/.antidote",
+            (
+                clone_from_bundle(source, "~/.antidote", ANTIDOTE_REPO)
+                if source
+                else f"git clone --depth=1 {ANTIDOTE_REPO} ~/.antidote"
+            ),
             "Installing antidote...",
         )
         if not ok:
@@ -241,19 +795,26 @@ class UbuntuPackageManager(PackageManager):
             )
         return ok  # fatal: plugins won't work without it
 
-    def _install_mise(self, system_manager: SystemManager) -> bool:
+    @traced(category="package")
+    def _install_mise(
+        self, system_manager: SystemManager, installer: Optional[Path] = None
+    ) -> bool:
         self._phase_header("mise (version manager)")
         if system_manager.check_command_exists("mise"):
             console.print("[green]✓ mise already installed[/green]")
             return True
         ok = system_manager.run_interactive_command(
-            "curl https://mise.run | sh", "Installing mise..."
+            _installer_command(installer, MISE_INSTALLER), "Installing mise..."
         )
+        system_manager.invalidate_commands(["mise"])
         if not ok:
             console.print("[yellow]⚠ mise install failed — skipping[/yellow]")
         return True  # non-fatal
 
-    def _install_uv(self, system_manager: SystemManager) -> bool:
+    @traced(category="package")
+    def _install_uv(
+        self, system_manager: SystemManager, installer: Optional[Path] = None
+    ) -> bool:
         self._phase_header("uv (Python package manager)")
         if system_manager.check_command_exists("uv"):
             console.print("[green]✓ uv already installed[/green]")
@@ -263,70 +824,266 @@ class UbuntuPackageManager(PackageManager):
             "if apt-cache show uv >/dev/null 2>&1; then "
             "sudo apt-get install -y uv; "
             "else "
-            "curl -LsSf https://astral.sh/uv/install.sh | sh; "
+            f"{_installer_command(installer, UV_INSTALLER)}; "
             "fi"
         )
         ok = system_manager.run_interactive_command(script, "Installing uv...")
+        system_manager.invalidate_commands(["uv"])
         if not ok:
             console.print("[yellow]⚠ uv install failed — skipping[/yellow]")
         return True  # non-fatal
 
-    def _install_zoxide(self, system_manager: SystemManager) -> bool:
+    @traced(category="package")
+    def _install_zoxide(
+        self, system_manager: SystemManager, installer: Optional[Path] = None
+    ) -> bool:
         self._phase_header("zoxide")
         if system_manager.check_command_exists("zoxide"):
             console.print("[green]✓ zoxide already installed[/green]")
             return True
         ok = system_manager.run_interactive_command(
-            "curl -sSfL https://raw.githubusercontent.com/ajeetdsouza/zoxide/main/install.sh | sh",
-            "Installing zoxide...",
+            _installer_command(installer, ZOXIDE_INSTALLER), "Installing zoxide..."
         )
+        system_manager.invalidate_commands(["zoxide"])
         if not ok:
             console.print("[yellow]⚠ zoxide install failed — skipping[/yellow]")
         return True  # non-fatal
 
-    def _install_git_cliff(self, system_manager: SystemManager) -> bool:
-        self._phase_header("git-cliff (changelog generator)")
-        if system_manager.check_command_exists("git-cliff"):
-            console.print("[green]✓ git-cliff already installed[/green]")
+    # Offline bundles
+
+    @traced(category="package")
+    def _install_from_bundle(
+        self, system_manager: SystemManager, bundle: "Bundle"
+    ) -> bool:
+        """Provision from an extracted offline bundle without touching the network."""
+        success = self._install_bundle_packages(system_manager, bundle)
+        fetched = {
+            artifact.name: bundle.artifacts.get(artifact.name)
+            for artifact in self._missing_releases(system_manager)
+        }
+        if not terminfo_installed(KITTY_TERMINFO_ARTIFACT.name):
+            fetched[KITTY_TERMINFO_ARTIFACT.name] = bundle.artifacts.get(
+                KITTY_TERMINFO_ARTIFACT.name
+            )
+        success &= self._install_downloads(system_manager, fetched)
+        success &= self._install_antidote(system_manager, bundle.repos.get("antidote"))
+        self._install_bundle_plugins(system_manager, bundle)
+        self._install_bundle_binaries(system_manager, bundle)
+        return success
+
+    @traced(category="package")
+    def _install_bundle_packages(
+        self, system_manager: SystemManager, bundle: "Bundle"
+    ) -> bool:
+        """Install the bundled .debs through apt, with the bundle as the only source."""
+        from installer.apt import missing_packages
+
+        self._phase_header("apt packages (from bundle)")
+        missing = missing_packages(bundle.apt_packages, self.dpkg_status)
+        if not missing:
+            console.print("[green]✓ apt packages already installed[/green]")
             return True
-        script = (
-            "GIT_CLIFF_VERSION=$(curl -fsSL https://api.github.com/repos/orhun/git-cliff/releases/latest"
-            " | jq -r '.tag_name' | sed 's/v//') && "
-            'curl -fsSL "https://github.com/orhun/git-cliff/releases/download/v${GIT_CLIFF_VERSION}/'
-            'git-cliff_${GIT_CLIFF_VERSION}_amd64.deb" -o /tmp/git-cliff.deb && '
-            "sudo dpkg -i /tmp/git-cliff.deb && rm /tmp/git-cliff.deb"
-        )
-        ok = system_manager.run_interactive_command(script, "Installing git-cliff...")
-        if not ok:
-            console.print("[yellow]⚠ git-cliff install failed — skipping[/yellow]")
-        return True  # non-fatal
 
-    def _install_kitty_terminfo(self, system_manager: SystemManager) -> bool:
-        self._phase_header("kitty terminfo (SSH from Kitty)")
-        check = system_manager.run_command(
-            "infocmp xterm-kitty >/dev/null 2>&1", "Checking kitty terminfo..."
+        # Separate source list, package lists and caches keep the system's apt
+        # state untouched, so the next online run still refreshes normally
+        source_list = bundle.root / "sources.list"
+        source_list.write_text(bundle.apt_source())
+        lists = bundle.root / "lists"
+        (lists / "partial").mkdir(parents=True, exist_ok=True)
+        options = " ".join(
+            f"-o {option}"
+            for option in (
+                f"Dir::Etc::SourceList={shlex.quote(str(source_list))}",
+                "Dir::Etc::SourceParts=-",
+                f"Dir::State::Lists={shlex.quote(str(lists))}",
+                "Dir::Cache::pkgcache=",
+                "Dir::Cache::srcpkgcache=",
+            )
         )
-        if check:
-            console.print("[green]✓ kitty terminfo already installed[/green]")
-            return True
         ok = system_manager.run_interactive_command(
-            "curl -fsSL https://raw.githubusercontent.com/kovidgoyal/kitty/master/terminfo/x/xterm-kitty"
-            " | tic -x -",
-            "Installing kitty terminfo...",
+            f"sudo apt-get update -qq {options} && "
+            f"sudo apt-get install -y {options} {' '.join(missing)}",
+            f"Installing {len(missing)} apt packages from the bundle...",
+        )
+        system_manager.invalidate_commands()
+        return ok
+
+    @traced(category="package")
+    def _install_bundle_plugins(
+        self, system_manager: SystemManager, bundle: "Bundle"
+    ) -> bool:
+        """Pre-populate antidote's plugin clones so the first zsh start is offline."""
+        from installer.bundle import antidote_dirname, clone_from_bundle
+
+        home = antidote_home()
+        commands = [
+            clone_from_bundle(
+                source,
+                shlex.quote(str(home / antidote_dirname(repo))),
+                f"https://github.com/{repo}",
+            )
+            for repo, source in bundle.plugins.items()
+            if not (home / antidote_dirname(repo)).exists()
+        ]
+        if not commands:
+            return True
+        self._phase_header("zsh plugins (from bundle)")
+        ok = system_manager.run_command(
+            f"mkdir -p {shlex.quote(str(home))} && " + " && ".join(commands),
+            f"Installing {len(commands)} zsh plugins...",
         )
         if not ok:
             console.print(
-                "[yellow]⚠ kitty terminfo install failed — "
-                "use 'kitten ssh' from your Kitty client as fallback[/yellow]"
+                "[yellow]⚠ zsh plugin install failed — antidote will clone them "
+                "on first start[/yellow]"
             )
         return True  # non-fatal
 
+    @traced(category="package")
+    def _install_bundle_binaries(
+        self, system_manager: SystemManager, bundle: "Bundle"
+    ) -> bool:
+        """mise, uv and zoxide from their bundled release binaries."""
+        self._phase_header("mise, uv, zoxide (from bundle)")
+        for artifact, members in OFFLINE_BINARIES:
+            missing = [
+                name
+                for name in members
+                if not system_manager.check_command_exists(name)
+            ]
+            source = bundle.artifacts.get(artifact.name)
+            if not missing:
+                console.print(
+                    f"[green]✓ {', '.join(members)} already installed[/green]"
+                )
+            elif source:
+                self._install_binary(source, members)
+                system_manager.invalidate_commands(list(members))
+            else:
+                console.print(
+                    f"[yellow]⚠ {artifact.name} not in the bundle — skipping[/yellow]"
+                )
+        return True  # non-fatal
+
+    def create_bundle(
+        self, system_manager: SystemManager, dotfiles_dir: Path, output: Path
+    ) -> bool:
+        """Download everything an offline Ubuntu install needs into one archive.
+
+        Runs on a networked Ubuntu host. The third-party apt repositories are
+        registered here too, so their packages resolve along with the rest.
+        """
+        from installer.bundle import (
+            DEBS_DIR,
+            GIT_DIR,
+            OH_MY_ZSH_REPO,
+            RELEASES_DIR,
+            plugin_repos,
+            write_bundle,
+        )
+        from installer.downloads import DownloadStage
+        from installer.tools_lock import load_lock, pin
+
+        lock = load_lock(self.tools_lock) if self.tools_lock else {}
+        artifacts = pin(LOCKED_ARTIFACTS, lock) + [KITTY_TERMINFO_ARTIFACT]
+        keys = [repository.key for repository in APT_REPOSITORIES if repository.key]
+        if not system_manager.check_command_exists("apt-ftparchive"):
+            console.print(
+                "[red]✗ apt-ftparchive not found "
+                "(sudo apt-get install apt-utils)[/red]"
+            )
+            return False
 
-def create_package_manager(os_type: OSType, dotfiles_dir: Path) -> PackageManager:
+        with tempfile.TemporaryDirectory(prefix="dotfiles-bundle-") as directory:
+            root = Path(directory)
+            debs = root / DEBS_DIR
+            debs.mkdir()
+            with DownloadStage(self.downloader) as downloads:
+                downloads.start(keys + artifacts)
+                registered, ok = self._add_repositories(
+                    system_manager, downloads, APT_REPOSITORIES
+                )
+                # Optional repositories that failed are left out of the bundle
+                packages = APT_PACKAGES + [
+                    repository.package for repository in registered
+                ]
+                ok = ok and system_manager.run_interactive_command(
+                    "sudo apt-get update -qq", "Updating apt..."
+                )
+                # The full dependency closure, so the bundle also provisions
+                # minimal images; virtual packages (<name>) are filtered out
+                ok = ok and system_manager.run_command(
+                    "apt-get download -qq $(apt-cache depends --recurse "
+                    "--no-recommends --no-suggests --no-conflicts --no-breaks "
+                    "--no-replaces --no-enhances "
+                    f"{' '.join(packages)} | grep '^[a-z0-9]' | sort -u) && "
+                    "apt-ftparchive packages . > Packages",
+                    f"Downloading {len(packages)} apt packages and dependencies...",
+                    cwd=debs,
+                )
+                fetched = {
+                    artifact.name: downloads.result(artifact.name)
+                    for artifact in artifacts
+                }
+            if not ok:
+                console.print("[red]✗ Could not download the apt packages[/red]")
+                return False
+            failed = [name for name, path in fetched.items() if path is None]
+            if failed:
+                console.print(f"[red]✗ Could not download {', '.join(failed)}[/red]")
+                return False
+
+            bundled: Dict[str, Path] = {}
+            for name, path in fetched.items():
+                target = root / RELEASES_DIR / name / path.name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, target)
+                bundled[name] = target
+
+            git = root / GIT_DIR
+            repos = {"antidote": git / "antidote", "ohmyzsh": git / "ohmyzsh"}
+            plugins = {
+                repo: git / "plugins" / repo
+                for repo in plugin_repos(dotfiles_dir / "zsh" / ".zsh_plugins")
+            }
+            clones = [
+                (ANTIDOTE_REPO, repos["antidote"]),
+                (OH_MY_ZSH_REPO, repos["ohmyzsh"]),
+            ] + [
+                (f"https://github.com/{repo}.git", path)
+                for repo, path in plugins.items()
+            ]
+            if not system_manager.run_command(
+                " && ".join(
+                    f"git clone --quiet --depth=1 {url} {shlex.quote(str(path))}"
+                    for url, path in clones
+                ),
+                f"Cloning antidote, Oh My Zsh and {len(plugins)} zsh plugins...",
+            ):
+                console.print("[red]✗ Could not clone the git repositories[/red]")
+                return False
+
+            write_bundle(root, output, packages, bundled, repos, plugins)
+        console.print(f"[green]✓ Wrote {output}[/green]")
+        return True
+
+
+def create_package_manager(
+    os_type: OSType,
+    dotfiles_dir: Path,
+    cache_dir: Optional[Path] = None,
+    bundle: Optional["Bundle"] = None,
+) -> PackageManager:
     """Factory function to create the appropriate package manager."""
+    if bundle and os_type != OSType.UBUNTU:
+        raise ValueError("Offline bundles are only supported on Ubuntu")
     if os_type == OSType.MACOS:
         return MacOSPackageManager(dotfiles_dir)
     elif os_type == OSType.UBUNTU:
-        return UbuntuPackageManager()
+        from installer.tools_lock import LOCK_FILE
+
+        return UbuntuPackageManager(
+            cache_dir=cache_dir, tools_lock=dotfiles_dir / LOCK_FILE, bundle=bundle
+        )
     else:
         raise ValueError(f"Unsupported OS type: {os_type}")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import os
+import shlex
+import subprocess
+import time
+from typing import Callable, List
+
+from installer.interfaces import SystemManager
+from installer.tracing import tracer
+
+Condition = Callable[[], bool]
+
+# First poll interval; it doubles up to the maximum while waiting
+POLL_INTERVAL = 0.02
+MAX_POLL_INTERVAL = 0.25
+
+
+def wait_for(
+    condition: Condition,
+    timeout: float,
+    description: str = "",
+    interval: float = POLL_INTERVAL,
+) -> bool:
+    """Poll ``condition`` until it holds or ``timeout`` seconds pass.
+
+    Returns as soon as the condition is true, so callers only pay the worst
+    case when something is actually wrong. Returns whether it held.
+    """
+    deadline = time.monotonic() + timeout
+    with tracer.span(f"wait_for {description}".strip(), "wait") as span:
+        while True:
+            if condition():
+                span["held"] = True
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                span["held"] = False
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+
+def process_running(system_manager: SystemManager, name: str) -> Condition:
+    """A process whose name matches the regex ``name`` is running."""
+    command = f"pgrep -x {shlex.quote(name)}"
+    return lambda: system_manager.capture_command(command) is not None
+
+
+def process_stopped(system_manager: SystemManager, name: str) -> Condition:
+    running = process_running(system_manager, name)
+    return lambda: not running()
+
+
+def pids_gone(pids: List[int]) -> Condition:
+    """None of these processes exist any more."""
+
+    def gone() -> bool:
+        for pid in pids:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                continue
+            except PermissionError:
+                pass
+            return False
+        return True
+
+    return gone
+
+
+def exited(proc: "subprocess.Popen[bytes]") -> Condition:
+    """The child process has exited, whatever its status."""
+    return lambda: proc.poll() is not None
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from installer.console import console
+from installer.enums import StepResource
+from installer.tracing import tracer
+
+# Held by anything that reads from the terminal (Confirm.ask, sudo prompts in
+# interactive commands) so concurrent steps never interleave their prompts.
+prompt_lock = threading.RLock()
+
+DEFAULT_RESOURCE_LIMITS: Dict[StepResource, int] = {
+    StepResource.NETWORK: 2,
+    StepResource.CPU: os.cpu_count() or 4,
+    StepResource.PROMPT: 1,
+}
+
+
+@dataclass
+class Step:
+    """A unit of install work. ``run`` returns (success_count, total_steps)."""
+
+    name: str
+    description: str
+    run: Callable[[], Tuple[int, int]]
+    depends_on: Tuple[str, ...] = ()
+    resource: StepResource = StepResource.CPU
+    # Files and literal values whose hash decides whether the step must rerun
+    inputs: Tuple[Union[Path, str], ...] = ()
+    # Commands the step is expected to leave on $PATH
+    commands: Tuple[str, ...] = ()
+    # Checks outputs that are neither links nor commands (e.g. app settings)
+    probe: Optional[Callable[[], bool]] = None
+
+
+class StepScheduler:
+    """Runs install steps as a dependency graph on a bounded worker pool."""
+
+    def __init__(
+        self,
+        steps: List[Step],
+        max_workers: int = 4,
+        resource_limits: Optional[Dict[StepResource, int]] = None,
+    ):
+        self.steps = {step.name: step for step in steps}
+        self.max_workers = max(1, max_workers)
+        self.resource_limits = dict(DEFAULT_RESOURCE_LIMITS)
+        if resource_limits:
+            self.resource_limits.update(resource_limits)
+        for resource, limit in self.resource_limits.items():
+            self.resource_limits[resource] = max(1, limit)
+        self._check_acyclic()
+        # Steps the last run skipped, mapped to the dependency that failed
+        self.skipped: Dict[str, str] = {}
+
+    def _dependencies(self, step: Step) -> List[str]:
+        """Dependencies of a step that are part of this run (skipped steps are ignored)."""
+        return [dep for dep in step.depends_on if dep in self.steps]
+
+    def _check_acyclic(self) -> None:
+        visiting: Set[str] = set()
+        visited: Set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at step '{name}'")
+            visiting.add(name)
+            for dep in self._dependencies(self.steps[name]):
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def select(self, only: Iterable[str]) -> None:
+        """Restrict the run to the named steps plus their transitive dependencies."""
+        selected: Set[str] = set()
+        stack = list(only)
+        while stack:
+            name = stack.pop()
+            if name in selected:
+                continue
+            if name not in self.steps:
+                raise KeyError(name)
+            selected.add(name)
+            stack.extend(self._dependencies(self.steps[name]))
+        self.steps = {
+            name: step for name, step in self.steps.items() if name in selected
+        }
+
+    def discard(self, names: Iterable[str]) -> None:
+        """Drop steps from the run; their dependents treat them as satisfied."""
+        for name in names:
+            self.steps.pop(name, None)
+
+    @staticmethod
+    def _run_step(step: Step, flow: Optional[int]) -> Tuple[int, int]:
+        with tracer.span(
+            f"step:{step.name}", "step", flow=flow, resource=str(step.resource)
+        ) as span:
+            success, total = step.run()
+            span.update(success=success, total=total)
+            return success, total
+
+    def _skip_blocked(
+        self,
+        pending: Dict[str, Step],
+        failed: Set[str],
+        results: Dict[str, Tuple[int, int]],
+    ) -> None:
+        """Skip pending steps that depend, directly or not, on a failed step."""
+        blocked = True
+        while blocked:
+            blocked = False
+            for name, step in list(pending.items()):
+                failed_deps = [dep for dep in self._dependencies(step) if dep in failed]
+                if not failed_deps:
+                    continue
+                del pending[name]
+                failed.add(name)
+                self.skipped[name] = failed_deps[0]
+                results[name] = (0, 1)
+                console.print(
+                    f"[yellow]⚠ Skipping '{name}': "
+                    f"'{failed_deps[0]}' did not succeed[/yellow]"
+                )
+                blocked = True
+
+    def run(self) -> Dict[str, Tuple[int, int]]:
+        """Run all steps, respecting dependencies and per-resource limits.
+
+        A step only unblocks its dependents when it fully succeeds; otherwise
+        they are skipped (see ``skipped``) and count as failed.
+        """
+        pending = dict(self.steps)
+        done: Set[str] = set()
+        failed: Set[str] = set()
+        running: Dict[Future, Step] = {}
+        in_use = {resource: 0 for resource in StepResource}
+        results: Dict[str, Tuple[int, int]] = {}
+        self.skipped = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="dotfiles-step"
+        ) as pool:
+            while pending or running:
+                self._skip_blocked(pending, failed, results)
+                for name, step in list(pending.items()):
+                    if len(running) >= self.max_workers:
+                        break
+                    if any(dep not in done for dep in self._dependencies(step)):
+                        continue
+                    if in_use[step.resource] >= self.resource_limits[step.resource]:
+                        continue
+                    del pending[name]
+                    in_use[step.resource] += 1
+                    flow = tracer.flow_start()
+                    running[pool.submit(self._run_step, step, flow)] = step
+
+                if not running:
+                    continue  # Everything left was just skipped
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    in_use[step.resource] -= 1
+                    try:
+                        results[step.name] = future.result()
+                    except Exception as e:
+                        console.print(f"[red]✗ Step '{step.name}' failed: {e}[/red]")
+                        results[step.name] = (0, 1)
+                    success, total = results[step.name]
+                    if success == total:
+                        done.add(step.name)
+                    else:
+                        failed.add(step.name)
+
+        return {name: results[name] for name in self.steps}
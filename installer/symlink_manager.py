@@ -1,39 +1,244 @@
 #!/usr/bin/env python3
 
-import shutil
+import os
+import platform
+import stat
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-from rich.console import Console
 from rich.prompt import Confirm
 
-from installer.interfaces import SymlinkManager
-
-console = Console()
+from installer.console import console
+from installer.desired_state import (
+    LinkChange,
+    build_desired_state,
+    diff_link,
+    diff_links,
+)
+from installer.enums import ConflictPolicy, LinkAction, OSType
+from installer.interfaces import SymlinkManager, SystemManager
+from installer.link_journal import (
+    JournalEntry,
+    LinkJournal,
+    replace_with_symlink,
+)
+from installer.scheduler import prompt_lock
+from installer.tracing import traced
+
+# Per-thread sink for links created by the current install step (see record_links)
+_recorder = threading.local()
+
+
+@contextmanager
+def record_links() -> Iterator[Dict[Path, Path]]:
+    """Collect every symlink created on this thread as {target: source}."""
+    links: Dict[Path, Path] = {}
+    previous = getattr(_recorder, "links", None)
+    _recorder.links = links
+    try:
+        yield links
+    finally:
+        _recorder.links = previous
+
+
+def _record(target: Path, source: Path) -> None:
+    links = getattr(_recorder, "links", None)
+    if links is not None:
+        links[target] = source
+
+
+def _os_type() -> OSType:
+    """OS family used to pick platform-specific links."""
+    return OSType.MACOS if platform.system() == "Darwin" else OSType.UBUNTU
 
 
 class ConcreteSymlinkManager(SymlinkManager):
     """Concrete implementation of SymlinkManager for creating and managing symbolic links."""
 
-    def create_symlink(self, source: Path, target: Path, description: str = "") -> bool:
-        """Create a symbolic link with user confirmation if target exists."""
-        if target.exists() or target.is_symlink():
-            if not Confirm.ask(
-                f"[yellow]{target} already exists. Replace it?[/yellow]", default=True
-            ):
-                console.print(f"[yellow]Skipping {description}[/yellow]")
+    def __init__(
+        self,
+        system_manager: Optional[SystemManager] = None,
+        journal: Optional[LinkJournal] = None,
+    ):
+        self.system_manager = system_manager
+        self.journal = journal or LinkJournal.begin()
+        self._plan: Optional[Dict[str, List[LinkChange]]] = None
+        # Up-front decisions per conflicting target, and the policy for any
+        # conflict that appears mid-install. None prompts for each conflict.
+        self._resolutions: Dict[Path, ConflictPolicy] = {}
+        self.conflict_policy: Optional[ConflictPolicy] = None
+        # Targets an installer run by this install wrote (e.g. Oh My Zsh's
+        # ~/.zshrc); they are always replaced, whatever the policy
+        self.generated: Set[Path] = set()
+        # Parent directories known to exist, so each is created at most once
+        self._parents: Set[Path] = set()
+        self._parents_lock = threading.Lock()
+
+    def begin_journal(self) -> LinkJournal:
+        """Record the following link changes as a new run."""
+        self.journal = LinkJournal.begin()
+        return self.journal
+
+    def set_plan(
+        self,
+        changes: List[LinkChange],
+        resolutions: Optional[Dict[Path, ConflictPolicy]] = None,
+        conflict_policy: Optional[ConflictPolicy] = None,
+    ) -> None:
+        """Apply this precomputed changeset instead of re-diffing each component.
+
+        Conflicts are settled by ``resolutions`` (per target), then by
+        ``conflict_policy``; with neither, the user is asked.
+        """
+        self._plan = {}
+        for change in changes:
+            self._plan.setdefault(change.link.component, []).append(change)
+        self._resolutions = dict(resolutions or {})
+        self.conflict_policy = conflict_policy
+
+    def _changes_for(self, component: str, dotfiles_dir: Path) -> List[LinkChange]:
+        if self._plan is not None:
+            return self._plan.get(component, [])
+        links = build_desired_state(dotfiles_dir, _os_type())
+        return diff_links([link for link in links if link.component == component])
+
+    def _ensure_parent(self, target: Path) -> None:
+        parent = target.parent
+        with self._parents_lock:
+            if parent in self._parents:
+                return
+        parent.mkdir(parents=True, exist_ok=True)
+        with self._parents_lock:
+            self._parents.add(parent)
+
+    def _swap(
+        self,
+        source: Path,
+        target: Path,
+        st: Optional[os.stat_result],
+        policy: ConflictPolicy = ConflictPolicy.REPLACE,
+    ) -> None:
+        """Journal, then atomically point ``target`` at ``source``.
+
+        ``st`` is the target's lstat (None if absent). A replaced file or
+        directory is kept in the journal for rollback, or next to the target
+        under the backup policy.
+        """
+        self._ensure_parent(target)
+        if st is None:
+            # symlink() fails rather than replace anything created meanwhile.
+            # Recorded afterwards: an entry for a link that was never made
+            # would have rollback delete whatever is there instead.
+            os.symlink(source, target)
+            self.journal.record(JournalEntry(str(target), str(source)))
+            return
+        if stat.S_ISLNK(st.st_mode):
+            previous = os.readlink(target)
+            self.journal.record(JournalEntry(str(target), str(source), previous))
+            replace_with_symlink(source, target)
+            return
+        backup = (
+            self.journal.sibling_backup_path(target)
+            if policy == ConflictPolicy.BACKUP
+            else self.journal.backup_path(target)
+        )
+        is_dir = stat.S_ISDIR(st.st_mode)
+        # A file's size comes with its lstat; a directory is only walked if
+        # pruning needs it, and visible backups are never counted
+        size = None if is_dir or policy == ConflictPolicy.BACKUP else st.st_size
+        self.journal.record(
+            JournalEntry(str(target), str(source), backup=str(backup), size=size)
+        )
+        self.journal.keep(target, is_dir, backup)
+        replace_with_symlink(source, target)
+
+    def apply_change(self, change: LinkChange) -> bool:
+        """Apply a single planned change."""
+        link = change.link
+        if change.action == LinkAction.SKIP:
+            _record(link.target, link.source)
+            return True
+        if change.action == LinkAction.CREATE:
+            try:
+                self._swap(link.source, link.target, None)
+            except FileExistsError:
+                # Something (e.g. the Oh My Zsh installer) created it since planning
+                return self._apply_appeared(change)
+            except Exception as e:
+                console.print(
+                    f"[red]✗ Failed to create symlink for {link.description}: {e}[/red]"
+                )
                 return False
+            _record(link.target, link.source)
+            console.print(f"[green]✓ Created symlink: {link.description}[/green]")
+            return True
+        return self._resolve(
+            link.source,
+            link.target,
+            link.description,
+            self._resolutions.get(link.target, self.conflict_policy),
+        )
+
+    def _apply_appeared(self, change: LinkChange) -> bool:
+        """Re-diff a target that appeared after planning and settle it by policy."""
+        link = change.link
+        current = diff_link(link)
+        if current.action == LinkAction.SKIP:
+            _record(link.target, link.source)
+            return True
+        policy = (
+            ConflictPolicy.REPLACE
+            if link.target in self.generated
+            else self._resolutions.get(link.target, self.conflict_policy)
+        )
+        return self._resolve(link.source, link.target, link.description, policy)
+
+    def apply_component(self, component: str, dotfiles_dir: Path) -> Tuple[int, int]:
+        """Apply the changeset for one component. Returns (success_count, total_steps)."""
+        changes = self._changes_for(component, dotfiles_dir)
+        success_count = sum(self.apply_change(change) for change in changes)
+        unchanged = sum(change.action == LinkAction.SKIP for change in changes)
+        if unchanged:
+            console.print(f"[green]✓ {unchanged} symlinks already in place[/green]")
+        return success_count, len(changes)
 
-            if target.is_symlink():
-                target.unlink()
-            elif target.is_file():
-                target.unlink()
-            elif target.is_dir():
-                shutil.rmtree(target)
+    def create_symlink(self, source: Path, target: Path, description: str = "") -> bool:
+        """Create a symbolic link, resolving an existing target by the conflict policy."""
+        return self._resolve(source, target, description, self.conflict_policy)
+
+    def _resolve(
+        self,
+        source: Path,
+        target: Path,
+        description: str,
+        policy: Optional[ConflictPolicy],
+    ) -> bool:
+        """Link ``target`` to ``source``; ``policy`` None (or ASK) prompts if it exists."""
+        try:
+            st: Optional[os.stat_result] = os.lstat(target)
+        except FileNotFoundError:
+            st = None
+        except OSError as e:
+            console.print(
+                f"[red]✗ Failed to create symlink for {description}: {e}[/red]"
+            )
+            return False
+        if st is not None and policy in (None, ConflictPolicy.ASK):
+            with prompt_lock:
+                replace = Confirm.ask(
+                    f"[yellow]{target} already exists. Replace it?[/yellow]",
+                    default=True,
+                )
+            policy = ConflictPolicy.REPLACE if replace else ConflictPolicy.SKIP
+        if st is not None and policy == ConflictPolicy.SKIP:
+            console.print(f"[yellow]Skipping {description}: {target} exists[/yellow]")
+            return False
 
         try:
-            target.parent.mkdir(parents=True, exist_ok=True)
-            target.symlink_to(source)
+            self._swap(source, target, st, policy or ConflictPolicy.REPLACE)
+            _record(target, source)
             console.print(f"[green]✓ Created symlink: {description}[/green]")
             return True
         except Exception as e:
@@ -42,8 +247,15 @@ class ConcreteSymlinkManager(SymlinkManager):
             )
             return False
 
-    def setup_shell_config(self, dotfiles_dir: Path) -> Tuple[int, int]:
-        """Set up shell configuration symlinks. Returns (success_count, total_steps)."""
+    @traced(category="setup")
+    def setup_shell_config(
+        self, dotfiles_dir: Path, oh_my_zsh_source: Optional[Path] = None
+    ) -> Tuple[int, int]:
+        """Set up shell configuration symlinks. Returns (success_count, total_steps).
+
+        ``oh_my_zsh_source`` is a local Oh My Zsh checkout (from an offline
+        bundle) to clone instead of running the online installer.
+        """
         console.print("\n[bold cyan]🐚 Setting up shell configuration...[/bold cyan]")
 
         success_count = 0
@@ -51,88 +263,44 @@ class ConcreteSymlinkManager(SymlinkManager):
 
         # Install Oh My Zsh if not present
         oh_my_zsh_dir = Path.home() / ".oh-my-zsh"
+        zshrc = Path.home() / ".zshrc"
         if not oh_my_zsh_dir.exists():
+            had_zshrc = os.path.lexists(zshrc)
             console.print("Installing Oh My Zsh...")
-            # Note: This would need system_manager, but keeping it simple for now
-            import subprocess
+            if oh_my_zsh_source:
+                from installer.bundle import OH_MY_ZSH_REPO, clone_from_bundle
 
-            result = subprocess.run(
-                'sh -c "$(curl -fsSL https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/tools/install.sh)" "" --unattended',
-                shell=True,
-            )
-            if result.returncode == 0:
+                command = clone_from_bundle(
+                    oh_my_zsh_source, "~/.oh-my-zsh", OH_MY_ZSH_REPO
+                )
+            else:
+                command = (
+                    'sh -c "$(curl -fsSL https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/tools/install.sh)"'
+                    ' "" --unattended --keep-zshrc'
+                )
+            if self.system_manager:
+                ok = self.system_manager.run_interactive_command(
+                    command, "Installing Oh My Zsh..."
+                )
+            else:
+                import subprocess
+
+                ok = subprocess.run(command, shell=True).returncode == 0
+            if not had_zshrc and os.path.lexists(zshrc):
+                # The installer's template, replaced by the dotfiles link
+                self.generated.add(zshrc)
+            if ok:
                 success_count += 1
         else:
             console.print("[green]✓ Oh My Zsh already installed[/green]")
             success_count += 1
         total_steps += 1
 
-        # Create shell configuration symlinks
-        shell_configs = [
-            ("zsh/.zshrc", ".zshrc", "Zsh configuration"),
-            ("zsh/.zsh_plugins", ".zsh_plugins", "Zsh plugins"),
-            ("zsh/.p10k.zsh", ".p10k.zsh", "Powerlevel10k theme"),
-            ("zsh/.zlogin", ".zlogin", "Zsh login script"),
-        ]
-
-        for source_path, target_file, description in shell_configs:
-            source = dotfiles_dir / source_path
-            target = Path.home() / target_file
-            if source.exists():
-                if self.create_symlink(source, target, description):
-                    success_count += 1
-            total_steps += 1
-
-        # Custom theme
-        theme_source = dotfiles_dir / "iterm" / "steeef-lambda.zsh-theme"
-        theme_target = (
-            Path.home() / ".oh-my-zsh" / "custom" / "themes" / "steeef-lambda.zsh-theme"
-        )
-        if theme_source.exists():
-            if self.create_symlink(theme_source, theme_target, "Custom Zsh theme"):
-                success_count += 1
-        total_steps += 1
-
-        # Modular zsh configuration
-        zsh_modules_dir = dotfiles_dir / "zsh"
-        if zsh_modules_dir.exists():
-            console.print("Setting up modular Zsh configuration...")
-            zsh_config_dir = Path.home() / ".config" / "zsh"
-            zsh_config_dir.mkdir(parents=True, exist_ok=True)
-
-            module_count = 0
-            for module_file in zsh_modules_dir.glob("*.zsh"):
-                target_module = zsh_config_dir / module_file.name
-                if self.create_symlink(
-                    module_file, target_module, f"Zsh module: {module_file.name}"
-                ):
-                    module_count += 1
-
-            console.print(f"[green]✓ {module_count} Zsh modules configured[/green]")
-
-        # Platform-specific zsh directories
-        import platform as _platform
-
-        _system = _platform.system()
-        if _system == "Darwin":
-            platform_dirs = ["macos"]
-        elif _system == "Linux":
-            platform_dirs = ["linux", "ubuntu"]
-        else:
-            platform_dirs = []
-
-        for platform_dir in platform_dirs:
-            platform_source = dotfiles_dir / "zsh" / platform_dir
-            if platform_source.exists():
-                platform_target = zsh_config_dir / platform_dir
-                self.create_symlink(
-                    platform_source,
-                    platform_target,
-                    f"Zsh platform dir: {platform_dir}",
-                )
-
-        return success_count, total_steps
+        # Dotfiles, custom theme, modular zsh configuration and platform dirs
+        link_success, link_steps = self.apply_component("shell", dotfiles_dir)
+        return success_count + link_success, total_steps + link_steps
 
+    @traced(category="setup")
     def setup_git_config(self, dotfiles_dir: Path) -> bool:
         """Set up git configuration symlinks."""
         console.print("\n[bold cyan]🔧 Setting up Git configuration...[/bold cyan]")
@@ -142,9 +310,8 @@ class ConcreteSymlinkManager(SymlinkManager):
         # an [include] pointing to ~/.config/git/.gitconfig. Never symlinked.
         git_config_dir = Path.home() / ".config" / "git"
         git_config_dir.mkdir(parents=True, exist_ok=True)
-        git_source = dotfiles_dir / "git" / ".gitconfig"
-        git_target = git_config_dir / ".gitconfig"
-        ok = self.create_symlink(git_source, git_target, "Git configuration")
+        success_count, total_steps = self.apply_component("git", dotfiles_dir)
+        ok = success_count == total_steps
 
         # Bootstrap ~/.gitconfig as a plain file if it doesn't already include our config
         global_gitconfig = Path.home() / ".gitconfig"
@@ -163,11 +330,6 @@ class ConcreteSymlinkManager(SymlinkManager):
             global_gitconfig.write_text(include_block)
             console.print("[green]✓ Created ~/.gitconfig with [include][/green]")
 
-        ignore_source = dotfiles_dir / "git" / ".gitignore_global"
-        if ignore_source.exists():
-            ignore_target = Path.home() / ".gitignore_global"
-            self.create_symlink(ignore_source, ignore_target, "Global gitignore")
-
         # Bootstrap ~/.config/git/.gitconfig-local as a plain empty file if absent.
         # This is machine-local (not in the repo). Users configure it themselves.
         gitconfig_local = git_config_dir / ".gitconfig-local"
@@ -181,102 +343,51 @@ class ConcreteSymlinkManager(SymlinkManager):
                 "[green]✓ ~/.config/git/.gitconfig-local already exists[/green]"
             )
 
-        # Symlink context-specific git configs into ~/.config/git/
-        for name in (".gitconfig-personal",):
-            src = dotfiles_dir / "git" / name
-            if src.exists():
-                self.create_symlink(src, git_config_dir / name, f"Git config: {name}")
-
         return ok
 
+    @traced(category="setup")
     def setup_vim_config(self, dotfiles_dir: Path) -> bool:
         """Set up vim configuration symlink."""
         console.print("\n[bold cyan]📝 Setting up Vim configuration...[/bold cyan]")
-        vim_source = dotfiles_dir / "vim" / ".vimrc"
-        if vim_source.exists():
-            vim_target = Path.home() / ".vimrc"
-            return self.create_symlink(vim_source, vim_target, "Vim configuration")
-        return True  # Not an error if vim config doesn't exist
+        success_count, total_steps = self.apply_component("vim", dotfiles_dir)
+        return success_count == total_steps  # Not an error if vim config doesn't exist
 
+    @traced(category="setup")
     def setup_mise_config(self, dotfiles_dir: Path) -> bool:
         """Set up mise global configuration symlink."""
         console.print("\n[bold cyan]🔧 Setting up mise configuration...[/bold cyan]")
-        mise_source = dotfiles_dir / "mise" / "config.toml"
-        if mise_source.exists():
-            mise_target = Path.home() / ".config" / "mise" / "config.toml"
-            return self.create_symlink(mise_source, mise_target, "mise global config")
-        return True
+        success_count, total_steps = self.apply_component("mise", dotfiles_dir)
+        return success_count == total_steps
 
+    @traced(category="setup")
     def setup_direnv_config(self, dotfiles_dir: Path) -> bool:
         """Set up direnv global configuration symlink."""
         console.print("\n[bold cyan]🔧 Setting up direnv configuration...[/bold cyan]")
-        direnv_source = dotfiles_dir / "direnv" / "direnvrc"
-        if direnv_source.exists():
-            direnv_target = Path.home() / ".config" / "direnv" / "direnvrc"
-            return self.create_symlink(
-                direnv_source, direnv_target, "direnv global config"
-            )
-        return True
+        success_count, total_steps = self.apply_component("direnv", dotfiles_dir)
+        return success_count == total_steps
 
+    @traced(category="setup")
     def setup_nvim_config(self, dotfiles_dir: Path) -> bool:
         """Set up Neovim configuration symlink."""
         console.print("\n[bold cyan]📝 Setting up Neovim configuration...[/bold cyan]")
-        nvim_source = dotfiles_dir / "nvim"
-        if nvim_source.exists():
-            nvim_target = Path.home() / ".config" / "nvim"
-            return self.create_symlink(nvim_source, nvim_target, "Neovim configuration")
-        return True  # Not an error if nvim config doesn't exist
+        success_count, total_steps = self.apply_component("nvim", dotfiles_dir)
+        return success_count == total_steps  # Not an error if nvim config doesn't exist
 
+    @traced(category="setup")
     def setup_borders_config(self, dotfiles_dir: Path) -> bool:
         """Set up borders window border configuration symlink."""
         console.print("\n[bold cyan]🔲 Setting up borders configuration...[/bold cyan]")
-        borders_source = dotfiles_dir / "borders" / "bordersrc"
-        if borders_source.exists():
-            borders_target = Path.home() / ".config" / "borders" / "bordersrc"
-            return self.create_symlink(borders_source, borders_target, "borders config")
-        return True
+        success_count, total_steps = self.apply_component("borders", dotfiles_dir)
+        return success_count == total_steps
 
+    @traced(category="setup")
     def setup_kitty_config(self, dotfiles_dir: Path) -> Tuple[int, int]:
         """Set up kitty configuration symlinks. Returns (success_count, total_steps)."""
-        import platform as _platform
-
-        if _platform.system() == "Linux":
+        if _os_type() != OSType.MACOS:
             console.print(
                 "[yellow]⚠ Skipping Kitty config on Linux (server environment)[/yellow]"
             )
             return 0, 0
 
         console.print("\n[bold cyan]🐱 Setting up Kitty terminal...[/bold cyan]")
-
-        success_count = 0
-        total_steps = 0
-
-        # Kitty configuration
-        kitty_source = dotfiles_dir / "kitty" / "kitty.conf"
-        if kitty_source.exists():
-            kitty_target = Path.home() / ".config" / "kitty" / "kitty.conf"
-            if self.create_symlink(kitty_source, kitty_target, "Kitty configuration"):
-                success_count += 1
-            total_steps += 1
-
-        # Kitty customizations directory
-        kitty_custom_source = dotfiles_dir / "kitty" / "kitty-customizations"
-        if kitty_custom_source.exists():
-            kitty_custom_target = (
-                Path.home() / ".config" / "kitty" / "kitty-customizations"
-            )
-            if self.create_symlink(
-                kitty_custom_source, kitty_custom_target, "Kitty customizations"
-            ):
-                success_count += 1
-            total_steps += 1
-
-        # tab_bar.py must be at the kitty config root (not in a subdirectory)
-        tab_bar_source = dotfiles_dir / "kitty" / "kitty-customizations" / "tab_bar.py"
-        if tab_bar_source.exists():
-            tab_bar_target = Path.home() / ".config" / "kitty" / "tab_bar.py"
-            if self.create_symlink(tab_bar_source, tab_bar_target, "Kitty tab bar"):
-                success_count += 1
-            total_steps += 1
-
-        return success_count, total_steps
+        return self.apply_component("kitty", dotfiles_dir)
@@ -2,21 +2,63 @@
 
 import platform
 import subprocess
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
 
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.markup import escape
+from rich.text import Text
 
+from installer.command_index import CommandIndex
+from installer.console import console
 from installer.enums import OSType
 from installer.interfaces import SystemManager
+from installer.scheduler import prompt_lock
+from installer.tracing import tracer
+
+# Bytes of command output kept for failure reports; older output is dropped
+OUTPUT_TAIL_BYTES = 8 * 1024
+# Characters of the latest output line shown next to the spinner
+TAIL_LINE_WIDTH = 60
+
+
+class OutputTail:
+    """Fixed-size ring buffer holding the last lines of a command's output."""
+
+    def __init__(self, max_bytes: int = OUTPUT_TAIL_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.dropped_bytes = 0
+        self._lines: Deque[str] = deque()
+        self._size = 0
+
+    def append(self, line: str) -> None:
+        size = len(line.encode("utf-8", "replace"))
+        if size > self.max_bytes:
+            # Keep only the end of a single oversized line
+            line = line[-self.max_bytes :]
+            self.dropped_bytes += size - len(line.encode("utf-8", "replace"))
+            size = len(line.encode("utf-8", "replace"))
+        self.total_bytes += size
+        self._lines.append(line)
+        self._size += size
+        while self._size > self.max_bytes:
+            dropped = len(self._lines.popleft().encode("utf-8", "replace"))
+            self._size -= dropped
+            self.dropped_bytes += dropped
+
+    def text(self) -> str:
+        return "".join(self._lines)
 
 
 class ConcreteSystemManager(SystemManager):
     """Concrete implementation of SystemManager for system detection and command execution."""
 
     def __init__(self):
-        self.console = Console()
+        self.console = console
+        self._spinner_lock = threading.Lock()
+        self._command_index = CommandIndex()
         try:
             self._os_type = self._detect_os()
         except ValueError:
@@ -58,12 +100,11 @@ class ConcreteSystemManager(SystemManager):
 
     def check_command_exists(self, command: str) -> bool:
         """Check if a command exists in the system."""
-        return (
-            subprocess.run(
-                f"command -v {command}", shell=True, capture_output=True
-            ).returncode
-            == 0
-        )
+        return self._command_index.which(command) is not None
+
+    def invalidate_commands(self, commands: Optional[Iterable[str]] = None) -> None:
+        """Forget cached command lookups after an install (all of them when None)."""
+        self._command_index.invalidate(commands)
 
     def run_command(
         self,
@@ -73,36 +114,130 @@ class ConcreteSystemManager(SystemManager):
         cwd: Optional[Path] = None,
     ) -> bool:
         """Run a shell command with progress indicator."""
+        with tracer.span(
+            "run_command", "subprocess", command=command, interactive=interactive
+        ) as span:
+            ok = self._run_command(command, description, interactive, cwd, span)
+            span["ok"] = ok
+            return ok
+
+    def _run_command(
+        self,
+        command: str,
+        description: str,
+        interactive: bool,
+        cwd: Optional[Path],
+        span: Dict[str, Any],
+    ) -> bool:
         try:
             if interactive:
-                # For interactive commands, don't capture output and show description
-                self.console.print(f"[cyan]{description or command}[/cyan]")
-                result = subprocess.run(command, shell=True, cwd=cwd)
+                # For interactive commands, don't capture output and show description.
+                # Hold the prompt lock so a sudo prompt never races another step's.
+                if command.startswith("sudo "):
+                    # sudo only reads the terminal for the password: ask for it
+                    # up front, then run without blocking other steps' prompts
+                    with prompt_lock:
+                        self.console.print(f"[cyan]{description or command}[/cyan]")
+                        authenticated = subprocess.run("sudo -v", shell=True)
+                    if authenticated.returncode != 0:
+                        self.console.print("[red]✗ sudo authentication failed[/red]")
+                        return False
+                    result = subprocess.run(command, shell=True, cwd=cwd)
+                else:
+                    with prompt_lock:
+                        self.console.print(f"[cyan]{description or command}[/cyan]")
+                        result = subprocess.run(command, shell=True, cwd=cwd)
+                span["exit_code"] = result.returncode
                 return result.returncode == 0
+            elif self._spinner_lock.acquire(blocking=False):
+                # For non-interactive commands, use progress indicator with a live tail
+                # (imported here: status and plan never spawn and skip its import cost)
+                from rich.progress import Progress, SpinnerColumn, TextColumn
+
+                try:
+                    with Progress(
+                        SpinnerColumn(),
+                        TextColumn("[progress.description]{task.description}"),
+                        console=self.console,
+                    ) as progress:
+                        label = description or command
+                        task = progress.add_task(label, total=None)
+
+                        def show_tail(line: str) -> None:
+                            progress.update(
+                                task,
+                                description=f"{label} [dim]{escape(line[:TAIL_LINE_WIDTH])}[/dim]",
+                            )
+
+                        returncode, tail = self._stream(command, cwd, show_tail)
+                        progress.remove_task(task)
+                finally:
+                    self._spinner_lock.release()
             else:
-                # For non-interactive commands, use progress indicator
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=self.console,
-                ) as progress:
-                    task = progress.add_task(description or command, total=None)
-                    result = subprocess.run(
-                        command, shell=True, capture_output=True, text=True, cwd=cwd
-                    )
-                    progress.remove_task(task)
+                # Another step owns the spinner; only one live display may be active
+                if description:
+                    self.console.print(description)
+                returncode, tail = self._stream(command, cwd)
 
-                if result.returncode != 0:
-                    self.console.print(f"[red]Error running: {command}[/red]")
-                    self.console.print(f"[red]{result.stderr}[/red]")
-                    return False
-                return True
+            span.update(exit_code=returncode, output_bytes=tail.total_bytes)
+            if returncode != 0:
+                self.console.print(f"[red]Error running: {escape(command)}[/red]")
+                if tail.dropped_bytes:
+                    self.console.print(
+                        f"[dim]… {tail.dropped_bytes} earlier bytes of output omitted[/dim]"
+                    )
+                self.console.print(Text(tail.text(), style="red"))
+                return False
+            return True
         except Exception as e:
             self.console.print(f"[red]Exception running {command}: {e}[/red]")
             return False
 
+    def _stream(
+        self,
+        command: str,
+        cwd: Optional[Path],
+        on_line: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[int, OutputTail]:
+        """Run a command, streaming merged stdout/stderr into a bounded tail buffer."""
+        tail = OutputTail()
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+        )
+        assert proc.stdout is not None
+        with proc.stdout:
+            for line in proc.stdout:
+                tail.append(line)
+                if on_line and line.strip():
+                    on_line(line.strip())
+        return proc.wait(), tail
+
     def run_interactive_command(
         self, command: str, description: str = "", cwd: Optional[Path] = None
     ) -> bool:
         """Run an interactive command that may require user input."""
         return self.run_command(command, description, interactive=True, cwd=cwd)
+
+    def capture_command(self, command: str) -> Optional[str]:
+        """Run a quiet query command and return its stdout, or None if it failed."""
+        with tracer.span("capture_command", "subprocess", command=command) as span:
+            try:
+                result = subprocess.run(
+                    command,
+                    shell=True,
+                    capture_output=True,
+                    text=True,
+                    stdin=subprocess.DEVNULL,
+                )
+            except OSError:
+                span["ok"] = False
+                return None
+            span.update(exit_code=result.returncode, ok=result.returncode == 0)
+            return result.stdout if result.returncode == 0 else None
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from installer.artifact_cache import file_sha256
+from installer.artifacts import Artifact
+from installer.interfaces import Downloader
+
+LOCK_FILE = "tools.lock"
+LOCK_VERSION = 1
+
+
+@dataclass(frozen=True)
+class LockedTool:
+    """A directly downloaded tool pinned to one release asset."""
+
+    version: str
+    url: str
+    sha256: str
+
+
+def load_lock(path: Path) -> Dict[str, LockedTool]:
+    """Pinned tools by name; empty when the lock file is missing or unreadable."""
+    try:
+        data = json.loads(path.read_text())
+        return {
+            name: LockedTool(**entry) for name, entry in data.get("tools", {}).items()
+        }
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+
+def save_lock(path: Path, tools: Dict[str, LockedTool]) -> None:
+    """Write the lock file atomically, sorted so diffs stay small."""
+    data = {
+        "version": LOCK_VERSION,
+        "tools": {name: asdict(tools[name]) for name in sorted(tools)},
+    }
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp.write_text(json.dumps(data, indent=2) + "\n")
+    os.replace(tmp, path)
+
+
+def pin(artifacts: Iterable[Artifact], lock: Dict[str, LockedTool]) -> List[Artifact]:
+    """Swap each locked artifact for its pinned URL and hash; others are unchanged."""
+    return [
+        (
+            artifact.pinned(lock[artifact.name].url, lock[artifact.name].sha256)
+            if artifact.name in lock
+            else artifact
+        )
+        for artifact in artifacts
+    ]
+
+
+def lock_tool(artifact: Artifact, downloader: Downloader) -> LockedTool:
+    """Pin an artifact to its latest release, downloading it once to hash it."""
+    tag = artifact.latest_tag(downloader)
+    url = artifact.url_for(tag)
+    with tempfile.TemporaryDirectory(prefix="dotfiles-lock-") as directory:
+        path = downloader.fetch(url, Path(directory) / url.rsplit("/", 1)[-1])
+        return LockedTool(tag, url, file_sha256(path))
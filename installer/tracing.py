@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Tracer:
+    """Records install spans as Chrome trace events (viewable in Perfetto)."""
+
+    def __init__(self):
+        self.enabled = False
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._flow_ids = itertools.count(1)
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        """Start recording; spans opened before this are not captured."""
+        with self._lock:
+            self.enabled = True
+            self._events = []
+            self._threads = {}
+            self._origin_ns = time.perf_counter_ns()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self._origin_ns) / 1000
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        event.setdefault("pid", os.getpid())
+        event.setdefault("tid", thread.ident)
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append(event)
+
+    @contextmanager
+    def span(
+        self, name: str, category: str = "install", flow: Optional[int] = None, **args
+    ) -> Iterator[Dict[str, Any]]:
+        """Time a block. Callers may add result fields to the yielded args dict."""
+        if not self.enabled:
+            yield args
+            return
+        start = self._now_us()
+        if flow is not None:
+            self._emit(
+                {
+                    "name": "schedule",
+                    "cat": "flow",
+                    "ph": "f",
+                    "bp": "e",
+                    "id": flow,
+                    "ts": start,
+                }
+            )
+        try:
+            yield args
+        except BaseException as e:
+            args.setdefault("error", repr(e))
+            raise
+        finally:
+            self._emit(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start,
+                    "dur": self._now_us() - start,
+                    "args": args,
+                }
+            )
+
+    def flow_start(self) -> Optional[int]:
+        """Mark a hand-off to another thread; pass the id to that thread's span."""
+        if not self.enabled:
+            return None
+        flow = next(self._flow_ids)
+        self._emit(
+            {
+                "name": "schedule",
+                "cat": "flow",
+                "ph": "s",
+                "id": flow,
+                "ts": self._now_us(),
+            }
+        )
+        return flow
+
+    def write(self, path: Path) -> None:
+        """Write recorded spans in Chrome trace-event JSON format."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in threads.items()
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"traceEvents": metadata + events, "displayTimeUnit": "ms"})
+        )
+
+
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None, category: str = "install") -> Callable[[F], F]:
+    """Decorator recording a span for every call of the wrapped function."""
+
+    def decorate(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
@@ -0,0 +1,49 @@
+#!/usr/bin/env bash
+# Build dist/dot.pyz: a single-file zipapp of the installer with its pinned
+# dependencies (from uv.lock) vendored in, runnable as `python3 dot.pyz install`
+# with no uv, venv or dependency resolution on the target machine.
+
+set -euo pipefail
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+DOTFILES_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+OUTPUT="${1:-$DOTFILES_DIR/dist/dot.pyz}"
+PYTHON="${PYTHON:-python3}"
+
+if ! command -v uv &> /dev/null; then
+    echo -e "${RED}❌ uv not found. It is needed to export the pinned dependencies from uv.lock${NC}"
+    exit 1
+fi
+
+BUILD_DIR="$(mktemp -d)"
+trap 'rm -rf "$BUILD_DIR"' EXIT
+
+echo -e "${BLUE}📌 Exporting pinned runtime dependencies from uv.lock...${NC}"
+uv export --project "$DOTFILES_DIR" --frozen --no-dev --no-emit-project \
+    --format requirements-txt --output-file "$BUILD_DIR/requirements.txt" > /dev/null
+
+echo -e "${BLUE}📦 Vendoring dependencies (hash-checked, wheels only)...${NC}"
+"$PYTHON" -m pip install --quiet --disable-pip-version-check --no-compile \
+    --no-deps --only-binary=:all: --require-hashes \
+    --target "$BUILD_DIR/app" -r "$BUILD_DIR/requirements.txt"
+rm -rf "$BUILD_DIR"/app/*.dist-info "$BUILD_DIR/app/bin"
+
+echo -e "${BLUE}🐍 Adding installer package...${NC}"
+mkdir -p "$BUILD_DIR/app/installer"
+cp "$DOTFILES_DIR"/installer/*.py "$BUILD_DIR/app/installer/"
+
+# Precompiled bytecode saves compiling every module on each cold start. Hash-based
+# pycs stay valid inside the zip; other Python versions fall back to the sources.
+"$PYTHON" -m compileall -q -b --invalidation-mode unchecked-hash "$BUILD_DIR/app"
+
+mkdir -p "$(dirname "$OUTPUT")"
+"$PYTHON" -m zipapp "$BUILD_DIR/app" --main "installer.main:app" \
+    --python "/usr/bin/env python3" --compress --output "$OUTPUT"
+
+echo -e "${GREEN}✅ Built $OUTPUT ($(du -h "$OUTPUT" | cut -f1))${NC}"
+echo "   Run: python3 $OUTPUT install"
@@ -0,0 +1,69 @@
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set
+
+import pytest
+
+from installer.enums import OSType
+from installer.interfaces import SystemManager
+
+
+class ScriptedSystemManager(SystemManager):
+    """Records commands instead of running them; ``fails`` decides which fail."""
+
+    def __init__(
+        self,
+        os_type: OSType = OSType.UBUNTU,
+        installed: Iterable[str] = (),
+        fails: Callable[[str], bool] = lambda command: False,
+    ):
+        self.os_type = os_type
+        self.installed: Set[str] = set(installed)
+        self.fails = fails
+        self.commands: List[str] = []
+        self.captures: List[str] = []
+
+    def get_os_type(self) -> OSType:
+        return self.os_type
+
+    def is_supported(self) -> bool:
+        return True
+
+    def check_command_exists(self, command: str) -> bool:
+        return command in self.installed
+
+    def invalidate_commands(self, commands: Optional[Iterable[str]] = None) -> None:
+        pass
+
+    def run_command(
+        self,
+        command: str,
+        description: str = "",
+        interactive: bool = False,
+        cwd: Optional[Path] = None,
+    ) -> bool:
+        self.commands.append(command)
+        return not self.fails(command)
+
+    def run_interactive_command(
+        self, command: str, description: str = "", cwd: Optional[Path] = None
+    ) -> bool:
+        return self.run_command(command, description, interactive=True, cwd=cwd)
+
+    def capture_command(self, command: str) -> Optional[str]:
+        self.captures.append(command)
+        return None
+
+
+@pytest.fixture
+def system() -> ScriptedSystemManager:
+    return ScriptedSystemManager()
+
+
+@pytest.fixture
+def home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A temporary $HOME, with installer state kept under it."""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("XDG_STATE_HOME", str(home / ".local" / "state"))
+    return home
@@ -0,0 +1,67 @@
+import os
+import time
+from pathlib import Path
+
+from installer.apt import installed_packages, lists_are_fresh, missing_packages
+
+STATUS = """\
+Package: zsh
+Status: install ok installed
+Architecture: amd64
+Version: 5.9-6
+
+Package: git
+Status: install ok installed
+Description: fast, scalable, distributed revision control system
+ Multi-line descriptions continue with a leading space.
+
+Package: tmux
+Status: deinstall ok config-files
+
+Package: curl
+Status: install ok half-installed
+
+Package: libc6
+Architecture: amd64
+Status: install ok installed
+"""
+
+
+def write_status(tmp_path: Path, text: str = STATUS) -> Path:
+    status = tmp_path / "status"
+    status.write_text(text)
+    return status
+
+
+def test_only_fully_installed_packages_count(tmp_path):
+    assert installed_packages(write_status(tmp_path)) == {"zsh", "git", "libc6"}
+
+
+def test_missing_packages_keeps_order(tmp_path):
+    status = write_status(tmp_path)
+    packages = ["tmux", "zsh", "curl", "ripgrep", "git"]
+    assert missing_packages(packages, status) == ["tmux", "curl", "ripgrep"]
+
+
+def test_architecture_qualifiers_are_ignored(tmp_path):
+    status = write_status(tmp_path)
+    assert missing_packages(["libc6:amd64", "zsh:arm64"], status) == []
+
+
+def test_unreadable_status_means_everything_is_missing(tmp_path):
+    assert missing_packages(["zsh", "git"], tmp_path / "absent") == ["zsh", "git"]
+
+
+def test_lists_freshness(tmp_path):
+    lists = tmp_path / "lists"
+    assert not lists_are_fresh(60, lists)
+    lists.mkdir()
+    (lists / "partial").mkdir()
+    (lists / "lock").touch()
+    assert not lists_are_fresh(60, lists)  # Only the lock and partial dir
+    index = lists / "archive.ubuntu.com_ubuntu_dists_noble_InRelease"
+    index.touch()
+    assert lists_are_fresh(60, lists)
+    stale = time.time() - 120
+    os.utime(index, (stale, stale))
+    assert not lists_are_fresh(60, lists)
@@ -0,0 +1,142 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+import installer.apt_mirrors
+from installer.apt_mirrors import (
+    DebUri,
+    parse_print_uris,
+    prefetch_debs,
+    rank_mirrors,
+)
+from installer.interfaces import Downloader
+
+ARCHIVE = "http://archive.ubuntu.com/ubuntu/"
+FAST = "http://fast.example.com/ubuntu/"
+SLOW = "http://slow.example.com/ubuntu/"
+DOWN = "http://down.example.com/ubuntu/"
+
+
+@pytest.mark.parametrize(
+    "output, expected",
+    [
+        (
+            "'http://archive.ubuntu.com/ubuntu/pool/main/j/jq/jq_1.7_amd64.deb' "
+            "jq_1.7_amd64.deb 66542 SHA256:abc123\n",
+            [
+                DebUri(
+                    "http://archive.ubuntu.com/ubuntu/pool/main/j/jq/jq_1.7_amd64.deb",
+                    "jq_1.7_amd64.deb",
+                    66542,
+                    "abc123",
+                )
+            ],
+        ),
+        # Older apt prints MD5Sum; the hash is then unknown
+        (
+            "'http://example.com/a.deb' a.deb 10 MD5Sum:0cc175b9\n",
+            [DebUri("http://example.com/a.deb", "a.deb", 10)],
+        ),
+        # Percent-encoded URIs stay as apt printed them
+        (
+            "'http://example.com/pool/libc%2b%2b_1_amd64.deb' libc++_1_amd64.deb 5 "
+            "SHA256:ff\n",
+            [
+                DebUri(
+                    "http://example.com/pool/libc%2b%2b_1_amd64.deb",
+                    "libc++_1_amd64.deb",
+                    5,
+                    "ff",
+                )
+            ],
+        ),
+        # Blank lines, progress output and short lines are skipped
+        (
+            "\nReading package lists...\n\n'http://example.com/a.deb' a.deb\n"
+            "'http://example.com/b.deb' b.deb 20 SHA256:bb\n\n",
+            [DebUri("http://example.com/b.deb", "b.deb", 20, "bb")],
+        ),
+        ("", []),
+    ],
+)
+def test_parse_print_uris(output, expected):
+    assert parse_print_uris(output) == expected
+
+
+def test_archive_base():
+    assert DebUri(f"{ARCHIVE}pool/main/j/jq.deb", "jq.deb", 1).archive_base == ARCHIVE
+    assert DebUri("http://example.com/jq.deb", "jq.deb", 1).archive_base is None
+
+
+def test_rank_mirrors_orders_by_latency_and_drops_failures(monkeypatch):
+    latencies = {ARCHIVE: 0.08, FAST: 0.02, SLOW: 0.3, DOWN: None}
+    probed: List[str] = []
+
+    def probe(mirror: str, path: str, timeout: float) -> Optional[float]:
+        probed.append(mirror + path)
+        return latencies[mirror]
+
+    monkeypatch.setattr(installer.apt_mirrors, "probe_latency", probe)
+    ranked = rank_mirrors(list(latencies), "noble")
+    assert ranked == [(FAST, 0.02), (ARCHIVE, 0.08), (SLOW, 0.3)]
+    assert sorted(probed) == sorted(f"{m}dists/noble/InRelease" for m in latencies)
+
+
+class MirrorDownloader(Downloader):
+    """Serves .debs by path from any mirror, except the ones marked as down."""
+
+    def __init__(self, debs: Dict[str, bytes], down: List[str]):
+        self.debs = debs
+        self.down = down
+        self.requests: List[str] = []
+
+    def read(self, url: str) -> bytes:
+        raise NotImplementedError
+
+    def fetch(self, url: str, destination: Path, sha256: Optional[str] = None) -> Path:
+        self.requests.append(url)
+        if any(url.startswith(mirror) for mirror in self.down):
+            raise OSError("connection refused")
+        data = self.debs[url.rsplit("/", 1)[1]]
+        if sha256 and hashlib.sha256(data).hexdigest() != sha256:
+            raise ValueError(f"sha256 mismatch for {url}")
+        destination.write_bytes(data)
+        return destination
+
+
+def test_prefetch_falls_back_across_mirrors_and_leaves_mismatches_to_apt(tmp_path):
+    debs = {"jq.deb": b"jq", "zsh.deb": b"zsh", "bad.deb": b"bad"}
+    uris = [
+        DebUri(
+            f"{ARCHIVE}pool/{name}", name, len(data), hashlib.sha256(data).hexdigest()
+        )
+        for name, data in debs.items()
+    ]
+    # apt expects different content than every mirror serves
+    uris[2] = DebUri(uris[2].url, "bad.deb", 3, hashlib.sha256(b"good").hexdigest())
+    downloader = MirrorDownloader(debs, down=[DOWN])
+    archives = tmp_path / "archives"
+
+    fetched = prefetch_debs(uris, [DOWN, FAST], archives, downloader, jobs=1)
+
+    assert fetched == {"jq.deb": True, "zsh.deb": True, "bad.deb": False}
+    assert (archives / "jq.deb").read_bytes() == b"jq"
+    assert (archives / "partial").is_dir()
+    # The first package starts on the down mirror and moves on
+    assert downloader.requests[:2] == [f"{DOWN}pool/jq.deb", f"{FAST}pool/jq.deb"]
+    # A mismatch is tried on every mirror, then at its own URL
+    assert downloader.requests[-3:] == [
+        f"{DOWN}pool/bad.deb",
+        f"{FAST}pool/bad.deb",
+        f"{ARCHIVE}pool/bad.deb",
+    ]
+
+
+def test_prefetch_uses_the_original_url_outside_the_ubuntu_archive(tmp_path):
+    ppa = "https://ppa.launchpadcontent.net/neovim-ppa/unstable/ubuntu/"
+    uri = DebUri(f"{ppa}pool/nvim.deb", "nvim.deb", 4)
+    downloader = MirrorDownloader({"nvim.deb": b"nvim"}, down=[])
+    assert prefetch_debs([uri], [FAST], tmp_path, downloader) == {"nvim.deb": True}
+    assert downloader.requests == [uri.url]
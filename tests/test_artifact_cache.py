@@ -0,0 +1,95 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from installer.artifact_cache import ArtifactCache, CachingDownloader
+from installer.interfaces import Downloader
+
+RELEASE = "https://example.com/owner/tool/releases/download/v1.0/tool.tar.gz"
+MIRROR = "https://mirror.example.com/tool-v1.0.tar.gz"
+CONTENT = b"tool v1.0 " * 100
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+class FakeDownloader(Downloader):
+    """Serves fixed bodies by URL and records every request."""
+
+    def __init__(self, bodies: Dict[str, bytes]):
+        self.bodies = bodies
+        self.requests: List[str] = []
+
+    def read(self, url: str) -> bytes:
+        self.requests.append(url)
+        return self.bodies[url]
+
+    def fetch(self, url: str, destination: Path, sha256: Optional[str] = None) -> Path:
+        self.requests.append(url)
+        destination.write_bytes(self.bodies[url])
+        return destination
+
+
+@pytest.fixture
+def network() -> FakeDownloader:
+    return FakeDownloader({RELEASE: CONTENT, MIRROR: CONTENT})
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ArtifactCache:
+    return ArtifactCache(tmp_path / "cache")
+
+
+def test_url_hit_skips_the_network(tmp_path, network, cache):
+    downloader = CachingDownloader(network, cache)
+    downloader.fetch(RELEASE, tmp_path / "first")
+    downloader.fetch(RELEASE, tmp_path / "second")
+    assert network.requests == [RELEASE]
+    assert (tmp_path / "second").read_bytes() == CONTENT
+
+
+def test_pinned_hash_hits_across_urls(tmp_path, network, cache):
+    downloader = CachingDownloader(network, cache)
+    downloader.fetch(RELEASE, tmp_path / "first", SHA256)
+    downloader.fetch(MIRROR, tmp_path / "second", SHA256)
+    assert network.requests == [RELEASE]
+    assert (tmp_path / "second").read_bytes() == CONTENT
+
+
+def test_least_recently_used_blobs_are_evicted(tmp_path):
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=250)
+    old = time.time() - 3600
+    first = cache.put_bytes("https://example.com/a", b"a" * 100)
+    second = cache.put_bytes("https://example.com/b", b"b" * 100)
+    os.utime(first, (old, old))
+    os.utime(second, (old - 60, old - 60))
+    # Using the first blob makes the second the least recently used
+    assert cache.get(first.name) == first
+    third = cache.put_bytes("https://example.com/c", b"c" * 100)
+    assert first.exists() and third.exists()
+    assert not second.exists()
+    assert cache.lookup("https://example.com/b") is None
+
+
+def test_corrupted_blob_is_refetched(tmp_path, network, cache):
+    downloader = CachingDownloader(network, cache)
+    downloader.fetch(RELEASE, tmp_path / "first")
+    blob = cache.get(SHA256)
+    assert blob is not None
+    blob.write_bytes(b"truncated")
+    downloader.fetch(RELEASE, tmp_path / "second")
+    assert network.requests == [RELEASE, RELEASE]
+    assert (tmp_path / "second").read_bytes() == CONTENT
+    assert blob.read_bytes() == CONTENT
+
+
+def test_corrupted_response_is_read_again(network, cache):
+    downloader = CachingDownloader(network, cache)
+    assert downloader.read(MIRROR) == CONTENT
+    blob = cache.lookup(MIRROR)
+    assert blob is not None
+    blob.write_bytes(b"{}")
+    assert downloader.read(MIRROR) == CONTENT
+    assert network.requests == [MIRROR, MIRROR]
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from installer.brewfile import BrewEntry, BrewPlan, parse_brew_list, parse_brewfile
+
+
+def brewfile(tmp_path: Path, name: str, text: str) -> Path:
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def test_parse_skips_comments_and_keeps_arguments(tmp_path):
+    path = brewfile(
+        tmp_path,
+        "Brewfile",
+        "# Development\n"
+        'tap "homebrew/bundle"\n'
+        "\n"
+        'brew "git"  # version control\n'
+        'brew "jq", args: ["HEAD"]\n'
+        'cask "font-fira-code#nerd"\n'
+        'mas "Tailscale", id: 1475387142\n'
+        "  # indented comment\n",
+    )
+    assert parse_brewfile(path) == [
+        BrewEntry("tap", "homebrew/bundle"),
+        BrewEntry("brew", "git"),
+        BrewEntry("brew", "jq", ', args: ["HEAD"]'),
+        BrewEntry("cask", "font-fira-code#nerd"),
+        BrewEntry("mas", "Tailscale", ", id: 1475387142"),
+    ]
+
+
+def test_render_round_trips(tmp_path):
+    entry = BrewEntry("mas", "Tailscale", ", id: 1475387142")
+    path = brewfile(tmp_path, "Brewfile", entry.render() + "\n")
+    assert parse_brewfile(path) == [entry]
+
+
+def test_merge_deduplicates_and_orders_by_kind(tmp_path):
+    first = brewfile(
+        tmp_path, "Brewfile.devtools", 'cask "kitty"\nbrew "git"\nbrew "jq"\n'
+    )
+    second = brewfile(
+        tmp_path,
+        "Brewfile.k8s",
+        'mas "Xcode", id: 497799835\nbrew "git", link: false\n'
+        'tap "derailed/k9s"\nbrew "derailed/k9s/k9s"\n',
+    )
+    plan = BrewPlan.from_brewfiles([first, second])
+    assert plan.taps == ["derailed/k9s"]
+    assert plan.formulae == ["git", "jq", "derailed/k9s/k9s"]
+    assert plan.casks == ["kitty"]
+    # The first declaration of git wins, without the second's arguments
+    assert 'brew "git"\n' in plan.render()
+    assert plan.render().splitlines()[-1] == 'mas "Xcode", id: 497799835'
+
+
+def test_installed_name_drops_the_tap():
+    assert BrewEntry("brew", "derailed/k9s/k9s").installed_name == "k9s"
+    assert BrewEntry("cask", "kitty").installed_name == "kitty"
+
+
+def test_missing_checks_listed_kinds_only():
+    plan = BrewPlan(
+        [
+            BrewEntry("tap", "derailed/k9s"),
+            BrewEntry("brew", "derailed/k9s/k9s"),
+            BrewEntry("brew", "git"),
+            BrewEntry("cask", "kitty"),
+            BrewEntry("mas", "Xcode", ", id: 497799835"),
+        ]
+    )
+    installed = parse_brew_list("git 2.45.0\nk9s 0.32.4\n\nkitty 0.35.1\n")
+    assert installed == {"git", "k9s", "kitty"}
+    # Taps and mas apps are not in `brew list`, so they are not checked
+    assert plan.missing(installed).entries == []
+    assert plan.missing({"git", "kitty"}).entries == [
+        BrewEntry("brew", "derailed/k9s/k9s")
+    ]
@@ -0,0 +1,147 @@
+import json
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from installer.bundle import (
+    MANIFEST_FILE,
+    BundleError,
+    antidote_dirname,
+    open_bundle,
+    plugin_repos,
+    write_bundle,
+)
+
+DOTFILES = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def staged(tmp_path: Path) -> Path:
+    """A bundle directory as ``dot bundle`` lays it out before archiving."""
+    root = tmp_path / "staged"
+    (root / "debs").mkdir(parents=True)
+    (root / "debs" / "jq_1.7_amd64.deb").write_bytes(b"!<arch>\n")
+    (root / "releases" / "fzf").mkdir(parents=True)
+    (root / "releases" / "fzf" / "fzf.tar.gz").write_bytes(b"fzf")
+    for checkout in ("antidote", "ohmyzsh", "plugins/zsh-users/zsh-completions"):
+        (root / "git" / checkout).mkdir(parents=True)
+        (root / "git" / checkout / "README.md").write_text(checkout)
+    return root
+
+
+def test_round_trip(tmp_path, staged):
+    output = write_bundle(
+        staged,
+        tmp_path / "out" / "bundle.tar",
+        ["jq", "zsh"],
+        {"fzf": staged / "releases" / "fzf" / "fzf.tar.gz"},
+        {"antidote": staged / "git" / "antidote", "ohmyzsh": staged / "git/ohmyzsh"},
+        {"zsh-users/zsh-completions": staged / "git/plugins/zsh-users/zsh-completions"},
+    )
+    assert output.exists()
+    assert not output.with_name("bundle.tar.part").exists()
+
+    with open_bundle(output) as bundle:
+        root = bundle.root
+        assert bundle.apt_packages == ["jq", "zsh"]
+        assert bundle.artifacts == {"fzf": root / "releases" / "fzf" / "fzf.tar.gz"}
+        assert bundle.artifacts["fzf"].read_bytes() == b"fzf"
+        assert bundle.repos == {
+            "antidote": root / "git" / "antidote",
+            "ohmyzsh": root / "git" / "ohmyzsh",
+        }
+        plugin = bundle.plugins["zsh-users/zsh-completions"]
+        assert (plugin / "README.md").read_text().endswith("zsh-completions")
+        assert (bundle.debs / "jq_1.7_amd64.deb").exists()
+        assert bundle.apt_source() == f"deb [trusted=yes] file:{bundle.debs} ./\n"
+        assert len(bundle.digest) == 64
+    # The extracted copy only lives for the install
+    assert not root.exists()
+
+
+def test_digest_follows_the_contents(tmp_path, staged):
+    digests = []
+    for packages in (["jq"], ["jq"], ["jq", "zsh"]):
+        output = write_bundle(staged, tmp_path / "bundle.tar", packages, {}, {}, {})
+        with open_bundle(output) as bundle:
+            digests.append(bundle.digest)
+    assert digests[0] == digests[1] != digests[2]
+
+
+def test_unsupported_version_is_rejected(tmp_path, staged):
+    output = write_bundle(staged, tmp_path / "bundle.tar", [], {}, {}, {})
+    manifest = json.loads((staged / MANIFEST_FILE).read_text())
+    (staged / MANIFEST_FILE).write_text(json.dumps({**manifest, "version": 99}))
+    with tarfile.open(output, "w") as archive:
+        archive.add(staged / MANIFEST_FILE, arcname=MANIFEST_FILE)
+    with pytest.raises(BundleError, match="version 99"):
+        with open_bundle(output):
+            pass
+
+
+@pytest.mark.parametrize(
+    "contents", [None, b"not a tar archive"], ids=["missing", "corrupt"]
+)
+def test_unreadable_archives_are_rejected(tmp_path, contents):
+    path = tmp_path / "bundle.tar"
+    if contents is not None:
+        path.write_bytes(contents)
+    with pytest.raises(BundleError, match="cannot extract"):
+        with open_bundle(path):
+            pass
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("zsh-users/zsh-completions\n", ["zsh-users/zsh-completions"]),
+        # Comments, commented-out plugins and blank lines
+        (
+            "# OMZ plugins\n# ohmyzsh/ohmyzsh path:plugins/wd\n\n"
+            "mfaerevaag/wd  # jump to directories\n",
+            ["mfaerevaag/wd"],
+        ),
+        # Annotations after the repo name
+        (
+            "romkatv/zsh-defer kind:defer\n"
+            "ohmyzsh/ohmyzsh path:plugins/git kind:fpath\n",
+            ["romkatv/zsh-defer", "ohmyzsh/ohmyzsh"],
+        ),
+        # One clone per repo, in first-seen order
+        (
+            "ohmyzsh/ohmyzsh path:plugins/git\nhlissner/zsh-autopair\n"
+            "ohmyzsh/ohmyzsh path:plugins/bazel\n",
+            ["ohmyzsh/ohmyzsh", "hlissner/zsh-autopair"],
+        ),
+        ("", []),
+    ],
+)
+def test_plugin_repos(tmp_path, text, expected):
+    plugins = tmp_path / ".zsh_plugins"
+    plugins.write_text(text)
+    assert plugin_repos(plugins) == expected
+
+
+def test_plugin_repos_reads_the_shipped_plugins_file():
+    repos = plugin_repos(DOTFILES / "zsh" / ".zsh_plugins")
+    assert "romkatv/powerlevel10k" in repos
+    assert all(repo.count("/") == 1 for repo in repos)
+
+
+@pytest.mark.parametrize(
+    "repo, dirname",
+    # Both as hardcoded in zsh/03_plugins.zsh
+    [
+        (
+            "zsh-users/zsh-completions",
+            "https-COLON--SLASH--SLASH-github.com-SLASH-zsh-users-SLASH-zsh-completions",
+        ),
+        (
+            "mfaerevaag/wd",
+            "https-COLON--SLASH--SLASH-github.com-SLASH-mfaerevaag-SLASH-wd",
+        ),
+    ],
+)
+def test_antidote_dirname(repo, dirname):
+    assert antidote_dirname(repo) == dirname
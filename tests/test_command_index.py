@@ -0,0 +1,88 @@
+import os
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+
+from installer.command_index import CommandIndex
+
+
+def write(path: Path, executable: bool = True) -> Path:
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755 if executable else 0o644)
+    return path
+
+
+@pytest.fixture
+def dirs(tmp_path: Path) -> Tuple[Path, Path]:
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    return first, second
+
+
+@pytest.fixture
+def index(dirs) -> CommandIndex:
+    return CommandIndex(os.pathsep.join(str(d) for d in dirs))
+
+
+def test_earlier_path_entries_win(dirs, index):
+    first, second = dirs
+    write(second / "tool")
+    expected = write(first / "tool")
+    assert index.which("tool") == str(expected)
+
+
+def test_non_executables_and_directories_are_skipped(dirs, index):
+    first, second = dirs
+    write(first / "tool", executable=False)
+    (first / "other").mkdir()
+    expected = write(second / "tool")
+    assert index.which("tool") == str(expected)
+    assert index.which("other") is None
+    assert index.which("missing") is None
+
+
+def test_lookups_are_memoized_until_invalidated(dirs, index):
+    first, _ = dirs
+    assert index.which("tool") is None
+    installed = write(first / "tool")
+    assert index.which("tool") is None
+    index.invalidate(["tool"])
+    assert index.which("tool") == str(installed)
+
+
+def test_invalidating_a_command_probes_only_that_command(dirs, index):
+    first, _ = dirs
+    assert index.which("tool") is None
+    assert index.which("other") is None
+    write(first / "tool")
+    write(first / "other")
+    index.invalidate(["tool"])
+    assert index.which("tool") == str(first / "tool")
+    # Others keep their memoized answer until they are invalidated too
+    assert index.which("other") is None
+
+
+def test_full_invalidation_rescans_path(dirs, index):
+    first, second = dirs
+    write(second / "tool")
+    assert index.which("tool") == str(second / "tool")
+    write(first / "tool")
+    index.invalidate()
+    assert index.which("tool") == str(first / "tool")
+
+
+def test_reads_path_from_the_environment(dirs, monkeypatch):
+    first, _ = dirs
+    write(first / "tool")
+    monkeypatch.setenv("PATH", str(first))
+    assert CommandIndex().which("tool") == str(first / "tool")
+
+
+def test_paths_are_checked_directly(dirs, index):
+    first, _ = dirs
+    tool = write(first / "tool")
+    script = write(first / "script", executable=False)
+    assert index.which(str(tool)) == str(tool)
+    assert index.which(str(script)) is None
@@ -0,0 +1,208 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from installer.desired_state import DesiredLink, LinkChange, diff_link
+from installer.dotfiles_installer import DotfilesInstaller
+from installer.enums import ConflictPolicy, LinkAction
+from installer.symlink_manager import ConcreteSymlinkManager
+
+
+@pytest.fixture
+def dotfiles(tmp_path: Path) -> Path:
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "zsh").mkdir(parents=True)
+    (dotfiles / "zsh" / ".zshrc").write_text("# dotfiles zshrc\n")
+    (dotfiles / "nvim").mkdir()
+    (dotfiles / "nvim" / "init.lua").write_text("-- nvim\n")
+    return dotfiles
+
+
+@pytest.fixture
+def symlinks(home) -> ConcreteSymlinkManager:
+    manager = ConcreteSymlinkManager()
+    manager.begin_journal()
+    return manager
+
+
+@pytest.fixture(autouse=True)
+def no_prompts(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("prompted")
+
+    monkeypatch.setattr("installer.symlink_manager.Confirm.ask", refuse)
+    monkeypatch.setattr("installer.dotfiles_installer.Prompt.ask", refuse)
+    monkeypatch.setattr("installer.dotfiles_installer.Confirm.ask", refuse)
+
+
+def conflicts(dotfiles: Path, home: Path) -> List[LinkChange]:
+    """An existing ~/.zshrc file and ~/.config/nvim directory."""
+    (home / ".zshrc").write_text("# local zshrc\n")
+    (home / ".config" / "nvim").mkdir(parents=True)
+    (home / ".config" / "nvim" / "local.lua").write_text("-- local\n")
+    return [
+        diff_link(
+            DesiredLink("shell", dotfiles / "zsh" / ".zshrc", home / ".zshrc", "zshrc")
+        ),
+        diff_link(
+            DesiredLink("nvim", dotfiles / "nvim", home / ".config" / "nvim", "nvim")
+        ),
+    ]
+
+
+def test_replace_keeps_originals_in_the_journal(symlinks, dotfiles, home):
+    changes = conflicts(dotfiles, home)
+    symlinks.set_plan(changes, conflict_policy=ConflictPolicy.REPLACE)
+    assert all(symlinks.apply_change(change) for change in changes)
+    assert (home / ".zshrc").resolve() == dotfiles / "zsh" / ".zshrc"
+    assert (home / ".config" / "nvim").resolve() == dotfiles / "nvim"
+    kept = symlinks.journal.kept()
+    assert len(kept) == 2
+    # Files keep their lstat size; directories are not walked while swapping
+    sizes = {
+        Path(entry.target).name: entry.size for entry in symlinks.journal.entries()
+    }
+    assert sizes == {".zshrc": len("# local zshrc\n"), "nvim": None}
+    assert symlinks.journal.size() == len("# local zshrc\n") + len("-- local\n")
+    assert all(path.is_relative_to(symlinks.journal.directory) for path in kept)
+    # Nothing visible is left next to the targets
+    assert sorted(path.name for path in home.iterdir()) == [
+        ".config",
+        ".local",
+        ".zshrc",
+    ]
+
+
+def test_backup_leaves_a_visible_copy(symlinks, dotfiles, home):
+    changes = conflicts(dotfiles, home)
+    symlinks.set_plan(changes, conflict_policy=ConflictPolicy.BACKUP)
+    assert all(symlinks.apply_change(change) for change in changes)
+    [zshrc_backup] = home.glob(".zshrc.dotfiles-backup-*")
+    [nvim_backup] = (home / ".config").glob("nvim.dotfiles-backup-*")
+    assert zshrc_backup.read_text() == "# local zshrc\n"
+    assert (nvim_backup / "local.lua").read_text() == "-- local\n"
+    assert [entry.size for entry in symlinks.journal.entries()] == [None, None]
+
+
+def test_skip_leaves_targets_alone(symlinks, dotfiles, home):
+    changes = conflicts(dotfiles, home)
+    symlinks.set_plan(changes, conflict_policy=ConflictPolicy.SKIP)
+    assert not any(symlinks.apply_change(change) for change in changes)
+    assert (home / ".zshrc").read_text() == "# local zshrc\n"
+    assert not (home / ".config" / "nvim").is_symlink()
+    assert symlinks.journal.entries() == []
+
+
+def test_per_target_resolutions_override_the_policy(symlinks, dotfiles, home):
+    zshrc, nvim = conflicts(dotfiles, home)
+    symlinks.set_plan(
+        [zshrc, nvim],
+        resolutions={zshrc.link.target: ConflictPolicy.REPLACE},
+        conflict_policy=ConflictPolicy.SKIP,
+    )
+    assert symlinks.apply_change(zshrc)
+    assert not symlinks.apply_change(nvim)
+    assert (home / ".zshrc").is_symlink()
+    assert not (home / ".config" / "nvim").is_symlink()
+
+
+def test_rollback_restores_replaced_targets(symlinks, dotfiles, home):
+    changes = conflicts(dotfiles, home)
+    symlinks.set_plan(changes, conflict_policy=ConflictPolicy.REPLACE)
+    for change in changes:
+        symlinks.apply_change(change)
+    symlinks.journal.close()
+    restored, skipped = symlinks.journal.rollback()
+    assert (restored, skipped) == (2, [])
+    assert (home / ".zshrc").read_text() == "# local zshrc\n"
+    assert (home / ".config" / "nvim" / "local.lua").exists()
+
+
+@pytest.fixture
+def installer(dotfiles, symlinks) -> DotfilesInstaller:
+    return DotfilesInstaller(dotfiles, symlink_manager=symlinks)
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        (None, ConflictPolicy.BACKUP),
+        (ConflictPolicy.ASK, ConflictPolicy.BACKUP),
+        (ConflictPolicy.SKIP, ConflictPolicy.SKIP),
+        (ConflictPolicy.REPLACE, ConflictPolicy.REPLACE),
+    ],
+)
+def test_non_interactive_policies(installer, dotfiles, home, policy, expected):
+    changes = conflicts(dotfiles, home)
+    resolutions, fallback = installer._resolve_conflicts(changes, policy, False)
+    assert resolutions == {change.link.target: expected for change in changes}
+    assert fallback == expected
+
+
+def test_asking_per_target_never_offers_ask(installer, dotfiles, home, monkeypatch):
+    offered = []
+
+    def ask(prompt, choices, default):
+        offered.append(choices)
+        return "ask" if len(offered) == 1 else "skip"
+
+    monkeypatch.setattr("installer.dotfiles_installer.Prompt.ask", ask)
+    changes = conflicts(dotfiles, home)
+    resolutions, _ = installer._resolve_conflicts(changes, None, True)
+    assert set(resolutions.values()) == {ConflictPolicy.SKIP}
+    assert "ask" in offered[0]
+    assert all("ask" not in choices for choices in offered[1:])
+    assert all(change.action == LinkAction.CONFLICT for change in changes)
+
+
+def zshrc_link(dotfiles: Path, home: Path) -> LinkChange:
+    link = DesiredLink("shell", dotfiles / "zsh" / ".zshrc", home / ".zshrc", "zshrc")
+    return diff_link(link)
+
+
+@pytest.mark.parametrize(
+    "policy, linked",
+    [
+        (ConflictPolicy.SKIP, False),
+        (ConflictPolicy.BACKUP, True),
+        (ConflictPolicy.REPLACE, True),
+    ],
+)
+def test_target_appearing_mid_install_follows_the_policy(
+    symlinks, dotfiles, home, policy, linked
+):
+    change = zshrc_link(dotfiles, home)
+    assert change.action == LinkAction.CREATE
+    symlinks.set_plan([change], conflict_policy=policy)
+    (home / ".zshrc").write_text("# written by something else\n")
+    assert symlinks.apply_change(change) is linked
+    assert (home / ".zshrc").is_symlink() is linked
+
+
+def test_target_linked_mid_install_is_kept(symlinks, dotfiles, home):
+    change = zshrc_link(dotfiles, home)
+    symlinks.set_plan([change], conflict_policy=ConflictPolicy.SKIP)
+    (home / ".zshrc").symlink_to(dotfiles / "zsh" / ".zshrc")
+    assert symlinks.apply_change(change)
+    assert symlinks.journal.entries() == []
+
+
+def test_oh_my_zsh_zshrc_is_replaced_even_when_skipping(
+    system, symlinks, dotfiles, home
+):
+    def oh_my_zsh(command: str) -> bool:
+        if "ohmyzsh" in command:
+            assert "--keep-zshrc" in command
+            (home / ".oh-my-zsh").mkdir()
+            (home / ".zshrc").write_text("# oh-my-zsh template\n")
+        return False
+
+    system.fails = oh_my_zsh
+    symlinks.system_manager = system
+    symlinks.set_plan([zshrc_link(dotfiles, home)], conflict_policy=ConflictPolicy.SKIP)
+    assert symlinks.setup_shell_config(dotfiles) == (2, 2)
+    assert (home / ".zshrc").resolve() == dotfiles / "zsh" / ".zshrc"
+    # The template is kept in the journal, so a rollback brings it back
+    [kept] = symlinks.journal.kept()
+    assert kept.read_text() == "# oh-my-zsh template\n"
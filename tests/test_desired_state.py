@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from installer.desired_state import DesiredLink, diff_link
+from installer.enums import LinkAction
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    source = tmp_path / "dotfiles" / "zsh" / ".zshrc"
+    source.parent.mkdir(parents=True)
+    source.write_text("# zshrc\n")
+    return source
+
+
+def link_to(source: Path, target: Path) -> DesiredLink:
+    return DesiredLink("shell", source, target, "Zsh configuration")
+
+
+def test_missing_target_is_created(source, tmp_path):
+    change = diff_link(link_to(source, tmp_path / ".zshrc"))
+    assert change.action == LinkAction.CREATE
+
+
+def test_matching_link_is_skipped(source, tmp_path):
+    target = tmp_path / ".zshrc"
+    target.symlink_to(source)
+    assert diff_link(link_to(source, target)).action == LinkAction.SKIP
+
+
+def test_relative_link_to_the_source_is_skipped(source, tmp_path):
+    target = tmp_path / ".zshrc"
+    target.symlink_to(os.path.relpath(source, tmp_path))
+    assert diff_link(link_to(source, target)).action == LinkAction.SKIP
+
+
+def test_link_elsewhere_is_replaced(source, tmp_path):
+    target = tmp_path / ".zshrc"
+    target.symlink_to(tmp_path / "old-zshrc")
+    change = diff_link(link_to(source, target))
+    assert change.action == LinkAction.REPLACE
+    assert change.current == str(tmp_path / "old-zshrc")
+
+
+def test_file_and_directory_conflict(source, tmp_path):
+    (tmp_path / ".zshrc").write_text("# local\n")
+    (tmp_path / "nvim").mkdir()
+    file_change = diff_link(link_to(source, tmp_path / ".zshrc"))
+    dir_change = diff_link(link_to(source, tmp_path / "nvim"))
+    assert (file_change.action, file_change.current) == (LinkAction.CONFLICT, "file")
+    assert (dir_change.action, dir_change.current) == (
+        LinkAction.CONFLICT,
+        "directory",
+    )
+
+
+def test_parent_that_is_a_file_conflicts(source, tmp_path):
+    (tmp_path / ".config").write_text("")
+    change = diff_link(link_to(source, tmp_path / ".config" / "zsh"))
+    assert change.action == LinkAction.CONFLICT
+
+
+def test_link_through_a_symlinked_parent_is_skipped(source, tmp_path):
+    # The dotfiles are checked out under ~/dev, itself a link to the real disk
+    dev = tmp_path / "dev"
+    dev.symlink_to(tmp_path)
+    target = tmp_path / ".zshrc"
+    target.symlink_to(dev / "dotfiles" / "zsh" / ".zshrc")
+    assert diff_link(link_to(source, target)).action == LinkAction.SKIP
+    # And the other way round: the installer runs from the linked path
+    linked_source = dev / "dotfiles" / "zsh" / ".zshrc"
+    target.unlink()
+    target.symlink_to(source)
+    assert diff_link(link_to(linked_source, target)).action == LinkAction.SKIP
+
+
+def test_dangling_link_is_replaced(source, tmp_path):
+    target = tmp_path / ".zshrc"
+    target.symlink_to(tmp_path / "gone" / ".zshrc")
+    assert diff_link(link_to(source, target)).action == LinkAction.REPLACE
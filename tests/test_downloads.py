@@ -0,0 +1,161 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional, Set
+
+import pytest
+
+from installer.downloads import DownloadError, HttpDownloader
+
+PAYLOAD = bytes(range(256)) * 1024  # 256 KiB
+PAYLOAD_SHA = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class Server(ThreadingHTTPServer):
+    """Serves PAYLOAD with Range support; can fail or cut off responses."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        # Bytes of body to send before dropping the connection, per request
+        self.drops: List[int] = []
+        # Statuses to answer with before serving the file, per request
+        self.errors: List[int] = []
+        self.ranges: List[Optional[str]] = []
+        self.connections: Set[int] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/tool.tar.gz"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: Server
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.server.connections.add(self.client_address[1])
+        self.server.ranges.append(self.headers.get("Range"))
+        if self.server.errors:
+            self.send_error(self.server.errors.pop(0))
+            return
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            if start >= len(PAYLOAD):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+            )
+        else:
+            self.send_response(200)
+        body = PAYLOAD[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.server.drops:
+            self.wfile.write(body[: self.server.drops.pop(0)])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server() -> Iterator[Server]:
+    server = Server()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def downloader() -> HttpDownloader:
+    return HttpDownloader(timeout=5, retries=3, backoff=0.001)
+
+
+def test_fetch_verifies_hash(server, downloader, tmp_path):
+    destination = downloader.fetch(server.url, tmp_path / "tool.tar.gz", PAYLOAD_SHA)
+    assert destination.read_bytes() == PAYLOAD
+    assert server.ranges == [None]
+
+
+def test_dropped_connection_resumes_with_range(server, downloader, tmp_path):
+    server.drops = [100_000]
+    destination = downloader.fetch(server.url, tmp_path / "tool.tar.gz", PAYLOAD_SHA)
+    assert destination.read_bytes() == PAYLOAD
+    assert server.ranges == [None, "bytes=100000-"]
+    assert not (tmp_path / "tool.tar.gz.part").exists()
+
+
+def test_dropped_connection_is_not_pooled(server, tmp_path):
+    downloader = HttpDownloader(timeout=5, retries=0)
+    server.drops = [100_000]
+    with pytest.raises(DownloadError):
+        downloader.fetch(server.url, tmp_path / "tool.tar.gz")
+    assert not any(downloader._idle.values())
+    # A complete response is pooled and its connection reused
+    downloader.fetch(server.url, tmp_path / "a")
+    downloader.fetch(server.url, tmp_path / "b")
+    assert len(server.connections) == 2
+
+
+def test_sha_mismatch_raises_and_leaves_nothing(server, downloader, tmp_path):
+    server.drops = [100_000]
+    destination = tmp_path / "tool.tar.gz"
+    with pytest.raises(DownloadError, match="sha256 mismatch") as raised:
+        downloader.fetch(server.url, destination, "0" * 64)
+    assert not raised.value.retriable
+    assert not destination.exists()
+    assert not (tmp_path / "tool.tar.gz.part").exists()
+    # Not retried: a second download would not change the hash
+    assert len(server.ranges) == 2
+
+
+def test_already_complete_partial_gets_416(server, downloader, tmp_path):
+    (tmp_path / "tool.tar.gz.part").write_bytes(PAYLOAD)
+    destination = downloader.fetch(server.url, tmp_path / "tool.tar.gz", PAYLOAD_SHA)
+    assert destination.read_bytes() == PAYLOAD
+    assert server.ranges == [f"bytes={len(PAYLOAD)}-"]
+
+
+def test_server_errors_are_retried(server, downloader, tmp_path):
+    server.errors = [503, 502, 429]
+    destination = downloader.fetch(server.url, tmp_path / "tool.tar.gz", PAYLOAD_SHA)
+    assert destination.read_bytes() == PAYLOAD
+    assert len(server.ranges) == 4
+
+
+def test_retries_are_bounded(server, downloader, tmp_path):
+    server.errors = [503] * 10
+    with pytest.raises(DownloadError, match="after 4 attempts"):
+        downloader.fetch(server.url, tmp_path / "tool.tar.gz")
+    assert len(server.ranges) == 4
+
+
+def test_client_errors_are_not_retried(server, downloader, tmp_path):
+    server.errors = [404]
+    with pytest.raises(DownloadError, match="HTTP 404"):
+        downloader.read(server.url)
+    assert len(server.ranges) == 1
+
+
+def test_backoff_doubles(server, tmp_path, monkeypatch):
+    delays: List[float] = []
+    monkeypatch.setattr("installer.downloads.time.sleep", delays.append)
+    monkeypatch.setattr("installer.downloads.random.uniform", lambda a, b: 0.0)
+    server.errors = [503, 503, 503]
+    HttpDownloader(retries=3, backoff=0.5).fetch(server.url, tmp_path / "tool")
+    assert delays == [0.5, 1.0, 2.0]
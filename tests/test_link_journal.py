@@ -0,0 +1,91 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from installer.link_journal import (
+    JOURNAL_FILE,
+    JournalEntry,
+    LinkJournal,
+    prune_journals,
+)
+
+MB = 1024 * 1024
+
+
+def run(root: Path, name: str, kept_bytes: int, age_days: float = 0.0) -> LinkJournal:
+    """A finished run that kept one backup of ``kept_bytes``, recorded in the journal."""
+    journal = LinkJournal(root / name)
+    backup = journal.directory / "replaced" / "home" / ".config" / "nvim"
+    backup.mkdir(parents=True)
+    (backup / "init.lua").write_bytes(b"x" * kept_bytes)
+    journal.record(
+        JournalEntry(
+            "/home/.config/nvim", "/dotfiles/nvim", None, str(backup), kept_bytes
+        )
+    )
+    journal.close()
+    written = time.time() - age_days * 86400
+    os.utime(journal.directory / JOURNAL_FILE, (written, written))
+    return journal
+
+
+@pytest.fixture
+def no_walking(monkeypatch):
+    def walk(path):
+        raise AssertionError(f"walked {path}")
+
+    monkeypatch.setattr("installer.link_journal._tree_size", walk)
+
+
+def test_size_uses_recorded_sizes(tmp_path, no_walking):
+    journal = run(tmp_path, "20260101-000000.000000001", 3 * MB)
+    assert journal.size() == 3 * MB
+
+
+def test_size_measures_entries_without_a_recorded_size(tmp_path):
+    journal = LinkJournal(tmp_path / "20260101-000000.000000001")
+    backup = journal.directory / "replaced" / "home" / ".config" / "nvim"
+    backup.mkdir(parents=True)
+    (backup / "init.lua").write_bytes(b"x" * 100)
+    # Kept directories are only measured when pruning needs their size
+    journal.record(
+        JournalEntry("/home/.config/nvim", "/dotfiles/nvim", None, str(backup))
+    )
+    journal.close()
+    assert journal.size() == 100
+
+
+def test_visible_backups_are_not_counted(tmp_path, no_walking):
+    journal = LinkJournal(tmp_path / "20260101-000000.000000001")
+    journal.record(
+        JournalEntry(
+            "/home/.zshrc", "/dotfiles/zsh/.zshrc", None, "/home/.zshrc.bak", 10
+        )
+    )
+    journal.close()
+    assert journal.kept() == []
+    assert journal.size() == 0
+
+
+def test_prune_by_size_keeps_the_newest(tmp_path, no_walking):
+    oldest = run(tmp_path, "20260101-000000.000000001", 2 * MB)
+    middle = run(tmp_path, "20260102-000000.000000001", 2 * MB)
+    newest = run(tmp_path, "20260103-000000.000000001", 5 * MB)
+    assert prune_journals(tmp_path, max_age_days=30, max_mb=8) == 1
+    assert not oldest.directory.exists()
+    assert middle.directory.exists()
+    # The latest run is kept even over the limit
+    assert prune_journals(tmp_path, max_age_days=30, max_mb=1) == 1
+    assert newest.directory.exists()
+    assert not middle.directory.exists()
+
+
+def test_prune_by_age(tmp_path, no_walking):
+    old = run(tmp_path, "20260101-000000.000000001", 1, age_days=45)
+    recent = run(tmp_path, "20260201-000000.000000001", 1, age_days=1)
+    latest = run(tmp_path, "20260301-000000.000000001", 1, age_days=60)
+    assert prune_journals(tmp_path, max_age_days=30, max_mb=1024) == 1
+    assert not old.directory.exists()
+    assert recent.directory.exists() and latest.directory.exists()
@@ -0,0 +1,118 @@
+import plistlib
+from pathlib import Path
+
+from installer.macos_defaults import (
+    DomainUpdate,
+    changed_keys,
+    defaults_write,
+    desired_defaults,
+    parse_export,
+    plan_updates,
+    preferences_file,
+    restarts_for,
+    saved_preferences_current,
+)
+
+
+def export(values) -> str:
+    return plistlib.dumps(values).decode()
+
+
+def test_parse_export():
+    assert parse_export(export({"autohide": True})) == {"autohide": True}
+    assert parse_export(None) is None
+    assert parse_export("") is None
+    assert parse_export("Domain com.apple.dock does not exist") is None
+    assert parse_export(export(["not", "a", "dict"])) is None
+
+
+def test_changed_keys_compares_plist_types():
+    current = {"autohide": 1, "tilesize": 48, "orientation": "bottom"}
+    desired = {"autohide": True, "tilesize": 48, "orientation": "left", "new": 2}
+    assert changed_keys(current, desired) == {
+        "autohide": True,
+        "orientation": "left",
+        "new": 2,
+    }
+    assert changed_keys({"KeyRepeat": 2}, {"KeyRepeat": 2}) == {}
+
+
+def test_plan_merges_changes_into_the_current_domain():
+    current = {
+        "com.apple.dock": {"autohide": False, "tilesize": 48, "persistent-apps": []},
+        "com.apple.finder": {"ShowPathbar": True},
+    }
+    desired = {
+        "com.apple.dock": {"autohide": True, "tilesize": 48},
+        "com.apple.finder": {"ShowPathbar": True},
+    }
+    [update] = plan_updates(current, desired)
+    assert update.domain == "com.apple.dock"
+    assert update.changes == {"autohide": True}
+    # Keys we do not manage survive the import
+    assert plistlib.loads(update.plist()) == {
+        "autohide": True,
+        "tilesize": 48,
+        "persistent-apps": [],
+    }
+
+
+def test_unreadable_domain_is_written_key_by_key():
+    [update] = plan_updates(
+        {"com.apple.dock": None}, {"com.apple.dock": {"autohide": True}}
+    )
+    assert update.merged is None
+    assert update.write_commands() == [
+        "defaults write com.apple.dock autohide -bool true"
+    ]
+
+
+def test_defaults_write_flags():
+    assert defaults_write("d", "k", False).endswith("-bool false")
+    assert defaults_write("d", "k", 15).endswith("-int 15")
+    assert defaults_write("d", "k", 0.5).endswith("-float 0.5")
+    assert defaults_write("d", "location", "/Users/me/My Shots").endswith(
+        "-string '/Users/me/My Shots'"
+    )
+
+
+def test_restarts_once_per_app():
+    updates = [
+        DomainUpdate("NSGlobalDomain", {"KeyRepeat": 2}),
+        DomainUpdate("com.apple.finder", {"ShowPathbar": True}),
+        DomainUpdate("com.apple.TextEdit", {"RichText": 0}),
+    ]
+    assert restarts_for(updates) == ["Finder"]
+
+
+def test_converged_system_needs_no_updates():
+    desired = desired_defaults(Path("/Users/me"))
+    assert plan_updates(desired, desired) == []
+
+
+def save_preferences(home: Path) -> None:
+    for domain, values in desired_defaults(home).items():
+        path = preferences_file(home, domain)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # cfprefsd saves binary plists, with other keys alongside ours
+        path.write_bytes(
+            plistlib.dumps({**values, "Other": 1}, fmt=plistlib.FMT_BINARY)
+        )
+
+
+def test_saved_preferences_probe(tmp_path):
+    assert not saved_preferences_current(tmp_path)
+    save_preferences(tmp_path)
+    assert saved_preferences_current(tmp_path)
+    assert preferences_file(tmp_path, "NSGlobalDomain").name == (
+        ".GlobalPreferences.plist"
+    )
+
+
+def test_saved_preferences_probe_sees_drift(tmp_path):
+    save_preferences(tmp_path)
+    dock = preferences_file(tmp_path, "com.apple.dock")
+    dock.write_bytes(plistlib.dumps({"autohide": True, "tilesize": 64}))
+    assert not saved_preferences_current(tmp_path)
+    dock.write_text("not a plist")
+    assert not saved_preferences_current(tmp_path)
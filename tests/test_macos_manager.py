@@ -0,0 +1,15 @@
+from installer.macos_manager import ConcreteMacOSManager
+
+
+def test_ubersicht_probe(home, tmp_path):
+    macos = ConcreteMacOSManager(applications_dir=tmp_path / "Applications")
+    widgets = home / "Library" / "Application Support" / "Übersicht" / "widgets"
+    assert not macos.ubersicht_installed()
+    (tmp_path / "Applications" / "Uebersicht.app").mkdir(parents=True)
+    (widgets / "simple-bar").mkdir(parents=True)
+    (widgets / "aerospace-mode.jsx").write_text("// widget\n")
+    assert not macos.ubersicht_installed()  # ~/.simplebarrc is missing
+    (home / ".simplebarrc").write_text("{}\n")
+    assert macos.ubersicht_installed()
+    (widgets / "aerospace-mode.jsx").unlink()
+    assert not macos.ubersicht_installed()
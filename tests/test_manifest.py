@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+
+from installer.manifest import InstallManifest
+
+
+@pytest.fixture
+def manifest(tmp_path: Path) -> InstallManifest:
+    return InstallManifest(tmp_path / "manifest.json")
+
+
+def test_unrecorded_or_changed_inputs_are_stale(manifest, system):
+    assert not manifest.is_current("git", "abc", system)
+    manifest.record("git", "abc", (1, 1), {}, ["git"])
+    system.installed.add("git")
+    assert manifest.is_current("git", "abc", system)
+    assert not manifest.is_current("git", "def", system)
+
+
+def test_links_and_commands_are_checked(manifest, system, tmp_path):
+    source = tmp_path / "vimrc"
+    source.touch()
+    target = tmp_path / ".vimrc"
+    target.symlink_to(source)
+    manifest.record("vim", "abc", (1, 1), {target: source}, ["vim"])
+    assert not manifest.is_current("vim", "abc", system)  # vim is not on $PATH
+    system.installed.add("vim")
+    assert manifest.is_current("vim", "abc", system)
+    target.unlink()
+    assert not manifest.is_current("vim", "abc", system)
+
+
+def test_step_without_outputs_is_never_current(manifest, system):
+    manifest.record("system", "abc", (1, 1), {}, [])
+    assert not manifest.is_current("system", "abc", system)
+
+
+def test_probe_decides_for_steps_without_outputs(manifest, system):
+    manifest.record("system", "abc", (1, 1), {}, [])
+    assert manifest.is_current("system", "abc", system, lambda: True)
+    assert not manifest.is_current("system", "abc", system, lambda: False)
+
+
+def test_save_and_load(manifest, system):
+    manifest.record("git", "abc", (2, 3), {}, ["git"])
+    manifest.save()
+    loaded = InstallManifest.load(manifest.path)
+    assert loaded.result("git") == (2, 3)
+
+
+def test_link_through_a_symlinked_parent_is_current(manifest, system, tmp_path):
+    source = tmp_path / "dotfiles" / "vimrc"
+    source.parent.mkdir()
+    source.touch()
+    (tmp_path / "dev").symlink_to(tmp_path)
+    target = tmp_path / ".vimrc"
+    target.symlink_to(tmp_path / "dev" / "dotfiles" / "vimrc")
+    manifest.record("vim", "abc", (1, 1), {target: source}, [])
+    assert manifest.is_current("vim", "abc", system)
@@ -0,0 +1,130 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from installer.package_managers import (
+    APT_PACKAGES,
+    APT_REPOSITORIES,
+    UbuntuPackageManager,
+)
+
+NEOVIM, EZA, GH = APT_REPOSITORIES
+
+
+@pytest.fixture
+def ubuntu(tmp_path: Path) -> UbuntuPackageManager:
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    (lists / "archive_Packages").touch()
+    return UbuntuPackageManager(
+        dpkg_status=tmp_path / "status", apt_lists=lists, fast_apt=False
+    )
+
+
+def installs(system) -> List[List[str]]:
+    prefix = "sudo apt-get install -y "
+    return [
+        command[len(prefix) :].split()
+        for command in system.commands
+        if command.startswith(prefix)
+    ]
+
+
+def test_one_install_when_it_succeeds(ubuntu, system):
+    assert ubuntu._install_apt_packages(system, [NEOVIM, EZA, GH])
+    assert installs(system) == [APT_PACKAGES + ["neovim", "eza", "gh"]]
+
+
+def test_broken_optional_package_does_not_block_the_rest(ubuntu, system):
+    system.fails = lambda command: "install -y" in command and " eza" in command
+    assert ubuntu._install_apt_packages(system, [NEOVIM, EZA, GH])
+    assert installs(system) == [
+        APT_PACKAGES + ["neovim", "eza", "gh"],
+        APT_PACKAGES,
+        ["neovim"],
+        ["eza"],
+        ["gh"],
+    ]
+
+
+@pytest.mark.parametrize(
+    "broken, ok",
+    [("neovim", False), ("git-lfs", False)],
+)
+def test_required_failures_fail_the_step(ubuntu, system, broken, ok):
+    system.fails = lambda command: "install -y" in command and broken in command
+    assert ubuntu._install_apt_packages(system, [NEOVIM, EZA]) is ok
+    # The optional package is still attempted on its own
+    assert ["eza"] in installs(system)
+
+
+def test_failed_registration_removes_its_source_list(ubuntu, system):
+    system.fails = lambda command: "gierens" in command and "rm -f" not in command
+    stage = _Stage(
+        {
+            "neovim-key": Path("/tmp/neovim.asc"),
+            "eza-key": Path("/tmp/eza.asc"),
+            "gh-key": Path("/tmp/gh.gpg"),
+        }
+    )
+    registered, ok = ubuntu._add_repositories(system, stage, [NEOVIM, EZA, GH])
+    assert ok  # eza is optional
+    assert registered == [NEOVIM, GH]
+    assert "sudo rm -f /etc/apt/sources.list.d/gierens.list" in system.commands
+
+
+def test_failed_required_registration_is_fatal(ubuntu, system):
+    # The signing key could not be downloaded
+    registered, ok = ubuntu._add_repositories(system, _Stage({}), [NEOVIM])
+    assert not ok
+    assert registered == []
+
+
+def test_repositories_register_without_an_index_update(ubuntu, system):
+    """The apt phase's single update is the only one, even on minimal images."""
+    stage = _Stage(
+        {
+            "neovim-key": Path("/tmp/neovim.asc"),
+            "eza-key": Path("/tmp/eza.asc"),
+            "gh-key": Path("/tmp/gh.gpg"),
+        }
+    )
+    registered, ok = ubuntu._add_repositories(system, stage, [NEOVIM, EZA, GH])
+    assert ok and registered == [NEOVIM, EZA, GH]
+    assert not any("apt-get" in command for command in system.commands)
+    assert "/tmp/neovim.asc /etc/apt/keyrings/neovim-ppa.asc" in system.commands[0]
+
+
+class _Stage:
+    """Stands in for a DownloadStage whose downloads already finished."""
+
+    def __init__(self, results):
+        self.results = results
+
+    def result(self, name):
+        return self.results.get(name)
+
+
+@pytest.mark.parametrize(
+    "module", ["installer.package_managers", "installer.symlink_manager"]
+)
+def test_ubuntu_only_modules_load_on_demand(module):
+    """macOS installs and ``status``/``plan`` never load the apt or bundle code."""
+    deferred = [
+        "installer.apt",
+        "installer.apt_mirrors",
+        "installer.artifact_cache",
+        "installer.bundle",
+        "installer.downloads",
+        "installer.tools_lock",
+    ]
+    output = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    assert [name for name in deferred if name in output] == []
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+import time
+
+from installer.readiness import exited, pids_gone, process_running, wait_for
+
+
+def test_wait_for_returns_once_the_condition_holds():
+    ready_at = time.monotonic() + 0.05
+    start = time.monotonic()
+    assert wait_for(lambda: time.monotonic() >= ready_at, timeout=5)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_for_times_out():
+    start = time.monotonic()
+    assert not wait_for(lambda: False, timeout=0.1)
+    assert 0.1 <= time.monotonic() - start < 1
+
+
+def test_process_conditions(system):
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        assert not exited(proc)()
+        assert not pids_gone([proc.pid])()
+    finally:
+        proc.kill()
+    assert wait_for(exited(proc), timeout=5)
+    assert pids_gone([proc.pid])()
+    assert not process_running(system, "Übersicht")()
+    assert system.captures == ["pgrep -x 'Übersicht'"]
@@ -0,0 +1,82 @@
+import threading
+from typing import List, Tuple
+
+import pytest
+
+from installer.enums import StepResource
+from installer.scheduler import Step, StepScheduler
+
+
+def step(name: str, result: Tuple[int, int], ran: List[str], *deps: str) -> Step:
+    def run() -> Tuple[int, int]:
+        ran.append(name)
+        return result
+
+    return Step(name, name, run, depends_on=deps)
+
+
+def test_dependents_run_after_success():
+    ran: List[str] = []
+    scheduler = StepScheduler(
+        [
+            step("packages", (1, 1), ran),
+            step("shell", (2, 2), ran, "packages"),
+        ]
+    )
+    assert scheduler.run() == {"packages": (1, 1), "shell": (2, 2)}
+    assert ran == ["packages", "shell"]
+    assert scheduler.skipped == {}
+
+
+def test_partial_failure_skips_dependents():
+    ran: List[str] = []
+    scheduler = StepScheduler(
+        [
+            step("packages", (3, 4), ran),
+            step("shell", (1, 1), ran, "packages"),
+            step("plugins", (1, 1), ran, "shell"),
+            step("git", (1, 1), ran),
+        ]
+    )
+    results = scheduler.run()
+    assert sorted(ran) == ["git", "packages"]
+    assert results["shell"] == (0, 1)
+    assert results["plugins"] == (0, 1)
+    assert results["git"] == (1, 1)
+    assert scheduler.skipped == {"shell": "packages", "plugins": "shell"}
+
+
+def test_raising_step_skips_dependents():
+    ran: List[str] = []
+
+    def boom() -> Tuple[int, int]:
+        raise RuntimeError("apt exploded")
+
+    scheduler = StepScheduler(
+        [Step("packages", "packages", boom), step("shell", (1, 1), ran, "packages")]
+    )
+    results = scheduler.run()
+    assert results == {"packages": (0, 1), "shell": (0, 1)}
+    assert ran == []
+    assert scheduler.skipped == {"shell": "packages"}
+
+
+def test_independent_steps_overlap():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet() -> Tuple[int, int]:
+        barrier.wait()
+        return 1, 1
+
+    scheduler = StepScheduler(
+        [Step("a", "a", meet), Step("b", "b", meet)],
+        max_workers=2,
+        resource_limits={StepResource.CPU: 2},
+    )
+    assert scheduler.run() == {"a": (1, 1), "b": (1, 1)}
+
+
+def test_cycle_is_rejected():
+    ran: List[str] = []
+    with pytest.raises(ValueError):
+        StepScheduler([step("a", (1, 1), ran, "b"), step("b", (1, 1), ran, "a")])
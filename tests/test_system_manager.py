@@ -0,0 +1,102 @@
+import subprocess
+import threading
+from typing import List, Tuple
+
+import pytest
+
+import installer.system_manager
+from installer.scheduler import prompt_lock
+from installer.system_manager import (
+    OUTPUT_TAIL_BYTES,
+    ConcreteSystemManager,
+    OutputTail,
+)
+
+
+def lock_is_free() -> bool:
+    """Whether another step could take the prompt lock right now."""
+    free: List[bool] = []
+
+    def probe() -> None:
+        free.append(prompt_lock.acquire(blocking=False))
+        if free[0]:
+            prompt_lock.release()
+
+    thread = threading.Thread(target=probe)
+    thread.start()
+    thread.join()
+    return free[0]
+
+
+@pytest.fixture
+def runs(monkeypatch) -> List[Tuple[str, bool]]:
+    """Each command run, and whether the prompt lock was free while it ran."""
+    calls: List[Tuple[str, bool]] = []
+
+    def run(command, **kwargs):
+        calls.append((command, lock_is_free()))
+        return subprocess.CompletedProcess(command, 0)
+
+    monkeypatch.setattr(installer.system_manager.subprocess, "run", run)
+    return calls
+
+
+def test_sudo_commands_hold_the_lock_only_to_authenticate(runs):
+    assert ConcreteSystemManager().run_interactive_command("sudo apt-get install -y jq")
+    assert runs == [("sudo -v", False), ("sudo apt-get install -y jq", True)]
+
+
+def test_other_interactive_commands_hold_the_lock_throughout(runs):
+    assert ConcreteSystemManager().run_interactive_command("sh install.sh")
+    assert runs == [("sh install.sh", False)]
+
+
+def test_failed_sudo_authentication_skips_the_command(monkeypatch):
+    commands: List[str] = []
+
+    def run(command, **kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 1)
+
+    monkeypatch.setattr(installer.system_manager.subprocess, "run", run)
+    assert not ConcreteSystemManager().run_interactive_command("sudo dpkg -i x.deb")
+    assert commands == ["sudo -v"]
+
+
+def test_tail_keeps_the_last_lines_within_its_budget():
+    tail = OutputTail(max_bytes=20)
+    for number in range(10):
+        tail.append(f"line {number}\n")
+    assert tail.text() == "line 8\nline 9\n"
+    assert tail.total_bytes == 70
+    assert tail.dropped_bytes == 56
+
+
+def test_tail_keeps_an_unterminated_final_line():
+    tail = OutputTail(max_bytes=20)
+    tail.append("done\n")
+    tail.append("error: no newline")
+    assert tail.text() == "error: no newline"
+
+
+def test_tail_keeps_the_end_of_an_oversized_line():
+    tail = OutputTail(max_bytes=8)
+    tail.append("x" * 20 + "the end\n")
+    assert tail.text() == "the end\n"
+    assert tail.dropped_bytes == 20
+
+
+def test_failed_command_reports_its_output_tail(tmp_path):
+    system = ConcreteSystemManager()
+    script = tmp_path / "fail.sh"
+    script.write_text(
+        f"seq 1 {OUTPUT_TAIL_BYTES}\nprintf 'fatal: no newline'\nexit 3\n"
+    )
+    with system.console.capture() as capture:
+        assert not system.run_command("sh fail.sh", "Failing...", cwd=tmp_path)
+    report = capture.get()
+    assert "Error running: sh fail.sh" in report
+    assert "earlier bytes of output omitted" in report
+    assert report.rstrip().endswith("fatal: no newline")
+    assert f"\n{OUTPUT_TAIL_BYTES}\n" in report
+    assert "\n1\n" not in report
@@ -0,0 +1,104 @@
+import functools
+import hashlib
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from installer.downloads import Artifact, DownloadError, DownloadStage, HttpDownloader
+from installer.package_managers import LOCKED_ARTIFACTS
+from installer.tools_lock import LOCK_FILE, LockedTool, load_lock, pin, save_lock
+
+DELTA = Artifact(
+    "delta",
+    "https://github.com/dandavison/delta/releases/download/{tag}/git-delta_{tag}_amd64.deb",
+    repo="dandavison/delta",
+)
+CONTENT = b"!<arch>\ndebian-binary   " * 64
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def releases(tmp_path: Path) -> Iterator[str]:
+    """A local stand-in for the release download host, serving tmp_path/releases."""
+    root = tmp_path / "releases"
+    root.mkdir()
+    (root / "git-delta_0.18.2_amd64.deb").write_bytes(CONTENT)
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(root))
+    )
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/git-delta_0.18.2_amd64.deb"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def lock_file(tmp_path: Path, releases: str) -> Path:
+    path = tmp_path / "tools.lock"
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    save_lock(path, {"delta": LockedTool("0.18.2", releases, sha256)})
+    return path
+
+
+def test_lock_round_trips(lock_file, releases):
+    assert load_lock(lock_file) == {
+        "delta": LockedTool("0.18.2", releases, hashlib.sha256(CONTENT).hexdigest())
+    }
+    assert load_lock(lock_file.with_name("absent.lock")) == {}
+
+
+def test_pinned_artifacts_skip_the_release_lookup(lock_file, releases):
+    [pinned] = pin([DELTA], load_lock(lock_file))
+    assert pinned.repo is None
+    assert pinned.url == releases
+    assert pinned.sha256 == hashlib.sha256(CONTENT).hexdigest()
+    assert pin([DELTA], {}) == [DELTA]
+
+
+def test_pinned_download_verifies(lock_file, tmp_path):
+    downloader = HttpDownloader(timeout=5, retries=0)
+    with DownloadStage(downloader) as downloads:
+        downloads.start(pin([DELTA], load_lock(lock_file)))
+        fetched = downloads.result("delta")
+        assert fetched is not None
+        assert fetched.read_bytes() == CONTENT
+
+
+def test_hash_mismatch_fails_verification(lock_file, releases, tmp_path):
+    # The release asset was replaced after it was locked
+    (tmp_path / "releases" / "git-delta_0.18.2_amd64.deb").write_bytes(b"tampered")
+    [pinned] = pin([DELTA], load_lock(lock_file))
+    destination = tmp_path / "out" / "delta.deb"
+    with pytest.raises(DownloadError, match="sha256 mismatch"):
+        HttpDownloader(timeout=5, retries=2).fetch(
+            pinned.url, destination, pinned.sha256
+        )
+    assert not destination.exists()
+    # An install treats it as a failed download rather than using the file
+    with DownloadStage(HttpDownloader(timeout=5, retries=0)) as downloads:
+        downloads.start([pinned])
+        assert downloads.result("delta") is None
+
+
+def test_committed_lock_pins_every_release():
+    path = Path(__file__).resolve().parent.parent / LOCK_FILE
+    if not path.exists():
+        pytest.skip(
+            f"{LOCK_FILE} not committed yet (run 'install-dotfiles lock --update')"
+        )
+    lock = load_lock(path)
+    assert sorted(lock) == sorted(artifact.name for artifact in LOCKED_ARTIFACTS)
+    for artifact in LOCKED_ARTIFACTS:
+        tool = lock[artifact.name]
+        assert tool.url == artifact.url_for(tool.version)
+        assert len(tool.sha256) == 64 and set(tool.sha256) <= set("0123456789abcdef")